@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Analytics Engine Benchmark
+
+Runs analytical and point-lookup queries on SQLite and on the DuckDB columnar
+engine over the same synthetic financial.db and shows which engine the SQL
+tool's router picks for each query.
+
+Usage: python benchmarks/bench_analytics_engine.py [--customers 200000] [--symbols 200]
+           [--days 1260] [--seed 42] [--db-path /tmp/bench_financial.db] [--repeat 3]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root and data directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+
+from build_database import create_database
+from helper_modules.analytics_engine import ColumnarAnalyticsEngine, duckdb, is_analytical_query
+
+QUERIES = {
+    "sector rollup": """
+        SELECT co.sector, COUNT(*) AS holdings, SUM(ph.current_value) AS total_value
+        FROM portfolio_holdings ph JOIN companies co ON ph.symbol = co.symbol
+        GROUP BY co.sector ORDER BY total_value DESC
+    """,
+    "top customers": """
+        SELECT customer_id, SUM(current_value) AS total_value
+        FROM portfolio_holdings GROUP BY customer_id ORDER BY total_value DESC LIMIT 10
+    """,
+    "20-day rolling average": """
+        SELECT symbol, date, AVG(close_price) OVER (
+            PARTITION BY symbol ORDER BY date ROWS BETWEEN 19 PRECEDING AND CURRENT ROW) AS avg_20d
+        FROM market_data ORDER BY symbol, date DESC LIMIT 100
+    """,
+    "profile breakdown": """
+        SELECT c.investment_profile, AVG(ph.current_value) AS avg_holding
+        FROM customers c JOIN portfolio_holdings ph ON c.id = ph.customer_id
+        GROUP BY c.investment_profile
+    """,
+    "one customer (point)": """
+        SELECT ph.symbol, ph.shares, ph.current_value FROM portfolio_holdings ph WHERE ph.customer_id = 4242
+    """,
+    "one symbol total (point)": """
+        SELECT SUM(current_value) FROM portfolio_holdings WHERE symbol = 'AAPL'
+    """,
+}
+
+
+def run_sqlite(db_path: Path, sql: str):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite vs DuckDB for the SQL tool")
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=1260)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-path", type=Path, help="Reuse this database if it exists")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if duckdb is None:
+        print("duckdb is not installed (pip install duckdb); nothing to compare")
+        sys.exit(1)
+
+    db_path = args.db_path or Path(tempfile.gettempdir()) / "bench_financial.db"
+    if not db_path.exists():
+        create_database(str(db_path), customers=args.customers, symbols=args.symbols,
+                        days=args.days, seed=args.seed, workers=4)
+
+    engine = ColumnarAnalyticsEngine(db_path)
+    # Warm up: opens the connection and, in snapshot mode, loads the tables
+    start = time.perf_counter()
+    for sql in QUERIES.values():
+        engine.execute(sql)
+    print(f"\nDuckDB mode: {engine.mode} (warm-up {time.perf_counter() - start:.2f}s)\n")
+
+    print(f"{'query':<26} {'sqlite':>10} {'duckdb':>10} {'speedup':>9}  routed to")
+    for name, sql in QUERIES.items():
+        sqlite_time = best_of(args.repeat, run_sqlite, db_path, sql)
+        duckdb_time = best_of(args.repeat, engine.execute, sql)
+        routed = "duckdb" if is_analytical_query(sql) else "sqlite"
+        print(f"{name:<26} {sqlite_time * 1000:>8.1f}ms {duckdb_time * 1000:>8.1f}ms "
+              f"{sqlite_time / duckdb_time:>8.1f}x  {routed}")
+
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
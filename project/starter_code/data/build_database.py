@@ -6,26 +6,60 @@ This script creates and populates the financial.db database with sample data.
 Run this script only once to set up the database for the financial agent.
 
 Usage: python build_database.py
+
+Synthetic data at benchmark scale:
+    python build_database.py --customers 1_000_000 --symbols 500 --days 2520 --seed 7 --workers 4
+
+Synthetic rows are generated in chunks (optionally in parallel worker processes)
+and streamed into SQLite with chunked executemany calls inside explicit
+transactions, with bulk-load PRAGMAs enabled for the duration of the load.
 """
 
+import argparse
 import sqlite3
 import os
 import sys
 from datetime import datetime, timedelta
+from multiprocessing import Pool
 import random
 
-def create_database():
-    """Create the financial.db database with all necessary tables and sample data."""
-    
-    # Database path - handle both running from root and from data directory
+FIRST_NAMES = ['John', 'Sarah', 'Michael', 'Emily', 'David', 'Lisa', 'Robert', 'Jennifer', 'Christopher',
+               'Amanda', 'James', 'Maria', 'Daniel', 'Laura', 'Kevin', 'Nicole', 'Brian', 'Rachel']
+LAST_NAMES = ['Smith', 'Johnson', 'Brown', 'Davis', 'Wilson', 'Anderson', 'Taylor', 'Martinez', 'Garcia',
+              'Rodriguez', 'Lee', 'Walker', 'Hall', 'Young', 'King', 'Wright', 'Lopez', 'Hill']
+SECTORS = ['Technology', 'Automotive', 'Healthcare', 'Financials', 'Energy', 'Consumer', 'Industrials', 'Utilities']
+PROFILES = [('conservative', 'low'), ('moderate', 'medium'), ('aggressive', 'high')]
+BASE_COMPANIES = [
+    ('AAPL', 'Apple Inc.', 'Technology', 3000000000000, 175.0),
+    ('GOOGL', 'Alphabet Inc.', 'Technology', 2000000000000, 160.0),
+    ('TSLA', 'Tesla Inc.', 'Automotive', 800000000000, 210.0),
+]
+# Finance acronyms that would read as tickers in questions ("Apple EPS", "the CEO");
+# mirrors helper_modules/entity_resolver.py TICKER_STOPWORDS
+RESERVED_TICKERS = frozenset('''
+    AI API AUM CAGR CEO CFO COO CPI CTO DCF EBIT EPS ESG ETF EU EV FCF FED FOMC FX FY GAAP GDP HR IPO IRR IT
+    LLC LTD MD NAV NYSE OTC PE PEG PNL QOQ REIT ROA ROE ROI SEC TTM UK US USA USD YOY YTD
+'''.split())
+
+def default_db_path():
+    """Database path - handle both running from root and from data directory"""
     if os.path.exists('helper_modules'):
         # Running from project root
-        db_path = os.path.join('data', 'financial.db')
-        data_dir = 'data'
-    else:
-        # Running from data directory
-        db_path = 'financial.db'
-        data_dir = '.'
+        return os.path.join('data', 'financial.db')
+    # Running from data directory
+    return 'financial.db'
+
+
+def create_database(db_path=None, customers=None, symbols=None, days=None, seed=None,
+                    workers=1, batch_size=10000):
+    """Create the financial.db database with all necessary tables and data.
+    
+    Without scale arguments the small hand-written sample data set is loaded.
+    Passing customers, symbols or days switches to the synthetic generator.
+    """
+    
+    db_path = db_path or default_db_path()
+    data_dir = os.path.dirname(db_path) or '.'
     
     # Create data directory if it doesn't exist
     os.makedirs(data_dir, exist_ok=True)
@@ -39,6 +73,39 @@ def create_database():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    create_schema(cursor)
+    
+    if customers is None and symbols is None and days is None:
+        if seed is not None:
+            random.seed(seed)
+        insert_sample_data(cursor)
+        conn.commit()
+    else:
+        generate_synthetic_data(
+            conn,
+            customers=customers if customers is not None else 10,
+            symbols=symbols if symbols is not None else len(BASE_COMPANIES),
+            days=days if days is not None else 30,
+            seed=seed if seed is not None else 42,
+            workers=workers,
+            batch_size=batch_size,
+        )
+    
+    create_summary_tables(cursor)
+    create_indexes(cursor)
+    conn.commit()
+    
+    verify_database(cursor)
+    
+    # Close connection
+    conn.close()
+    
+    print(f"\n✅ Database created successfully at: {db_path}")
+    print("The financial agent is now ready to use!")
+
+
+def create_schema(cursor):
+    """Create all tables."""
     print("Creating database tables...")
     
     # Create customers table
@@ -95,6 +162,125 @@ def create_database():
     ''')
     
     print("Tables created successfully!")
+
+
+# Materialized summaries of portfolio_holdings. They are rebuilt in one
+# GROUP BY pass after a load and then kept current incrementally by triggers,
+# so per-customer totals and per-symbol aggregates never need a full join.
+SUMMARY_TABLES = {
+    'customer_portfolio_summary': '''
+        CREATE TABLE customer_portfolio_summary (
+            customer_id INTEGER PRIMARY KEY,
+            holdings_count INTEGER NOT NULL DEFAULT 0,
+            total_shares REAL NOT NULL DEFAULT 0.0,
+            total_cost REAL NOT NULL DEFAULT 0.0,
+            total_value REAL NOT NULL DEFAULT 0.0,
+            FOREIGN KEY (customer_id) REFERENCES customers(id)
+        )
+    ''',
+    'symbol_holdings_summary': '''
+        CREATE TABLE symbol_holdings_summary (
+            symbol TEXT PRIMARY KEY,
+            holdings_count INTEGER NOT NULL DEFAULT 0,
+            total_shares REAL NOT NULL DEFAULT 0.0,
+            total_cost REAL NOT NULL DEFAULT 0.0,
+            total_value REAL NOT NULL DEFAULT 0.0,
+            FOREIGN KEY (symbol) REFERENCES companies(symbol)
+        )
+    ''',
+}
+
+# (summary table, key column) pairs maintained from portfolio_holdings
+SUMMARY_KEYS = [('customer_portfolio_summary', 'customer_id'), ('symbol_holdings_summary', 'symbol')]
+
+
+def _summary_delta(table, key, row, sign):
+    """Trigger statements that add (sign=+1) or remove (sign=-1) one holdings row from a summary."""
+    sql = f'''
+            INSERT INTO {table} ({key}, holdings_count, total_shares, total_cost, total_value)
+            VALUES ({row}.{key}, {sign}, {sign} * {row}.shares, {sign} * {row}.shares * {row}.purchase_price,
+                    {sign} * COALESCE({row}.current_value, 0))
+            ON CONFLICT({key}) DO UPDATE SET
+                holdings_count = holdings_count + excluded.holdings_count,
+                total_shares = total_shares + excluded.total_shares,
+                total_cost = total_cost + excluded.total_cost,
+                total_value = total_value + excluded.total_value;'''
+    if sign < 0:
+        # Drop keys whose last holding went away
+        sql += f"\n            DELETE FROM {table} WHERE {key} = {row}.{key} AND holdings_count = 0;"
+    return sql
+
+
+def create_summary_tables(cursor):
+    """Create the summary tables, populate them and install the refresh triggers."""
+    print("Building portfolio summary tables...")
+    for table, ddl in SUMMARY_TABLES.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(ddl)
+    refresh_summary_tables(cursor)
+    
+    inserts = ''.join(_summary_delta(table, key, 'NEW', 1) for table, key in SUMMARY_KEYS)
+    deletes = ''.join(_summary_delta(table, key, 'OLD', -1) for table, key in SUMMARY_KEYS)
+    for event, body in [('INSERT', inserts), ('DELETE', deletes), ('UPDATE', deletes + inserts)]:
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_holdings_summary_{event.lower()}")
+        cursor.execute(f'''
+            CREATE TRIGGER trg_holdings_summary_{event.lower()}
+            AFTER {event} ON portfolio_holdings
+            BEGIN{body}
+            END
+        ''')
+    print("Summary tables built!")
+
+
+def refresh_summary_tables(cursor):
+    """Rebuild the summary tables from portfolio_holdings in a single pass.
+    
+    The triggers keep the summaries exact; a full refresh is only needed after
+    loading data with the triggers absent, or to clear floating-point drift.
+    """
+    for table, key in SUMMARY_KEYS:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f'''
+            INSERT INTO {table} ({key}, holdings_count, total_shares, total_cost, total_value)
+            SELECT {key}, COUNT(*), SUM(shares), SUM(shares * purchase_price), SUM(COALESCE(current_value, 0))
+            FROM portfolio_holdings
+            GROUP BY {key}
+        ''')
+
+
+# Secondary indexes for the join patterns advertised to the SQL generator.
+# The holdings indexes carry shares/current_value so that holdings lookups by
+# customer or by symbol are answered from the index alone (covering indexes),
+# and the holders of a symbol come out in share order. market_data is read by
+# symbol, newest date first; customers are looked up by name for the SQL
+# templates.
+INDEXES = [
+    ("idx_holdings_customer",
+     "portfolio_holdings(customer_id, symbol, shares, current_value)"),
+    ("idx_holdings_symbol",
+     "portfolio_holdings(symbol, shares, customer_id, current_value)"),
+    ("idx_market_data_symbol_date",
+     "market_data(symbol, date, close_price, volume)"),
+    ("idx_customers_name",
+     "customers(last_name, first_name)"),
+]
+
+
+def create_indexes(cursor):
+    """Create secondary indexes and refresh planner statistics.
+    
+    Run after the data is loaded: building an index once over the full table
+    is much cheaper than maintaining it row by row during the bulk insert.
+    """
+    print("Creating indexes...")
+    for name, target in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    cursor.execute("ANALYZE")
+    print("Indexes created and statistics analyzed!")
+
+
+def insert_sample_data(cursor):
+    """Insert the small hand-written sample data set."""
     
     # Insert sample companies
     print("Inserting company data...")
@@ -210,8 +396,10 @@ def create_database():
         VALUES (?, ?, ?, ?, ?)
     ''', market_data)
     
-    # Commit changes
-    conn.commit()
+
+
+def verify_database(cursor):
+    """Print row counts for every table."""
     
     # Verify data insertion
     print("\nVerifying data insertion:")
@@ -231,34 +419,224 @@ def create_database():
     cursor.execute("SELECT COUNT(*) FROM market_data")
     market_count = cursor.fetchone()[0]
     print(f"Market data records inserted: {market_count}")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data generation (benchmark scale)
+# ---------------------------------------------------------------------------
+
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",  # 256 MB page cache
+]
+NORMAL_PRAGMAS = [
+    "PRAGMA locking_mode = NORMAL",
+    "PRAGMA journal_mode = DELETE",
+    "PRAGMA synchronous = FULL",
+]
+
+
+def make_symbols(count):
+    """Return `count` companies: the three real ones followed by synthetic tickers."""
+    companies = [(symbol, name, sector, market_cap) for symbol, name, sector, market_cap, _ in BASE_COMPANIES]
+    rng = random.Random(0)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    index = 0
+    taken = {c[0] for c in companies} | RESERVED_TICKERS
+    while len(companies) < count:
+        # Deterministic 3-4 letter tickers: AAA, AAB, ... then AAAA, ...
+        width = 3 if index < 26 ** 3 else 4
+        n = index if width == 3 else index - 26 ** 3
+        ticker = ''.join(letters[(n // 26 ** p) % 26] for p in reversed(range(width)))
+        index += 1
+        if ticker in taken:
+            continue
+        taken.add(ticker)
+        companies.append((ticker, f"{ticker.title()} Holdings Inc.", rng.choice(SECTORS),
+                          float(rng.randint(1, 500)) * 1e9))
+    return companies[:count]
+
+
+def trading_days(days):
+    """Return the last `days` weekdays up to yesterday, oldest first."""
+    dates = []
+    current = datetime.now() - timedelta(days=1)
+    while len(dates) < days:
+        if current.weekday() < 5:
+            dates.append(current.strftime('%Y-%m-%d'))
+        current -= timedelta(days=1)
+    return dates[::-1]
+
+
+def generate_market_chunk(args):
+    """Generate the market_data rows for one symbol (random walk). Runs in a worker."""
+    symbol, market_cap, start_price, dates, seed = args
+    rng = random.Random(f"{seed}:market:{symbol}")
+    price = start_price
+    rows = []
+    for date in dates:
+        price = max(1.0, price * (1 + rng.gauss(0.0003, 0.02)))
+        rows.append((symbol, round(price, 2), rng.randint(1_000_000, 100_000_000), market_cap, date))
+    return symbol, rows
+
+
+def generate_customer_chunk(args):
+    """Generate customers [start, end) and their holdings. Runs in a worker."""
+    start, end, symbols, latest_prices, seed = args
+    rng = random.Random(f"{seed}:customers:{start}")
+    customers, holdings = [], []
+    for customer_id in range(start, end):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        profile, risk = rng.choice(PROFILES)
+        portfolio_value = 0.0
+        for symbol in rng.sample(symbols, min(len(symbols), rng.randint(1, 8))):
+            shares = float(rng.randint(1, 500))
+            price = latest_prices[symbol]
+            purchase_price = round(price * rng.uniform(0.5, 1.3), 2)
+            current_value = round(shares * price, 2)
+            portfolio_value += current_value
+            holdings.append((customer_id, symbol, shares, purchase_price, current_value))
+        customers.append((
+            customer_id, first, last, f"{first.lower()}.{last.lower()}.{customer_id}@example.com",
+            f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}", profile, risk,
+            round(rng.uniform(1_000, 500_000), 2), round(portfolio_value, 2),
+        ))
+    return customers, holdings
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def generate_synthetic_data(conn, customers, symbols, days, seed, workers=1, batch_size=10000):
+    """Stream synthetic companies, market data, customers and holdings into the database.
     
-    # Close connection
-    conn.close()
+    Rows are produced in chunks, by a multiprocessing pool when workers > 1, and
+    written by this process (SQLite has a single writer) with executemany in
+    explicit transactions while bulk-load PRAGMAs are active.
+    """
+    print(f"Generating synthetic data: {customers:,} customers, {symbols:,} symbols, "
+          f"{days:,} days (seed={seed}, workers={workers})")
+    started = datetime.now()
     
-    print(f"\n✅ Database created successfully at: {db_path}")
-    print("The financial agent is now ready to use!")
+    # Manage transactions explicitly instead of sqlite3's implicit BEGIN
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    for pragma in BULK_LOAD_PRAGMAS:
+        cursor.execute(pragma)
+    
+    companies = make_symbols(symbols)
+    start_prices = {symbol: price for symbol, _, _, _, price in BASE_COMPANIES}
+    rng = random.Random(seed)
+    for symbol, *_ in companies:
+        start_prices.setdefault(symbol, round(rng.uniform(10, 500), 2))
+    dates = trading_days(days)
+    
+    pool = Pool(workers) if workers > 1 else None
+    imap = pool.imap if pool else map
+    
+    try:
+        cursor.execute("BEGIN")
+        cursor.executemany(
+            "INSERT INTO companies (symbol, name, sector, market_cap) VALUES (?, ?, ?, ?)", companies
+        )
+        
+        print("Inserting market data...")
+        latest_prices = {}
+        market_args = [(symbol, market_cap, start_prices[symbol], dates, seed)
+                       for symbol, _, _, market_cap in companies]
+        for symbol, rows in imap(generate_market_chunk, market_args):
+            latest_prices[symbol] = rows[-1][1] if rows else start_prices[symbol]
+            for batch in _chunks(rows, batch_size):
+                cursor.executemany(
+                    "INSERT INTO market_data (symbol, close_price, volume, market_cap, date) VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+        cursor.execute("COMMIT")
+        
+        print("Inserting customers and portfolio holdings...")
+        symbol_list = [c[0] for c in companies]
+        customer_args = [(start, min(start + batch_size, customers + 1), symbol_list, latest_prices, seed)
+                         for start in range(1, customers + 1, batch_size)]
+        done = 0
+        for customer_rows, holding_rows in imap(generate_customer_chunk, customer_args):
+            cursor.execute("BEGIN")
+            cursor.executemany(
+                "INSERT INTO customers (id, first_name, last_name, email, phone, investment_profile, "
+                "risk_tolerance, account_balance, total_portfolio_value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                customer_rows,
+            )
+            cursor.executemany(
+                "INSERT INTO portfolio_holdings (customer_id, symbol, shares, purchase_price, current_value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                holding_rows,
+            )
+            cursor.execute("COMMIT")
+            done += len(customer_rows)
+            if done % (batch_size * 20) < batch_size:
+                print(f"   {done:,}/{customers:,} customers")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        for pragma in NORMAL_PRAGMAS:
+            cursor.execute(pragma)
+    
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"Synthetic data generated in {elapsed:.1f}s")
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build the financial.db database")
+    parser.add_argument("--db-path", help="Database file to create (default: data/financial.db)")
+    parser.add_argument("--customers", type=int, help="Generate this many synthetic customers")
+    parser.add_argument("--symbols", type=int, help="Generate this many companies/symbols")
+    parser.add_argument("--days", type=int, help="Generate this many trading days of market data")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible data")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel generator processes")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per executemany batch")
+    parser.add_argument("--yes", "-y", action="store_true", help="Recreate an existing database without asking")
+    return parser.parse_args(argv)
+
 
 def main():
     """Main function to create the database."""
+    args = parse_args()
+    
     print("Financial Database Builder")
     print("=" * 50)
     
     # Validate that we're in the right directory or data directory
-    if not (os.path.exists('../helper_modules') or os.path.exists('helper_modules')):
+    if not args.db_path and not (os.path.exists('../helper_modules') or os.path.exists('helper_modules')):
         print("❌ Error: Please run this script from the project root directory")
         print("   (where helper_modules/ is located) or from the data/ directory")
         print("   Usage: python build_database.py")
         sys.exit(1)
     
+    db_path = args.db_path or default_db_path()
+    
     # Confirm with user before proceeding
-    if os.path.exists('data/financial.db'):
+    if os.path.exists(db_path) and not args.yes:
         response = input("Database already exists. Do you want to recreate it? (y/N): ")
         if response.lower() not in ['y', 'yes']:
             print("Database creation cancelled.")
             sys.exit(0)
     
     try:
-        create_database()
+        create_database(
+            db_path=db_path,
+            customers=args.customers,
+            symbols=args.symbols,
+            days=args.days,
+            seed=args.seed,
+            workers=args.workers,
+            batch_size=args.batch_size,
+        )
     except Exception as e:
         print(f"❌ Error creating database: {e}")
         sys.exit(1)
@@ -12,8 +12,6 @@ Learning Objectives:
 - Build modular agent architecture
 - Master PII protection in agent workflows
 
-Your Task: Complete the missing implementations marked with YOUR CODE HERE
-
 Key Features:
 - Multi-tool coordination with intelligent routing
 - Document analysis (10-K filings) for Apple, Google, Tesla
@@ -23,15 +21,28 @@ Key Features:
 - Modular architecture using helper modules
 """
 
-import os
+import re
+import time
 import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, List, Any, Tuple, Optional
 from pathlib import Path
 
-# LlamaIndex imports
-from llama_index.core import Settings
-from llama_index.llms.openai import OpenAI
-from llama_index.embeddings.openai import OpenAIEmbedding
+from .circuit_breaker import CircuitBreakerRegistry
+from .context_compression import CompressionStats, ContextCompressor
+from .deadlines import (Deadline, DeadlineExceeded, current_deadline, cut_short_by_deadline, deadline_scope,
+                        stopped_before_call)
+from .entity_resolver import get_entity_resolver
+from .llm_client import get_llm_client
+from .llm_usage import get_usage_tracker
+from .pii_masking import PIIMaskingEngine, extract_columns
+from .prompt_layout import PromptLayout
+from .routing_prompt import DOCUMENT_KEYWORDS, RoutingPromptBuilder
+from .single_flight import SingleFlight, normalize_input
+from .tool_results import ToolResult, render_result
 
 # Environment setup
 from dotenv import load_dotenv
@@ -41,6 +52,40 @@ load_dotenv()
 logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Intent keywords for routing without the LLM (DOCUMENT_KEYWORDS lives in routing_prompt)
+MARKET_KEYWORDS = ("price", "stock", "quote", "trading", "volume", "market", "shares traded")
+DATABASE_KEYWORDS = ("customer", "client", "holding", "portfolio", "own", "account", "invest")
+
+# Static synthesis instructions (the cacheable prefix of every synthesis prompt)
+SYNTHESIS_INSTRUCTIONS = (
+    "Answer the financial question using the information gathered from several tools.\n"
+    "Combine the sources into one coherent answer and say which source each fact came from."
+)
+
+
+def synthesis_prompt(question: str, sections: str, unavailable: List[str] = None) -> PromptLayout:
+    """Synthesis prompt: instructions first, then the question and the tool results"""
+    layout = PromptLayout().stable(SYNTHESIS_INSTRUCTIONS)
+    layout.variable(f"Question: {question}").variable(f"Tool results:\n{sections}")
+    if unavailable:
+        layout.variable(f"These sources could not be reached, so the answer may be incomplete: "
+                        f"{', '.join(unavailable)}")
+    return layout.variable("Answer:")
+
+
+class _OutcomeClaim:
+    """Lets exactly one of a tool call and the coordinator abandoning it record its outcome"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._claimed = False
+    
+    def claim(self) -> bool:
+        """True for the first caller only"""
+        with self._lock:
+            first, self._claimed = not self._claimed, True
+            return first
+
 
 class AgentCoordinator:
     """
@@ -68,18 +113,48 @@ class AgentCoordinator:
         self.verbose = verbose
         self.project_root = Path.cwd()  # Use current working directory
         
-        # Company metadata
-        self.company_info = {
-            "AAPL": {"name": "Apple Inc.", "sector": "Technology"},
-            "GOOGL": {"name": "Alphabet Inc.", "sector": "Technology"},
-            "TSLA": {"name": "Tesla Inc.", "sector": "Automotive"}
-        }
+        # Company metadata from the shared entity resolver
+        self.entity_resolver = get_entity_resolver(
+            self.project_root / "data" / "financial.db", self.project_root / "data" / "10k_documents"
+        )
+        self.company_info = self.entity_resolver.company_info()
         
         # Storage for tools and engines
         self.document_tools = []
         self.function_tools = []
         self.llm = None
-    
+        
+        # Columnar PII masking engine shared by the PII protection workflow
+        self.pii_engine = PIIMaskingEngine()
+        
+        # Process-wide LLM token/latency accounting, reported by get_status()
+        self.usage_tracker = get_usage_tracker()
+        
+        # Extractive compression of tool results to a fixed synthesis budget
+        # (None passes results through unchanged)
+        self.context_compressor = ContextCompressor(token_budget=1500)
+        self._query_state = threading.local()  # per-query results, e.g. compression stats
+        
+        # Routing prompts from a cached, compact tool catalog (flat in the number of tools)
+        self.routing_prompts = RoutingPromptBuilder(
+            {symbol: info.get("name", symbol) for symbol, info in self.company_info.items()}
+        )
+        
+        # Concurrent identical tool calls (same tool, same normalized input) share one execution
+        self.single_flight = SingleFlight()
+        
+        # Query deadlines: routing may use this share of the budget and this share is
+        # kept for synthesis; tools run concurrently in between and stragglers are dropped
+        self.routing_share = 0.25
+        self.synthesis_share = 0.25
+        self._tool_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="agent-tool")
+        
+        # Circuit breakers per tool and for the routing/synthesis LLM; while a tool's
+        # circuit is open its last good result for the same input is served instead
+        self.circuit_breakers = CircuitBreakerRegistry(slow_call_seconds=10.0, open_seconds=30.0)
+        self._last_good: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._last_good_size = 256
+        self._last_good_lock = threading.Lock()
         
         self._configure_settings()
         
@@ -95,22 +170,14 @@ class AgentCoordinator:
     def _configure_settings(self):
         """Configure LlamaIndex settings with Vocareum API compatibility
         
-        TODO: Set up the LLM and embedding model for intelligent routing
+        Uses the process-wide LLM client: the OpenAI LLM (gpt-3.5-turbo, temperature=0)
+        used for routing and synthesis plus the text-embedding-ada-002 embedding model,
+        shared with the other managers, are registered on Settings and the LLM is kept
+        in self.llm for routing decisions.
         
-        Requirements:
-        - Create OpenAI LLM with "gpt-3.5-turbo" model and temperature=0
-        - Create OpenAIEmbedding with "text-embedding-ada-002" model
-        - Use api_base parameter for Vocareum API compatibility (both models)
-        - Set Settings.llm and Settings.embed_model
-        - Store LLM reference in self.llm for routing decisions
-        
-        IMPORTANT NOTE FOR VOCAREUM:
-        LlamaIndex requires the api_base parameter to work with Vocareum's OpenAI endpoint.
-        Get the base URL from environment: os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
-        Pass it as api_base parameter to both OpenAI() and OpenAIEmbedding() constructors.
+        Vocareum requires the api_base parameter, read from OPENAI_API_BASE.
         """
-        # YOUR CODE HERE
-        pass
+        self.llm = get_llm_client().configure_settings()
     
     
     def setup(self, document_tools: List = None, function_tools: List = None):
@@ -149,47 +216,56 @@ class AgentCoordinator:
     def _create_tools(self):
         """Create all tools automatically using helper modules
         
-        TODO: Import and use the DocumentToolsManager and FunctionToolsManager
-        to create all necessary tools for the coordinator.
-        
-        Steps:
-        1. Import DocumentToolsManager from .document_tools
-        2. Import FunctionToolsManager from .function_tools
-        3. Create instances and call their build methods
-        4. Store results in self.document_tools and self.function_tools
+        Builds the document tools with DocumentToolsManager and the function tools
+        with FunctionToolsManager and stores them on the coordinator.
         """
-        # YOUR CODE HERE
-        pass
+        from .document_tools import DocumentToolsManager
+        from .function_tools import FunctionToolsManager
+        
+        document_manager = DocumentToolsManager(companies=self.companies, verbose=self.verbose)
+        self.document_tools = document_manager.build_document_tools()
+        
+        function_manager = FunctionToolsManager(verbose=self.verbose)
+        self.function_tools = function_manager.create_function_tools()
     
-    def _check_and_apply_pii_protection(self, tool_name: str, result: str) -> str:
+    def _check_and_apply_pii_protection(self, tool_name: str, result: Any) -> Any:
         """Check if database results need PII protection and apply it automatically
         
         This method automatically detects when database queries return sensitive information
-        and applies appropriate PII protection using the PII protection tool from function_tools.
+        and applies appropriate PII protection. Structured ToolResults are masked column
+        by column on their rows; legacy string results go through the pii_protection_tool.
         
         Args:
             tool_name: Name of the tool that generated the result
-            result: Raw result string from the tool
+            result: Raw result from the tool (ToolResult or string)
             
         Returns:
-            Protected result string with PII masked if necessary
+            Protected result (same type as the input) with PII masked if necessary
         """
         
         # Only apply to database query results
         if "database_query_tool" not in tool_name:
             return result
         
+        if isinstance(result, ToolResult):
+            return result.mask_pii(self.pii_engine)
+        
         # Check if result contains column information
         if "COLUMNS:" not in result:
             return result
         
-        # TODO: Extract column names from result
-        # Detect PII fields using _detect_pii_fields()
-        # If PII detected, find and use the pii_protection_tool
-        # Apply protection and return masked result
-        # YOUR CODE HERE
+        field_names = extract_columns(result)
+        pii_fields = self._detect_pii_fields(field_names)
+        if not pii_fields:
+            return result
+        
+        # Prefer the registered PII protection tool, fall back to the engine directly
+        for tool in self.function_tools:
+            if tool.metadata.name == "pii_protection_tool":
+                return str(tool.call(result, str(field_names)))
         
-        return result  # Placeholder
+        masked_result, _ = self.pii_engine.mask_text(result, field_names)
+        return masked_result
     
     def _detect_pii_fields(self, field_names: list) -> set:
         """Detect which fields contain PII based on field names
@@ -202,14 +278,39 @@ class AgentCoordinator:
         Returns:
             Set of field names that contain PII
         """
-        # TODO: Define PII field patterns (email, phone, names, address, ssn, etc.)
-        # Check each field name against patterns
-        # Return set of detected PII field names
-        # YOUR CODE HERE
-        
-        return set()  # Placeholder
+        return self.pii_engine.detect_pii_fields(field_names)
     
 
+    def _routable_tools(self) -> List[Any]:
+        """Tools the router may select (PII protection is applied automatically)"""
+        return [tool for tool in self.document_tools + self.function_tools
+                if tool.metadata.name != "pii_protection_tool"]
+    
+    def _invoke_tool(self, tool: Any, query: str) -> Any:
+        """Run a tool and return its raw output
+        
+        Function tools are called through their underlying function so structured
+        ToolResults are not stringified before PII protection and synthesis.
+        Identical calls already in flight for another user are joined rather than
+        repeated; the shared result is never mutated (PII masking copies it). An
+        outcome cut short by the leader's deadline is not shared: callers with more
+        time run the tool themselves.
+        """
+        fn = getattr(tool, "fn", None)
+        
+        def run():
+            # LLM calls inside the tool (e.g. a 10-K query engine) are attributed to it
+            with self.usage_tracker.call_site(tool.metadata.name):
+                if fn is not None:
+                    return fn(query)
+                return tool.call(query)
+        
+        result, shared = self.single_flight.do((tool.metadata.name, normalize_input(query)), run,
+                                               shareable=lambda error: not cut_short_by_deadline(error))
+        if shared:
+            logger.info(f"Joined in-flight {tool.metadata.name} call")
+        return result
+    
     def _route_query(self, query: str) -> List[Tuple[str, str, Any]]:
         """Use LLM to intelligently route query to appropriate tools
         
@@ -222,19 +323,220 @@ class AgentCoordinator:
         Returns:
             List of tuples: (tool_name, tool_description, result)
         """
+        return self._intelligent_routing(query)
+    
+    def _intelligent_routing(self, query: str) -> List[Tuple[str, str, Any]]:
+        """Route with the LLM, falling back to entity/keyword routing if it fails
+        
+        Under a query deadline the routing call may use routing_share of the time left.
+        """
+        tools = self._routable_tools()
+        if not tools:
+            return []
+        deadline = current_deadline()
+        routing_deadline = (deadline.reserve(deadline.remaining() * (1 - self.routing_share))
+                            if deadline is not None else None)
+        try:
+            with deadline_scope(routing_deadline):
+                selected = self._select_tools_with_llm(query, tools)
+        except Exception as e:
+            logger.warning(f"LLM routing failed, using simple routing: {e}")
+            selected = self._select_tools_by_entities(query, tools)
+        return self._execute_tools(query, selected)
+    
+    def _simple_routing(self, query: str) -> List[Tuple[str, str, Any]]:
+        """Route without the LLM using resolved companies and keywords"""
+        return self._execute_tools(query, self._select_tools_by_entities(query, self._routable_tools()))
+    
+    def _select_tools_with_llm(self, query: str, tools: List[Any]) -> List[Any]:
+        """Ask the LLM which tools are needed and return them
+        
+        The prompt lists the tool catalog compactly and expands per-company tools
+        only for the companies in the question (see routing_prompt).
+        """
+        prompt = self.routing_prompts.build(
+            query, tools, symbols=self.entity_resolver.symbols(query), resolved=self.entity_resolver.describe(query)
+        )
+        
+        response = str(self._complete(prompt, "routing"))
+        selected = []
+        for number in re.findall(r"\d+", response):
+            index = int(number) - 1
+            if 0 <= index < len(tools) and tools[index] not in selected:
+                selected.append(tools[index])
+        return selected
+    
+    def _select_tools_by_entities(self, query: str, tools: List[Any]) -> List[Any]:
+        """Pick tools from the companies the entity resolver finds plus intent keywords"""
+        symbols = self.entity_resolver.symbols(query)
+        query_lower = query.lower()
+        wants_market = any(word in query_lower for word in MARKET_KEYWORDS)
+        wants_database = any(word in query_lower for word in DATABASE_KEYWORDS)
+        
+        selected = []
+        for tool in tools:
+            name = tool.metadata.name
+            if name == "database_query_tool":
+                use = wants_database
+            elif name == "finance_market_search_tool":
+                use = wants_market
+            else:
+                use = any(name.upper().startswith(f"{symbol}_") for symbol in symbols) and (
+                    not (wants_market or wants_database) or any(w in query_lower for w in DOCUMENT_KEYWORDS)
+                )
+            if use:
+                selected.append(tool)
+        return selected
+    
+    def _complete(self, prompt: str, call_site: str) -> Any:
+        """Routing/synthesis LLM call, through the LLM circuit breaker and the query deadline
+        
+        Requests the query's deadline kept from being sent are not held against the
+        LLM; requests it cut short while the LLM was still working count as slow.
+        """
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check(call_site)
+        return self.circuit_breakers.get("llm").call(
+            lambda: self.usage_tracker.complete(self.llm, prompt, call_site),
+            is_neutral=stopped_before_call, is_slow=lambda e: isinstance(e, DeadlineExceeded))
+    
+    @staticmethod
+    def _is_failure(result: Any) -> bool:
+        if isinstance(result, ToolResult):
+            return not result.ok
+        return isinstance(result, str) and result.startswith("Tool error:")
+    
+    def _remember(self, tool_name: str, query: str, result: Any):
+        with self._last_good_lock:
+            key = (tool_name, normalize_input(query))
+            self._last_good[key] = (time.time(), result)
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self._last_good_size:
+                self._last_good.popitem(last=False)
+    
+    def _fallback_result(self, tool_name: str, query: str) -> Any:
+        """Result served while a tool's circuit is open: its last good answer, if any"""
+        with self._last_good_lock:
+            cached = self._last_good.get((tool_name, normalize_input(query)))
+        if cached is None:
+            return ToolResult.failure(f"{tool_name} is temporarily unavailable", circuit_open=True)
+        stored_at, result = cached
+        note = (f"⚠️ {tool_name} is unavailable; this is a cached result from "
+                f"{time.time() - stored_at:.0f}s ago")
+        if isinstance(result, ToolResult):
+            return result.with_rows(result.rows, stale=True, notes=[*result.metadata.get("notes", []), note])
+        return f"{render_result(result)}\n{note}"
+    
+    def _run_tool(self, tool: Any, query: str, outcome: _OutcomeClaim = None) -> Any:
+        """Run one tool through its circuit breaker and apply PII protection
         
-        # TODO: Build routing logic
-        # 1. Create descriptions of all available tools
-        # 2. Build LLM prompt with query and tool options
-        # 3. Include routing guidelines (database for customers, market for prices, etc.)
-        # 4. Parse LLM response to get tool indices
-        # 5. Execute selected tools and collect results
-        # 6. Apply PII protection to database results
-        # YOUR CODE HERE
+        Failures become error results. While the tool's circuit is open it is not
+        called at all and the last good result for the same input is used instead.
+        A deadline that passed before the tool's dependency was called is not
+        recorded; one that cut the dependency short counts as a slow call, and
+        the dependency's own timeouts count as failures.
+        
+        Args:
+            tool: Tool to run
+            query: Tool input
+            outcome: Shared with _execute_tools, which records the call as slow
+                if it abandons it; the call then does not record itself
+        """
+        tool_name = tool.metadata.name
+        breaker = self.circuit_breakers.get(tool_name)
+        if not breaker.allow():
+            logger.info(f"Circuit open for {tool_name}, failing fast")
+            return self._check_and_apply_pii_protection(tool_name, self._fallback_result(tool_name, query))
+        
+        start = time.perf_counter()
+        error = None
+        try:
+            result = self._invoke_tool(tool, query)
+        except Exception as e:
+            logger.warning(f"Tool {tool_name} failed: {e}")
+            result, error = f"Tool error: {e}", e
+        failed = self._is_failure(result)
+        if outcome is None or outcome.claim():
+            if stopped_before_call(error):
+                breaker.discard()
+            elif isinstance(error, DeadlineExceeded):
+                breaker.record(True, time.perf_counter() - start, slow=True)
+            else:
+                breaker.record(not failed, time.perf_counter() - start)
+        if not failed:
+            self._remember(tool_name, query, result)
+        return self._check_and_apply_pii_protection(tool_name, result)
+    
+    def _execute_tools(self, query: str, tools: List[Any]) -> List[Tuple[str, str, Any]]:
+        """Run the selected tools and apply PII protection to their results
         
-        return []  # Placeholder
+        Under a query deadline the tools run concurrently and must finish before
+        the synthesis reserve; tools still running are abandoned and reported as
+        timed-out ToolResults (metadata 'timed_out') so the answer can say so.
+        """
+        deadline = current_deadline()
+        if deadline is None or not tools:
+            return [(tool.metadata.name, tool.metadata.description, self._run_tool(tool, query))
+                    for tool in tools]
+        
+        tool_deadline = deadline.reserve(deadline.budget * self.synthesis_share)
+        outcomes = [_OutcomeClaim() for _ in tools]
+        start = time.perf_counter()
+        with deadline_scope(tool_deadline):
+            futures = [self._tool_executor.submit(contextvars.copy_context().run, self._run_tool, tool, query, outcome)
+                       for tool, outcome in zip(tools, outcomes)]
+        done, _ = wait(futures, timeout=tool_deadline.remaining())
+        
+        results = []
+        for tool, future, outcome in zip(tools, futures, outcomes):
+            tool_name = tool.metadata.name
+            if future in done:
+                result = future.result()
+            else:
+                # Cancels calls still queued; running ones stop at their next wait, all of
+                # which (SQL, DuckDB, LLM rate limit, shared calls, partitions) end at the deadline.
+                # A call still running counts as slow now, so a hanging dependency opens its
+                # circuit and stops taking executor workers instead of holding all of them
+                if not future.cancel() and outcome.claim():
+                    self.circuit_breakers.get(tool_name).record(True, time.perf_counter() - start, slow=True)
+                logger.warning(f"Tool {tool_name} missed the query deadline")
+                result = ToolResult.failure(f"{tool_name} did not respond within the deadline", timed_out=True)
+            results.append((tool_name, tool.metadata.description, result))
+        return results
     
-    def query(self, question: str, verbose: bool = None) -> str:
+    def _synthesize_results(self, question: str, results: List[Dict[str, Any]],
+                            unavailable: List[str] = ()) -> str:
+        """Combine results from several tools into one answer
+        
+        Tool results are rendered to text here, at synthesis time, and nowhere earlier.
+        The context compressor keeps only the sentences and rows relevant to the
+        question, within a fixed token budget, so the prompt does not grow with
+        the number of tools.
+        
+        Args:
+            question: User's financial question
+            results: List of dicts with 'tool' and 'result' keys
+            unavailable: Names of tools that missed the deadline or whose circuit is open
+            
+        Returns:
+            Synthesized answer (the compressed tool results if the deadline has passed)
+        """
+        if self.context_compressor is not None:
+            compressed, self._query_state.compression = self.context_compressor.compress(
+                question, results, extra_keywords=self.entity_resolver.symbols(question)
+            )
+        else:
+            compressed = [{"tool": item["tool"], "text": render_result(item["result"])} for item in results]
+        sections = "\n\n".join(f"=== {item['tool']} ===\n{item['text']}" for item in compressed)
+        prompt = synthesis_prompt(question, sections, unavailable).render()
+        try:
+            return str(self._complete(prompt, "synthesis"))
+        except Exception as e:
+            logger.warning(f"Synthesis failed, returning raw tool results: {e}")
+            return sections
+    
+    def query(self, question: str, verbose: bool = None, deadline_ms: float = None) -> str:
         """Process query with dynamic tool routing and result synthesis
         
         This is the main entry point for the financial agent. It handles:
@@ -246,6 +548,9 @@ class AgentCoordinator:
         Args:
             question: User's financial question
             verbose: Whether to show detailed processing info
+            deadline_ms: Time budget for the whole answer. Routing, tools and
+                synthesis share it; tools that miss it are dropped and the answer
+                is built from the sources that responded, naming the others.
             
         Returns:
             Comprehensive answer synthesized from relevant tools
@@ -263,15 +568,69 @@ class AgentCoordinator:
         if verbose:
             print(f"🎯 Query: {question}")
         
-        # TODO: Implement query processing workflow
-        # 1. Route query to appropriate tools using _route_query()
-        # 2. Display tool selection info if verbose
-        # 3. If single tool result, return it directly
-        # 4. If multiple tool results, synthesize using LLM
-        # 5. Return comprehensive answer
-        # YOUR CODE HERE
+        deadline = Deadline.from_ms(deadline_ms) if deadline_ms is not None else None
+        with self.usage_tracker.query() as usage, deadline_scope(deadline):
+            answer = self._answer(question, verbose)
         
-        return "Query method not implemented yet - complete the YOUR CODE HERE sections"
+        if verbose:
+            print(f"🧮 LLM usage: {usage.calls} calls, {usage.total_tokens} tokens, "
+                  f"{usage.latency:.2f}s, ${usage.cost:.4f}")
+        return answer
+    
+    @property
+    def last_compression(self) -> Optional[CompressionStats]:
+        """Compression statistics of the last query answered on the calling thread (None if not compressed)"""
+        return getattr(self._query_state, "compression", None)
+    
+    def _answer(self, question: str, verbose: bool) -> str:
+        """Route, execute and synthesize one question"""
+        self._query_state.compression = None
+        try:
+            routed = self._route_query(question)
+        except Exception as e:
+            logger.error(f"Routing failed: {e}")
+            return f"Unable to process query: {e}"
+        
+        if verbose:
+            print(f"🔧 Tools selected: {[name for name, _, _ in routed] or 'none'}")
+        
+        if not routed:
+            return "No relevant tools were found to answer this question."
+        
+        # Sources that missed the deadline or are behind an open circuit
+        missing = {}
+        for name, _, result in routed:
+            if isinstance(result, ToolResult) and result.metadata.get("timed_out"):
+                missing[name] = "no response within the deadline"
+            elif isinstance(result, ToolResult) and result.metadata.get("circuit_open"):
+                missing[name] = "temporarily unavailable"
+        answered = [(name, result) for name, _, result in routed if name not in missing]
+        reasons = "; ".join(f"{name}: {reason}" for name, reason in missing.items())
+        if not answered:
+            return f"No source could answer right now ({reasons}). Please try again."
+        
+        if len(answered) == 1:
+            answer = render_result(answered[0][1])
+        else:
+            answer = self._synthesize_results(
+                question, [{"tool": name, "result": result} for name, result in answered], unavailable=list(missing)
+            )
+        if missing:
+            answer += f"\n\n⚠️ Partial answer - {reasons}."
+        return answer
+    
+    def list_available_tools(self) -> List[Dict[str, str]]:
+        """
+        List every tool with its name, type and description.
+        
+        Returns:
+            List of dictionaries, document tools first
+        """
+        return [
+            {"name": tool.metadata.name, "type": kind, "description": tool.metadata.description}
+            for kind, tools in (("document", self.document_tools), ("function", self.function_tools))
+            for tool in tools
+        ]
     
     def get_available_tools(self) -> Dict[str, Any]:
         """
@@ -315,5 +674,9 @@ class AgentCoordinator:
                 "Multi-tool coordination",
                 "Intelligent routing"
             ],
-            "system_ready": system_ready
+            "system_ready": system_ready,
+            "llm_usage": self.usage_tracker.summary(),
+            "coalesced_tool_calls": self.single_flight.summary(),
+            "routing_prompts": dict(self.routing_prompts.stats),
+            "circuit_breakers": self.circuit_breakers.snapshot()
         }
@@ -0,0 +1,250 @@
+"""
+Analytics Engine Module - Columnar execution of aggregate-heavy SQL
+
+SQLite is row-oriented: rollups over millions of holdings or years of
+market_data read every column of every row. This module runs such queries in
+DuckDB, an in-process columnar engine, against the same financial.db, while
+point lookups stay on SQLite where the indexes answer them directly.
+
+Key Concepts:
+1. Shape-Based Routing: GROUP BY, window functions and aggregates go to the
+   columnar engine unless the query is pinned to one customer or symbol
+2. Same Results: Queries using constructs whose results differ between the two
+   engines (case-sensitive LIKE, float division, SQLite date functions) stay
+   on SQLite; NULLs sort first ascending, as in SQLite
+3. Same Database File: DuckDB attaches financial.db read-only through its sqlite
+   extension; when the extension cannot be loaded (e.g. offline), the tables
+   are copied into in-memory columnar tables
+4. Background Loading: Connecting and (re)loading snapshots happen on a
+   background thread, at most once per refresh interval; until the engine is
+   ready, or while its snapshot is older than the database file, it raises
+   ColumnarUnavailable and callers use SQLite. Quote write-backs into
+   market_data do not make the snapshot stale; they are picked up by the next
+   background reload
+5. Optional Dependency: Without duckdb installed everything runs on SQLite
+6. Safe Fallback: Callers re-run a query on SQLite if DuckDB rejects it
+7. Bounded Execution: Queries are interrupted past a wall-clock limit or the
+   query deadline, whichever comes first
+8. Concurrent Queries: Each query runs on its own cursor of the shared connection
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+from .deadlines import DeadlineExceeded, bounded_timeout
+from .query_guard import QueryTimeout
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_SELECT = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_GROUP_BY = re.compile(r"\bgroup\s+by\b", re.IGNORECASE)
+_WINDOW = re.compile(r"\bover\s*\(", re.IGNORECASE)
+_AGGREGATE = re.compile(r"\b(sum|avg|count|min|max|total|median|stddev\w*)\s*\(", re.IGNORECASE)
+# Equality on an indexed key with a literal: answered by an index search in SQLite
+_POINT_FILTER = re.compile(
+    r"\b(?:\w+\.)?(?:id|customer_id)\s*=\s*\d+|\b(?:\w+\.)?symbol\s*=\s*'[^']*'",
+    re.IGNORECASE,
+)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# Constructs DuckDB evaluates differently from SQLite: LIKE/GLOB case sensitivity, '/' on
+# integers (float division in DuckDB), and SQLite's date/time and formatting functions
+_DIALECT_SENSITIVE = re.compile(
+    r"\b(?:like|glob|regexp)\b|/|\b(?:strftime|julianday|unixepoch|date|datetime|time|printf|typeof)\s*\(",
+    re.IGNORECASE,
+)
+NULL_ORDER = "nulls_first_on_asc_last_on_desc"  # SQLite's NULL ordering
+
+
+class ColumnarUnavailable(RuntimeError):
+    """The columnar engine is not loaded, or its snapshot is older than the database"""
+
+
+def is_portable_query(sql: str) -> bool:
+    """True if the query uses no construct whose result differs between SQLite and DuckDB"""
+    return not _DIALECT_SENSITIVE.search(_STRING_LITERAL.sub("''", sql))
+
+
+def is_analytical_query(sql: str) -> bool:
+    """True for read-only queries that aggregate over many rows and give the same result in DuckDB"""
+    if not _SELECT.match(sql):
+        return False
+    aggregates = _GROUP_BY.search(sql) or _WINDOW.search(sql) or _AGGREGATE.search(sql)
+    return bool(aggregates) and not _POINT_FILTER.search(sql) and is_portable_query(sql)
+
+
+class ColumnarAnalyticsEngine:
+    """Runs SQL against financial.db in DuckDB"""
+
+    def __init__(self, db_path: Path, refresh_interval: float = 60.0):
+        """Initialize the engine (the DuckDB connection is opened by load())
+
+        Args:
+            db_path: Path to financial.db
+            refresh_interval: Minimum seconds between background snapshot reloads
+        """
+        if duckdb is None:
+            raise ImportError("duckdb is not installed")
+        self.db_path = Path(db_path)
+        self.refresh_interval = refresh_interval
+        self.mode: Optional[str] = None  # 'attached' or 'snapshot'
+        self._conn = None
+        self._loaded_mtime: Optional[int] = None  # database mtime the snapshot was taken at
+        self._absorbed_writes = False  # quote write-backs the snapshot does not hold yet
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._last_load = float("-inf")
+
+    def _mtime(self) -> int:
+        return os.stat(self.db_path).st_mtime_ns
+
+    def load(self) -> str:
+        """Connect (or reload the snapshot) synchronously and return the mode
+
+        A new connection is built off to the side and swapped in, so queries keep
+        running on the previous one until the load completes.
+        """
+        with self._load_lock:
+            mtime = self._mtime()
+            conn = duckdb.connect(":memory:")
+            conn.execute(f"SET default_null_order = '{NULL_ORDER}'")
+            try:
+                conn.execute(f"ATTACH '{self.db_path}' AS financial (TYPE SQLITE, READ_ONLY)")
+                conn.execute("USE financial")
+                mode = "attached"
+            except duckdb.Error as e:
+                if self.mode is None:
+                    logger.info(f"DuckDB sqlite extension unavailable, using columnar snapshots: {e}")
+                self._copy_tables(conn)
+                mode = "snapshot"
+            with self._lock:
+                # The previous connection is dropped, not closed: cursors still running
+                # on it keep its database alive until they finish
+                self._conn = conn
+                self.mode, self._loaded_mtime = mode, mtime
+                self._absorbed_writes = False
+            return mode
+
+    def _copy_tables(self, conn):
+        source = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            tables = [name for (name,) in source.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            for table in tables:
+                frame = pd.read_sql_query(f'SELECT * FROM "{table}"', source)
+                conn.register("_snapshot_frame", frame)
+                conn.execute(f'CREATE TABLE "{table}" AS SELECT * FROM _snapshot_frame')
+                conn.unregister("_snapshot_frame")
+        finally:
+            source.close()
+
+    def load_in_background(self, force: bool = False):
+        """Start load() on a background thread unless one is running or ran within the refresh interval"""
+        with self._lock:
+            if self._loader is not None and self._loader.is_alive():
+                return
+            if not force and time.monotonic() - self._last_load < self.refresh_interval:
+                return
+            self._last_load = time.monotonic()
+            self._loader = threading.Thread(target=self._load_logged, name="duckdb-loader")
+            self._loader.start()
+
+    def _load_logged(self):
+        try:
+            self.load()
+        except Exception as e:
+            logger.warning(f"Columnar engine could not load {self.db_path}: {e}")
+
+    def execute(self, sql: str, timeout: float = None, max_rows: int = None) -> Tuple[list, list]:
+        """Execute a query and return (rows, column_names)
+
+        Args:
+            sql: Query to run
+            timeout: Wall-clock limit in seconds (capped to the query deadline); the query
+                is interrupted past it
+            max_rows: Read at most this many rows
+
+        Raises:
+            ColumnarUnavailable: The engine is still loading or its snapshot is stale
+                (a background reload is scheduled)
+            DeadlineExceeded: The query deadline passed before or while the query ran
+        """
+        limit = bounded_timeout(timeout)
+        if limit is not None and limit <= 0:
+            raise DeadlineExceeded("columnar query started after the query deadline")
+        with self._lock:
+            conn = self._conn
+            ready = conn is not None and (self.mode == "attached" or self._loaded_mtime == self._mtime())
+            catch_up = ready and self._absorbed_writes
+        if not ready:
+            self.load_in_background(force=conn is None)
+            raise ColumnarUnavailable("columnar engine is loading")
+        if catch_up:
+            self.load_in_background()
+        # Each query runs on its own cursor, so queries run concurrently and the
+        # lock is held only to read the current connection
+        cursor = conn.cursor()
+        timer = threading.Timer(limit, cursor.interrupt) if limit else None
+        if timer:
+            timer.start()
+        try:
+            cursor.execute(sql)
+            rows = cursor.fetchmany(max_rows) if max_rows else cursor.fetchall()
+            return rows, [col[0] for col in cursor.description or []]
+        except duckdb.InterruptException as e:
+            if timeout is None or limit < timeout:
+                raise DeadlineExceeded(f"columnar query cut short by the query deadline after {limit:.2f}s",
+                                       started=True) from e
+            raise QueryTimeout(f"Query cancelled after {timeout:g}s. Add filters or aggregate further.") from e
+        finally:
+            if timer:
+                timer.cancel()
+            cursor.close()
+
+    @contextmanager
+    def quote_write(self):
+        """Wrap a market_data quote write-back so it does not mark the snapshot stale
+
+        A snapshot that was current before the write stays in use; the new quotes
+        reach it with the next background reload, at most one refresh interval later.
+        """
+        with self._lock:
+            current = self.mode == "snapshot" and self._loaded_mtime == self._mtime()
+        yield
+        if current:
+            with self._lock:
+                self._loaded_mtime = self._mtime()
+                self._absorbed_writes = True
+
+    def close(self):
+        loader = self._loader
+        if loader is not None and loader is not threading.current_thread():
+            loader.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_analytics_engine(db_path: Path) -> Optional[ColumnarAnalyticsEngine]:
+    """Return a columnar engine for the database, or None if duckdb or the database is missing"""
+    if duckdb is None or not Path(db_path).exists():
+        return None
+    engine = ColumnarAnalyticsEngine(db_path)
+    engine.load_in_background()
+    return engine
@@ -0,0 +1,221 @@
+"""
+Circuit Breaker Module - Per-dependency health tracking and fast failure
+
+When the market API or the LLM endpoint degraded, every query kept calling it,
+waiting for timeouts and retries, and latency piled up. A circuit breaker per
+dependency watches recent calls; once too many fail or run slow it opens and
+callers fail immediately (to a cached or local fallback) until a probe call
+shows the dependency has recovered.
+
+Key Concepts:
+1. Sliding Window: The last `window_size` calls within `window_seconds` are
+   kept with their outcome and latency
+2. Trip Conditions: The breaker opens when, over at least `min_calls` calls,
+   the error rate or the slow-call rate reaches its threshold
+3. States: closed (calls flow), open (calls rejected for `open_seconds`),
+   half_open (a few probe calls decide between closing and re-opening)
+4. Fast Failure: allow() is a cheap check, so an open breaker costs nothing;
+   the caller chooses the fallback
+5. Neutral and Slow Outcomes: Calls the caller never made (e.g. its query
+   deadline passed first) are discarded; calls the caller stopped waiting for
+   while the dependency was still working are recorded as slow, so a hanging
+   dependency still trips its breaker
+6. Health Snapshot: State, rates and latency percentiles per breaker for get_status()
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of call outcomes"""
+
+    def __init__(self, name: str, window_size: int = 20, window_seconds: float = 60.0, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_seconds: float = 10.0, slow_call_rate: float = 0.8,
+                 open_seconds: float = 30.0, half_open_calls: int = 1, clock: Callable[[], float] = time.monotonic):
+        """Initialize the breaker
+
+        Args:
+            name: Dependency name (tool or endpoint)
+            window_size: Maximum number of recent calls considered
+            window_seconds: Calls older than this are forgotten
+            min_calls: Calls needed in the window before the breaker can trip
+            failure_rate: Error rate (0-1) that opens the breaker
+            slow_call_seconds: Calls taking longer than this count as slow
+            slow_call_rate: Slow-call rate (0-1) that opens the breaker
+            open_seconds: Time calls are rejected before probing again
+            half_open_calls: Probe calls allowed while half open
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.name = name
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+
+        self.state = CLOSED
+        self.rejected = 0
+        self._calls: Deque[Tuple[float, bool, float, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _rates(self) -> Tuple[float, float]:
+        count = len(self._calls)
+        if not count:
+            return 0.0, 0.0
+        failures = sum(1 for _, ok, _, _ in self._calls if not ok)
+        slow = sum(1 for *_, is_slow in self._calls if is_slow)
+        return failures / count, slow / count
+
+    def _transition(self, state: str, now: float):
+        if state != self.state:
+            logger.warning(f"Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = now
+        self._probes = 0
+
+    def allow(self) -> bool:
+        """True if a call may be made now (reserves a probe slot while half open)"""
+        with self._lock:
+            now = self.clock()
+            if self.state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN, now)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success: bool, latency: float, slow: bool = None):
+        """Record the outcome of a call made after allow()
+
+        Args:
+            success: Whether the call succeeded
+            latency: Seconds the call took (or ran before the caller stopped waiting)
+            slow: Overrides the slow_call_seconds test, e.g. for a call abandoned
+                while still running
+        """
+        with self._lock:
+            now = self.clock()
+            slow = latency > self.slow_call_seconds if slow is None else slow
+            if self.state == HALF_OPEN:
+                if success and not slow:
+                    self._calls.clear()
+                    self._transition(CLOSED, now)
+                else:
+                    self._transition(OPEN, now)
+                return
+            self._calls.append((now, success, latency, slow))
+            self._prune(now)
+            if self.state == CLOSED and len(self._calls) >= self.min_calls:
+                error_rate, slow_rate = self._rates()
+                if error_rate >= self.failure_rate or slow_rate >= self.slow_call_rate:
+                    self._transition(OPEN, now)
+
+    def discard(self):
+        """Release a call made after allow() without counting its outcome"""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def call(self, fn: Callable[[], Any], is_failure: Callable[[Any], bool] = None,
+             is_neutral: Callable[[Exception], bool] = None, is_slow: Callable[[Exception], bool] = None) -> Any:
+        """Run fn through the breaker; raises CircuitOpenError when open
+
+        Args:
+            fn: The dependency call
+            is_failure: Classifies a returned value as a failure (exceptions always are)
+            is_neutral: Exceptions for which it returns True are discarded, not recorded
+            is_slow: Exceptions for which it returns True are recorded as slow calls
+                rather than failures (the caller stopped waiting, the dependency did not fail)
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            if is_neutral is not None and is_neutral(e):
+                self.discard()
+            elif is_slow is not None and is_slow(e):
+                self.record(True, time.perf_counter() - start, slow=True)
+            else:
+                self.record(False, time.perf_counter() - start)
+            raise
+        self.record(not (is_failure and is_failure(result)), time.perf_counter() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and window statistics"""
+        with self._lock:
+            now = self.clock()
+            self._prune(now)
+            error_rate, slow_rate = self._rates()
+            latencies = sorted(latency for _, _, latency, _ in self._calls)
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0
+            return {
+                "state": self.state,
+                "calls": len(self._calls),
+                "error_rate": round(error_rate, 3),
+                "slow_call_rate": round(slow_rate, 3),
+                "p95_latency_s": round(p95, 3),
+                "rejected": self.rejected,
+                "retry_in_s": round(max(0.0, self.open_seconds - (now - self._opened_at)), 1)
+                if self.state == OPEN else 0.0,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Named breakers sharing one configuration"""
+
+    def __init__(self, **config):
+        """Initialize the registry
+
+        Args:
+            **config: CircuitBreaker keyword arguments used for every breaker
+        """
+        self.config = config
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, **overrides) -> CircuitBreaker:
+        """Return the breaker for a dependency, creating it on first use"""
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, **{**self.config, **overrides})
+            return self._breakers[name]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+    def open_circuits(self) -> list:
+        return [name for name, status in self.snapshot().items() if status["state"] == OPEN]
@@ -0,0 +1,218 @@
+"""
+Context Compression Module - Extractive compression of tool results before synthesis
+
+When several tools answer one question, every raw result (10-K answers, SQL
+rows, quotes) used to be pasted into the synthesis prompt, so its size grew with
+the number of tools. This module keeps only the sentences and rows most
+relevant to the question within a fixed token budget, so synthesis cost stays
+flat however many tools fire. Everything runs locally, without LLM calls.
+
+Key Concepts:
+1. Units: Text results are split into sentences; database results into rows
+2. Relevance: Each unit is scored by embedding similarity to the question
+   (local hashed embeddings) blended with keyword overlap, where resolved
+   tickers count as keywords
+3. Hard Budget: Units are added best-first until the token budget is used up;
+   every tool keeps at least its best unit if it fits
+4. Original Order: Kept units are emitted in their original order, with
+   omitted text marked and row truncation noted
+5. Pass-Through: Results that already fit the budget are left untouched
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .llm_usage import count_tokens
+from .sql_examples import HashingEmbedder
+from .tool_results import ToolResult, render_result
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9$\"'(])|\n+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by do does for from has have how i in is it its me of on or our show "
+    "tell that the their this to was were what when which who why will with".split()
+)
+OMITTED = "[...]"
+
+
+def keywords(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+@dataclass
+class _Unit:
+    """A sentence or row that can be kept or dropped"""
+
+    source: int
+    index: int
+    text: str
+    tokens: int
+    score: float = 0.0
+
+
+@dataclass
+class CompressionStats:
+    """What compression did to one synthesis prompt"""
+
+    original_tokens: int = 0
+    compressed_tokens: int = 0
+    kept_units: int = 0
+    total_units: int = 0
+    seconds: float = 0.0
+
+
+class ContextCompressor:
+    """Keeps the tool-result sentences and rows most relevant to a question within a token budget"""
+
+    def __init__(self, token_budget: int = 1500, keyword_weight: float = 0.5, min_score: float = 0.05,
+                 embedder: Callable[[str], np.ndarray] = None, model: str = "gpt-3.5-turbo"):
+        """Initialize the compressor
+
+        Args:
+            token_budget: Maximum tokens of tool results passed to synthesis
+            keyword_weight: Weight of keyword overlap against embedding similarity (0-1)
+            min_score: Units scoring below this are dropped even if they would fit
+            embedder: Text -> vector function (default: local hashed bag-of-words)
+            model: Model whose tokenizer counts tokens
+        """
+        self.token_budget = token_budget
+        self.keyword_weight = keyword_weight
+        self.min_score = min_score
+        self.embedder = embedder or HashingEmbedder()
+        self.model = model
+
+    def _tokens(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedder(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _split(self, source: int, result: Any) -> Tuple[int, List[_Unit], Callable[[List[int]], str]]:
+        """Return (fixed overhead tokens, units, function rendering the kept unit indexes)"""
+        if isinstance(result, ToolResult) and result.ok and result.columns and result.rows:
+            units = [_Unit(source, i, repr(row), self._tokens(repr(row)))
+                     for i, row in enumerate(result.as_dicts())]
+            total_rows = result.metadata.get("total_rows", result.row_count)
+
+            def render_rows(kept: List[int]) -> str:
+                if len(kept) == result.row_count:
+                    return result.render()
+                return result.with_rows([result.rows[i] for i in kept], truncated=True,
+                                        total_rows=total_rows).render()
+
+            return self._tokens(render_rows([])), units, render_rows
+
+        sentences = [s.strip() for s in _SENTENCE_BREAK.split(render_result(result)) if s and s.strip()]
+        units = [_Unit(source, i, sentence, self._tokens(sentence)) for i, sentence in enumerate(sentences)]
+
+        def render_sentences(kept: List[int]) -> str:
+            parts = []
+            for position, i in enumerate(kept):
+                if position and i != kept[position - 1] + 1:
+                    parts.append(OMITTED)
+                parts.append(sentences[i])
+            if kept and kept[-1] != len(sentences) - 1:
+                parts.append(OMITTED)
+            return " ".join(parts)
+
+        return 0, units, render_sentences
+
+    def _score(self, question: str, extra_keywords: Iterable[str], units: List[_Unit]):
+        query_terms = keywords(question) | {k.lower() for k in extra_keywords}
+        query_vector = self._embed(question + " " + " ".join(extra_keywords))
+        if not units:
+            return
+        matrix = np.vstack([self._embed(unit.text) for unit in units])
+        similarities = matrix @ query_vector
+        for unit, similarity in zip(units, similarities):
+            overlap = len(query_terms & keywords(unit.text)) / len(query_terms) if query_terms else 0.0
+            unit.score = (1 - self.keyword_weight) * float(similarity) + self.keyword_weight * overlap
+
+    def _render(self, sources, results: List[Dict[str, Any]], kept: Dict[int, List[_Unit]]) -> List[Dict[str, str]]:
+        sections = []
+        for source, ((_, source_units, render), item) in enumerate(zip(sources, results)):
+            indexes = sorted(unit.index for unit in kept[source])
+            if indexes:
+                text = render(indexes)
+            elif source_units:
+                text = f"(nothing relevant to the question; {len(source_units)} items omitted)"
+            else:
+                text = render_result(item["result"])
+            sections.append({"tool": item["tool"], "text": text})
+        return sections
+
+    def compress(self, question: str, results: List[Dict[str, Any]],
+                 extra_keywords: Iterable[str] = ()) -> Tuple[List[Dict[str, str]], CompressionStats]:
+        """Compress tool results for a synthesis prompt
+
+        Args:
+            question: User's question
+            results: List of dicts with 'tool' and 'result' keys
+            extra_keywords: Terms that mark relevant units (e.g. resolved tickers)
+
+        Returns:
+            (list of dicts with 'tool' and 'text', compression statistics)
+        """
+        start = time.perf_counter()
+        extra_keywords = list(extra_keywords)
+        sources = [self._split(source, item["result"]) for source, item in enumerate(results)]
+        units = [unit for _, source_units, _ in sources for unit in source_units]
+        stats = CompressionStats(
+            original_tokens=sum(overhead + sum(u.tokens for u in source_units)
+                                for overhead, source_units, _ in sources),
+            total_units=len(units),
+        )
+
+        if stats.original_tokens <= self.token_budget:
+            sections = [{"tool": item["tool"], "text": render_result(item["result"])} for item in results]
+            stats.compressed_tokens, stats.kept_units = stats.original_tokens, len(units)
+            stats.seconds = time.perf_counter() - start
+            return sections, stats
+
+        self._score(question, extra_keywords, units)
+        remaining = self.token_budget - sum(overhead for overhead, _, _ in sources)
+        kept: Dict[int, List[_Unit]] = {source: [] for source in range(len(sources))}
+
+        # Every tool first keeps its best unit, then the best of the rest fill the
+        # budget; each unit is charged one extra token for separators and markers
+        best_per_source = [max(source_units, key=lambda u: u.score) for _, source_units, _ in sources if source_units]
+        firsts = {(u.source, u.index) for u in best_per_source}
+        others = sorted((u for u in units if (u.source, u.index) not in firsts), key=lambda u: u.score, reverse=True)
+        for position, unit in enumerate(sorted(best_per_source, key=lambda u: u.score, reverse=True) + others):
+            if unit.tokens + 1 > remaining or (position >= len(best_per_source) and unit.score < self.min_score):
+                continue
+            kept[unit.source].append(unit)
+            remaining -= unit.tokens + 1
+
+        sections = self._render(sources, results, kept)
+        stats.compressed_tokens = sum(self._tokens(section["text"]) for section in sections)
+        # Hard budget: drop the weakest kept units, subtracting their token counts from
+        # the excess, then render once; repeat only if omission markers still overflow
+        while stats.compressed_tokens > self.token_budget and any(kept.values()):
+            excess = stats.compressed_tokens - self.token_budget
+            dropped = set()
+            for unit in sorted((u for source_units in kept.values() for u in source_units), key=lambda u: u.score):
+                if excess <= 0:
+                    break
+                dropped.add((unit.source, unit.index))
+                excess -= unit.tokens + 1
+            kept = {source: [u for u in source_units if (u.source, u.index) not in dropped]
+                    for source, source_units in kept.items()}
+            sections = self._render(sources, results, kept)
+            stats.compressed_tokens = sum(self._tokens(section["text"]) for section in sections)
+
+        stats.kept_units = sum(len(source_units) for source_units in kept.values())
+        stats.seconds = time.perf_counter() - start
+        logger.info(f"Compressed tool results from {stats.original_tokens} to {stats.compressed_tokens} tokens "
+                    f"({stats.kept_units}/{stats.total_units} units) in {stats.seconds * 1000:.1f}ms")
+        return sections, stats
@@ -0,0 +1,138 @@
+"""
+Deadlines Module - Per-query time budgets propagated to every stage
+
+A query used to take as long as its slowest dependency: a slow 10-K engine or a
+hanging quote request stalled the whole answer. A Deadline is created once per
+query and carried in a context variable, so routing, every tool and synthesis
+see the same budget without threading a parameter through each call, and
+blocking calls cap their own waits to the time that is left.
+
+Key Concepts:
+1. Absolute Deadline: A monotonic expiry time; remaining() shrinks as stages run
+2. Context Propagation: deadline_scope() sets the deadline for the current
+   context; worker threads inherit it through contextvars.copy_context()
+3. Nesting: An inner scope can only tighten the deadline, never extend it
+4. Reserves: Stages can stop early (e.g. tools end before synthesis) by taking
+   a deadline that expires a reserved amount of time before the query's
+5. Bounded Waits: bounded_timeout() turns a configured timeout into
+   min(timeout, time remaining)
+6. Attribution: DeadlineExceeded records whether the dependency had already
+   been called. stopped_before_call() marks the only outcome that says
+   nothing about a dependency's health (it was never called); calls cut short
+   while running count as slow. cut_short_by_deadline() marks every outcome
+   our budget may have shaped, which is not shared with callers that have more time
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when work is started or continued after the query deadline"""
+
+    def __init__(self, message: str = "", started: bool = False):
+        """Create the error
+
+        Args:
+            message: What was cut short
+            started: True if the dependency had been called and was still working
+                (the deadline cut it short), False if it was never called
+        """
+        super().__init__(message)
+        self.started = started
+
+
+class Deadline:
+    """Point in (monotonic) time by which a query must be answered"""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        """Create a deadline `seconds` from now
+
+        Args:
+            seconds: Time budget
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.clock = clock
+        self.budget = max(0.0, seconds)
+        self.expires_at = clock() + self.budget
+
+    @classmethod
+    def from_ms(cls, milliseconds: float, **kwargs) -> "Deadline":
+        return cls(milliseconds / 1000.0, **kwargs)
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired)"""
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str = "operation"):
+        """Raise DeadlineExceeded if the deadline has passed"""
+        if self.expired():
+            raise DeadlineExceeded(f"{stage} exceeded the {self.budget * 1000:.0f}ms deadline")
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """Deadline expiring `seconds` before this one (never before now)"""
+        earlier = Deadline(0.0, clock=self.clock)
+        earlier.budget = self.budget
+        earlier.expires_at = max(earlier.expires_at, self.expires_at - seconds)
+        return earlier
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining() * 1000:.0f}ms of {self.budget * 1000:.0f}ms)"
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the query running in this context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Run the block under a deadline (the tighter one if a deadline is already set)"""
+    outer = _current.get()
+    if deadline is None or (outer is not None and outer.expires_at <= deadline.expires_at):
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def stopped_before_call(error: Optional[BaseException]) -> bool:
+    """True if the deadline passed before the dependency was called (nothing to hold against it)"""
+    return isinstance(error, DeadlineExceeded) and not error.started
+
+
+def cut_short_by_deadline(error: Optional[BaseException] = None) -> bool:
+    """True if an outcome in this context may have been cut short by the query deadline
+
+    That is DeadlineExceeded, and anything completing after the deadline passed
+    (a timeout capped by bounded_timeout(), an abandoned wait, a partial result).
+    Such outcomes are not shared with callers that have more time; for a
+    dependency's health only stopped_before_call() outcomes are ignored.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return True
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired()
+
+
+def bounded_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Cap a timeout (None = unbounded) to the time left before the current deadline"""
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    return remaining if timeout is None else min(timeout, remaining)
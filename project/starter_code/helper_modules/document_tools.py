@@ -10,8 +10,6 @@ Learning Objectives:
 - Build QueryEngineTool objects for document analysis
 - Configure LLM and embedding models
 
-Your Task: Complete the missing implementations marked with YOUR CODE HERE
-
 Key Concepts:
 1. LlamaIndex Settings: Configure global LLM and embedding models
 2. Document Processing: Load PDFs and split into chunks
@@ -21,16 +19,23 @@ Key Concepts:
 """
 
 import logging
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 # LlamaIndex imports
-from llama_index.core import SimpleDirectoryReader, Settings
+from llama_index.core import SimpleDirectoryReader
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core import VectorStoreIndex
 from llama_index.core.tools import QueryEngineTool
-from llama_index.llms.openai import OpenAI
-from llama_index.embeddings.openai import OpenAIEmbedding
+
+from .entity_resolver import FILING_PATTERN, get_entity_resolver
+from .filing_partitions import PartitionedFilingQueryEngine
+from .filing_summaries import FilingSummarizer, FilingSummaryQueryEngine, FilingSummaryStore, split_sections
+from .financial_tables import FinancialLookupQueryEngine, FinancialTableStore, extract_financial_tables
+from .llm_client import get_llm_client
+from .llm_usage import get_usage_tracker
+from .reranking import RerankedQueryEngine, default_scorer
 
 # Environment setup
 from dotenv import load_dotenv
@@ -42,27 +47,49 @@ logger = logging.getLogger(__name__)
 class DocumentToolsManager:
     """Manager for all document analysis tools"""
     
-    def __init__(self, companies: List[str] = None, verbose: bool = False):
+    def __init__(self, companies: List[str] = None, verbose: bool = False, rerank: bool = True,
+                 cross_encoder: str = None, precompute_summaries: bool = True):
         """Initialize document tools manager
         
         Args:
             companies: List of company symbols (default: ["AAPL", "GOOGL", "TSLA"])
             verbose: Whether to print detailed progress information
+            rerank: Over-retrieve and rerank chunks locally before synthesis
+            cross_encoder: Cross-encoder model for reranking (needs sentence-transformers;
+                default: lexical+embedding scorer)
+            precompute_summaries: Summarize each filing's sections once at build time
+                so broad questions are answered without retrieval
         """
         self.companies = companies if companies is not None else ["AAPL", "GOOGL", "TSLA"]
         self.verbose = verbose
         self.project_root = Path.cwd()  # Use current working directory
         self.documents_dir = self.project_root / "data" / "10k_documents"
         
-        # Company metadata
-        self.company_info = {
-            "AAPL": {"name": "Apple Inc.", "sector": "Technology"},
-            "GOOGL": {"name": "Alphabet Inc.", "sector": "Technology"},
-            "TSLA": {"name": "Tesla Inc.", "sector": "Automotive"}
-        }
+        # Company metadata from the shared entity resolver
+        self.entity_resolver = get_entity_resolver(self.project_root / "data" / "financial.db", self.documents_dir)
+        self.company_info = self.entity_resolver.company_info()
         
-        # Storage for tools
+        # Storage for tools and the per-company engines over their filing partitions
         self.document_tools = []
+        self.filing_engines: Dict[str, PartitionedFilingQueryEngine] = {}
+        
+        # Financial statement line items extracted from the filings, for exact numeric lookups
+        # (store opened by build_document_tools)
+        self.financial_tables: Optional[FinancialTableStore] = None
+        
+        # Precomputed section and whole-filing summaries for broad questions
+        # (store opened by build_document_tools)
+        self.precompute_summaries = precompute_summaries
+        self.filing_summaries: Optional[FilingSummaryStore] = None
+        
+        # Retrieval: fetch retrieve_top_k chunks, keep the best top_n for the LLM
+        self.rerank = rerank
+        self.retrieve_top_k = 12 if rerank else 3
+        self.top_n = 3
+        self.rerank_scorer = default_scorer(cross_encoder) if rerank else None
+        
+        # Process-wide LLM token/latency accounting
+        self.usage_tracker = get_usage_tracker()
         
         self._configure_settings()
         
@@ -72,28 +99,126 @@ class DocumentToolsManager:
     def _configure_settings(self):
         """Configure LlamaIndex settings with OpenAI models
         
-        TODO: Set up the global LlamaIndex settings for LLM and embeddings
+        Uses the process-wide LLM client: the OpenAI LLM (gpt-3.5-turbo, temperature=0)
+        and the text-embedding-ada-002 embedding model used by the query engines are
+        shared with the other managers and registered on Settings.
         
-        Requirements:
-        - Use OpenAI LLM with "gpt-3.5-turbo" model and temperature=0
-        - Use OpenAI embeddings with "text-embedding-ada-002" model
-        - Set these on Settings.llm and Settings.embed_model
+        Vocareum requires the api_base parameter, read from OPENAI_API_BASE.
+        """
+        self.llm = get_llm_client().configure_settings()
+    
+    def _precompute_summaries(self, company: str, documents: List, pdf_path: Path, year: int):
+        """Summarize a filing section by section, then as a whole, and store the summaries
         
-        IMPORTANT NOTE FOR VOCAREUM:
-        LlamaIndex requires the api_base parameter to work with Vocareum's OpenAI endpoint.
-        Get the base URL from environment: os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
-        Pass it as api_base parameter to both OpenAI() and OpenAIEmbedding() constructors.
+        Runs once per PDF version. Failures are logged and leave the tool without
+        summaries (broad questions then go to retrieval).
+        """
+        summarizer = FilingSummarizer(
+            lambda prompt: str(self.usage_tracker.complete(self.llm, prompt, "filing_summaries")))
+        try:
+            summaries = summarizer.summarize(self.company_info[company]["name"], split_sections(documents))
+        except Exception as e:
+            logger.warning(f"Could not precompute {company} FY{year} filing summaries: {e}")
+            return
+        self.filing_summaries.replace(company, summaries, source=pdf_path, filing_year=year)
+        if self.verbose:
+            print(f"   📝 {company} FY{year}: {len(summaries)} section summaries precomputed")
+    
+    def filing_paths(self, company: str) -> Dict[int, Path]:
+        """10-K PDFs of a company by fiscal year ({company}_10K_{year}.pdf)"""
+        paths = {}
+        for path in self.documents_dir.glob(f"{company}_10K_*.pdf"):
+            match = FILING_PATTERN.match(path.name)
+            if match and match.group(1).upper() == company:
+                paths[int(match.group(2))] = path
+        return dict(sorted(paths.items()))
+    
+    def _precompute_filing(self, company: str, year: int, pdf_path: Path) -> Optional[List]:
+        """Extract a filing's statement tables and summaries unless they are current
         
-        Hint: All necessary imports are already provided at the top of this file.
+        Returns:
+            The filing's pages if the PDF had to be loaded, else None
         """
-        # YOUR CODE HERE
-        pass
+        tables_current = self.financial_tables.is_current(company, pdf_path, year)
+        summaries_current = (not self.precompute_summaries
+                             or self.filing_summaries.is_current(company, pdf_path, year))
+        if tables_current and summaries_current:
+            return None
+        
+        # Load the PDF (one document per page)
+        documents = SimpleDirectoryReader(input_files=[str(pdf_path)]).load_data()
+        
+        # Extract the financial statements for exact numeric lookups
+        if not tables_current:
+            line_items = extract_financial_tables(company, documents)
+            self.financial_tables.replace(company, line_items, source=pdf_path, filing_year=year)
+            if self.verbose:
+                print(f"   📊 {company} FY{year}: {len(line_items)} financial statement values extracted")
+        
+        # Summaries for broad questions
+        if not summaries_current:
+            self._precompute_summaries(company, documents, pdf_path, year)
+        return documents
+    
+    def _build_filing_engine(self, company: str, year: int, pdf_path: Path, documents: List = None):
+        """Build the query engine of one filing partition (one company, one fiscal year)
+        
+        Numeric questions are answered from the filing's statement tables and broad
+        ones from its summaries (both precomputed by build_document_tools) before
+        falling back to retrieval over its own index.
+        
+        Args:
+            company: Ticker symbol
+            year: Fiscal year of the filing
+            pdf_path: The filing's PDF
+            documents: The filing's pages, if already loaded
+        """
+        company_name = self.company_info[company]["name"]
+        if documents is None:
+            documents = SimpleDirectoryReader(input_files=[str(pdf_path)]).load_data()
+        
+        # Split into chunks and tag them with company and filing metadata
+        splitter = SentenceSplitter(chunk_size=1024, chunk_overlap=200)
+        nodes = splitter.get_nodes_from_documents(documents)
+        for node in nodes:
+            node.metadata.update({
+                "company": company,
+                "company_name": company_name,
+                "document_type": "10-K",
+                "fiscal_year": year,
+            })
+        
+        # Vector index over this filing only
+        index = VectorStoreIndex(nodes)
+        if self.rerank:
+            retrieval_engine = RerankedQueryEngine.from_index(
+                index, retrieve_top_k=self.retrieve_top_k, top_n=self.top_n, scorer=self.rerank_scorer)
+        else:
+            retrieval_engine = index.as_query_engine(similarity_top_k=self.top_n)
+        summary_engine = FilingSummaryQueryEngine(
+            symbol=company,
+            company_name=company_name,
+            summaries=self.filing_summaries,
+            fallback=retrieval_engine,
+            filing_year=year,
+        )
+        if self.verbose:
+            print(f"   🗂️ {company} FY{year} partition indexed: {len(nodes)} chunks")
+        return FinancialLookupQueryEngine(
+            symbol=company,
+            company_name=company_name,
+            tables=self.financial_tables,
+            fallback=summary_engine,
+            filing_year=year,
+        )
     
     def build_document_tools(self):
         """Build document query engines for each company
         
-        Process each company's 10-K filing to create a searchable vector index
-        and wrap it in a QueryEngineTool for the agent to use.
+        Every {company}_10K_{year}.pdf is a partition with its own index; a company's
+        tool routes each question to the partitions of the years it asks about. The
+        statement tables and summaries of every filing are brought up to date now;
+        the latest filing is indexed now, older ones on first use.
         
         Returns:
             List of QueryEngineTool objects for document analysis
@@ -103,9 +228,13 @@ class DocumentToolsManager:
         
         # Clear existing tools first to avoid duplicates
         self.document_tools = []
+        self.filing_engines = {}
         
-        # TODO: Create a text splitter for chunking documents
-        # YOUR CODE HERE
+        # Derived stores live next to the database; they are only created when tools are built
+        if self.financial_tables is None:
+            self.financial_tables = FinancialTableStore(self.project_root / "data" / "financial_tables.db")
+        if self.filing_summaries is None:
+            self.filing_summaries = FilingSummaryStore(self.project_root / "data" / "filing_summaries.db")
         
         for company in self.companies:
             # Determine company name for tool description
@@ -116,27 +245,45 @@ class DocumentToolsManager:
             # Create tool name
             tool_name = f"{company}_10k_filing_tool"
             
-            # Determine PDF path
-            pdf_path = self.documents_dir / f"{company}_10K_2024.pdf"
-            
-            # Check if PDF exists
-            if not pdf_path.exists():
+            # Find the company's filings, one partition per fiscal year
+            pdf_paths = self.filing_paths(company)
+            if not pdf_paths:
                 if self.verbose:
-                    print(f"   ❌ PDF not found for {company}: {pdf_path}")
+                    print(f"   ❌ No 10-K PDF found for {company} in {self.documents_dir}")
                 continue
             
             try:
-                # TODO: Implement document processing pipeline
-                # YOUR CODE HERE
-                # - Load the PDF document
-                # - Split into chunks/nodes
-                # - Add metadata (company info, document type)
-                # - Build vector index
-                # - Create query engine
-                # - Wrap in QueryEngineTool with descriptive name and description
+                # Derived data of every filing, so lookups and broad questions never wait for a PDF
+                pages = {year: self._precompute_filing(company, year, path) for year, path in pdf_paths.items()}
+                
+                # Only the latest filing is indexed now, so only its pages are kept for reuse
+                latest = max(pdf_paths)
+                query_engine = PartitionedFilingQueryEngine(
+                    symbol=company,
+                    company_name=self.company_info[company]["name"],
+                    partitions={year: partial(self._build_filing_engine, company, year, path,
+                                              pages[year] if year == latest else None)
+                                for year, path in pdf_paths.items()},
+                )
+                query_engine.engine(latest)  # latest filing indexed up front; older ones lazily
+                self.filing_engines[company] = query_engine
+                
+                years = ", ".join(str(year) for year in pdf_paths)
+                tool = QueryEngineTool.from_defaults(
+                    query_engine=query_engine,
+                    name=tool_name,
+                    description=(
+                        f"Provides information from the {company_name.title()} ({company}) 10-K SEC filings "
+                        f"for fiscal years {years}: business overview, risk factors, management discussion and "
+                        f"exact figures from the financial statements (revenue, net income, EPS, assets, cash "
+                        f"flows), including year-over-year comparisons. "
+                        f"Use for questions about {company_name.title()}'s reported financials and operations."
+                    ),
+                )
+                self.document_tools.append(tool)
                 
                 if self.verbose:
-                    print(f"   ✅ {company} tool created: {tool_name}")
+                    print(f"   ✅ {company} tool created: {tool_name} (filings: {years})")
                     
             except Exception as e:
                 if self.verbose:
@@ -165,6 +312,7 @@ class DocumentToolsManager:
         """
         for tool in self.document_tools:
             if tool.metadata.name == tool_name:
-                result = tool.query_engine.query(question)
+                with self.usage_tracker.call_site(tool_name):
+                    result = tool.query_engine.query(question)
                 return str(result)
         return f"Tool {tool_name} not found"
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Entity Resolver Module - Company and ticker recognition shared by all tools
+
+This module maps company names, aliases and ticker symbols mentioned in free
+text to ticker symbols. It is built once from the companies table and the 10-K
+filing inventory and reused by routing, the market data tool and the SQL tool,
+so the whole system agrees on which companies a question is about.
+
+Key Concepts:
+1. One Compiled Pattern: Names, aliases and tickers are merged into a single
+   regular expression (longest alternatives first) and resolved in one linear pass
+2. Case Handling: Names and aliases match case-insensitively, tickers only in
+   upper case (or with a $ prefix) to avoid matching ordinary words; tickers
+   that spell a finance acronym (EPS, CEO, ETF, ...) need the $ prefix unless
+   the company has 10-K filings
+3. Fuzzy Fallback: Capitalized words that match nothing are compared against
+   known names (difflib similarity or swapped letters) to catch typos like "Telsa"
+"""
+
+import difflib
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Company metadata used when the companies table is not available
+DEFAULT_COMPANIES = {
+    "AAPL": {"name": "Apple Inc.", "sector": "Technology"},
+    "GOOGL": {"name": "Alphabet Inc.", "sector": "Technology"},
+    "TSLA": {"name": "Tesla Inc.", "sector": "Automotive"},
+}
+
+# Well-known names that cannot be derived from the legal company name
+DEFAULT_ALIASES = {
+    "AAPL": ["Apple", "iPhone maker"],
+    "GOOGL": ["Google", "Alphabet", "GOOG"],
+    "TSLA": ["Tesla", "Tesla Motors"],
+    "MSFT": ["Microsoft"],
+    "AMZN": ["Amazon"],
+}
+
+CORPORATE_SUFFIXES = re.compile(
+    r"[,\s]+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|holdings|group|n\.?v|s\.?a)\.?$",
+    re.IGNORECASE,
+)
+# All-caps words common in financial questions that are also valid ticker symbols
+TICKER_STOPWORDS = frozenset("""
+    AI API AUM CAGR CEO CFO COO CPI CTO DCF EBIT EPS ESG ETF EU EV FCF FED FOMC FX FY GAAP GDP HR IPO IRR IT
+    LLC LTD MD NAV NYSE OTC PE PEG PNL QOQ REIT ROA ROE ROI SEC TTM UK US USA USD YOY YTD
+""".split())
+
+FILING_PATTERN = re.compile(r"^([A-Z.\-]+)_10K_(\d{4})\.pdf$", re.IGNORECASE)
+_CAPITALIZED_WORD = re.compile(r"\b[A-Z][a-zA-Z]{3,}\b")
+
+
+@dataclass(frozen=True)
+class EntityMatch:
+    """A company mention found in text"""
+
+    symbol: str
+    text: str
+    start: int
+    end: int
+    kind: str  # 'name', 'alias', 'ticker' or 'fuzzy'
+    score: float = 1.0
+
+
+class EntityResolver:
+    """Resolve company names, aliases and tickers in free text to ticker symbols"""
+
+    def __init__(self, companies: Dict[str, dict], aliases: Dict[str, List[str]] = None,
+                 filings: Dict[str, List[int]] = None, fuzzy_cutoff: float = 0.85):
+        """Initialize the resolver
+
+        Args:
+            companies: Mapping symbol -> {'name': ..., 'sector': ...}
+            aliases: Extra surface forms per symbol
+            filings: Fiscal years with a 10-K filing per symbol
+            fuzzy_cutoff: Minimum difflib similarity for fuzzy matches
+        """
+        self.companies = {symbol.upper(): dict(info) for symbol, info in companies.items()}
+        self.filings = {symbol.upper(): sorted(years) for symbol, years in (filings or {}).items()}
+        self.fuzzy_cutoff = fuzzy_cutoff
+
+        # surface form (lower case) -> (symbol, kind)
+        self._forms: Dict[str, Tuple[str, str]] = {}
+        for symbol, info in self.companies.items():
+            name = info.get("name") or symbol
+            self._add_form(name, symbol, "name")
+            self._add_form(CORPORATE_SUFFIXES.sub("", name), symbol, "name")
+        for symbol, names in (aliases or {}).items():
+            if symbol.upper() in self.companies:
+                for alias in names:
+                    self._add_form(alias, symbol.upper(), "alias")
+
+        self._pattern = self._compile()
+
+    @classmethod
+    def from_sources(cls, db_path: Path = None, documents_dir: Path = None, **kwargs) -> "EntityResolver":
+        """Build a resolver from the companies table and the 10-K filing inventory"""
+        companies = {symbol: dict(info) for symbol, info in DEFAULT_COMPANIES.items()}
+        if db_path is not None and Path(db_path).exists():
+            try:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                try:
+                    for symbol, name, sector in conn.execute("SELECT symbol, name, sector FROM companies"):
+                        companies[symbol.upper()] = {"name": name, "sector": sector}
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read companies table: {e}")
+
+        filings: Dict[str, List[int]] = {}
+        if documents_dir is not None and Path(documents_dir).is_dir():
+            for path in Path(documents_dir).iterdir():
+                match = FILING_PATTERN.match(path.name)
+                if match:
+                    symbol = match.group(1).upper()
+                    filings.setdefault(symbol, []).append(int(match.group(2)))
+                    companies.setdefault(symbol, {"name": symbol, "sector": None})
+
+        return cls(companies, aliases=DEFAULT_ALIASES, filings=filings, **kwargs)
+
+    def _add_form(self, form: str, symbol: str, kind: str):
+        form = form.strip()
+        if len(form) >= 2:
+            self._forms.setdefault(form.lower(), (symbol, kind))
+
+    def _compile(self) -> "re.Pattern[str]":
+        """Compile names, aliases and tickers into a single alternation
+
+        Tickers in TICKER_STOPWORDS match bare only if the company has filings.
+        """
+        forms = sorted(self._forms, key=len, reverse=True)
+        tickers = sorted(self.companies, key=len, reverse=True)
+        bare = [ticker for ticker in tickers if ticker not in TICKER_STOPWORDS or ticker in self.filings]
+        name_part = "|".join(re.escape(form) for form in forms)
+        ticker_part = "|".join(re.escape(ticker) for ticker in tickers)
+        bare_part = "|".join(re.escape(ticker) for ticker in bare) or "(?!)"
+        return re.compile(
+            rf"(?<![\w$])(?:\$(?P<dollar_ticker>{ticker_part})|(?P<ticker>{bare_part})|(?i:(?P<name>{name_part})))"
+            rf"(?![\w])"
+        )
+
+    def resolve(self, text: str, fuzzy: bool = True) -> List[EntityMatch]:
+        """Find all company mentions in text, in order of appearance"""
+        matches = []
+        for match in self._pattern.finditer(text):
+            ticker = match.group("ticker") or match.group("dollar_ticker")
+            if ticker:
+                matches.append(EntityMatch(ticker, match.group(0), match.start(), match.end(), "ticker"))
+            else:
+                symbol, kind = self._forms[match.group("name").lower()]
+                matches.append(EntityMatch(symbol, match.group(0), match.start(), match.end(), kind))
+
+        if fuzzy:
+            matches.extend(self._fuzzy_matches(text, matches))
+            matches.sort(key=lambda m: m.start)
+        return matches
+
+    def _fuzzy_matches(self, text: str, exact: List[EntityMatch]) -> List[EntityMatch]:
+        """Match capitalized words that no exact form covered against known names"""
+        covered = [(m.start, m.end) for m in exact]
+        candidates = [form for form in self._forms if " " not in form]
+        found = []
+        for word in _CAPITALIZED_WORD.finditer(text):
+            if any(start <= word.start() < end for start, end in covered):
+                continue
+            lowered = word.group(0).lower()
+            close = difflib.get_close_matches(lowered, candidates, n=1, cutoff=self.fuzzy_cutoff)
+            if not close:
+                # Swapped letters ("Telsa") score low with difflib; accept same-letter anagrams
+                close = [form for form in candidates
+                         if len(form) == len(lowered) and form[0] == lowered[0] and sorted(form) == sorted(lowered)]
+            if close:
+                score = difflib.SequenceMatcher(None, lowered, close[0]).ratio()
+                symbol, _ = self._forms[close[0]]
+                found.append(EntityMatch(symbol, word.group(0), word.start(), word.end(), "fuzzy", score))
+        return found
+
+    def symbols(self, text: str, fuzzy: bool = True) -> List[str]:
+        """Return the distinct symbols mentioned in text, in order of first mention"""
+        return list(dict.fromkeys(match.symbol for match in self.resolve(text, fuzzy=fuzzy)))
+
+    def name_for(self, symbol: str) -> Optional[str]:
+        info = self.companies.get(symbol.upper())
+        return info.get("name") if info else None
+
+    def company_info(self, symbols: Iterable[str] = None) -> Dict[str, dict]:
+        """Return company metadata (name, sector) for the given or all symbols"""
+        symbols = [s.upper() for s in symbols] if symbols is not None else list(self.companies)
+        return {s: dict(self.companies[s]) for s in symbols if s in self.companies}
+
+    def describe(self, text: str) -> str:
+        """One-line summary of resolved companies for prompts, e.g. "Tesla -> TSLA (Tesla Inc.)" """
+        first_mentions: Dict[str, EntityMatch] = {}
+        for match in self.resolve(text):
+            first_mentions.setdefault(match.symbol, match)
+        return ", ".join(
+            f"{match.text} -> {match.symbol} ({self.name_for(match.symbol)})"
+            for match in first_mentions.values()
+        )
+
+
+_resolvers: Dict[Tuple[str, str], EntityResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_entity_resolver(db_path: Path = None, documents_dir: Path = None) -> EntityResolver:
+    """Return the shared resolver for a database and filing directory (built once per process)"""
+    key = (str(db_path), str(documents_dir))
+    with _resolvers_lock:
+        if key not in _resolvers:
+            _resolvers[key] = EntityResolver.from_sources(db_path, documents_dir)
+        return _resolvers[key]
@@ -0,0 +1,180 @@
+"""
+Filing Partitions Module - Per-fiscal-year 10-K indexes with year-aware routing
+
+The document tools used to index exactly one filing per company
+(`{company}_10K_2024.pdf`). With several years of filings in the documents
+directory, each (symbol, fiscal year) filing becomes its own partition: its own
+vector index, statement tables and summaries. A question is routed to the
+partitions covering the years it mentions, so retrieval cost grows with the
+years asked about rather than with the years on disk.
+
+Key Concepts:
+1. Requested Years: Explicit years ("2022", "FY23", "fiscal 2023"), ranges
+   ("2021-2023", "last 3 years") and year-over-year wording ("YoY", "compared
+   to the prior year") are turned into the fiscal years a question needs
+2. Partition Selection: A year is served by its own filing, or by the next
+   filing within two years (10-Ks report comparative prior-year figures);
+   years after the latest filing (maturities, commitments, guidance) and
+   questions without a year go to the latest filing
+3. Lazy Partitions: Only the latest filing is indexed up front; older
+   partitions are indexed on first use (concurrent first uses share one build).
+   Statement tables and summaries of every filing are built with the tools
+4. Parallel Fan-Out: Multi-year questions query their partitions in parallel
+   and the answers are labelled by filing year; waits end at the query deadline
+"""
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextvars import copy_context
+from typing import Any, Callable, Dict, List
+
+from llama_index.core.base.response.schema import Response
+from llama_index.core.query_engine import CustomQueryEngine
+from pydantic import PrivateAttr
+
+from .deadlines import DeadlineExceeded, bounded_timeout
+from .single_flight import SingleFlight
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+COMPARATIVE_YEARS = 2  # a 10-K reports the two prior fiscal years next to its own
+
+_NUMBERS = {"two": 2, "three": 3, "four": 4, "five": 5}
+_YEAR = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")  # also inside "FY2024"
+_SHORT_FY = re.compile(r"\bFY\s?'?(\d{2})\b", re.IGNORECASE)
+_RANGE = re.compile(r"(?<!\d)((?:19|20)\d{2})\s*(?:-|–|to|through)\s*(?:FY\s?)?((?:19|20)\d{2})(?!\d)"
+                    r"|\bbetween\s+((?:19|20)\d{2})\s+and\s+((?:19|20)\d{2})\b", re.IGNORECASE)
+_LAST_N = re.compile(r"\b(?:last|past|previous|prior)\s+(\d|two|three|four|five)\s+(?:fiscal\s+)?years\b",
+                     re.IGNORECASE)
+_YEAR_OVER_YEAR = re.compile(
+    r"year[- ]over[- ]year|\byoy\b|(?:compared (?:to|with)|versus|vs\.?|from) (?:the )?(?:prior|previous|last) year",
+    re.IGNORECASE)
+
+
+def requested_years(question: str, latest: int) -> List[int]:
+    """Fiscal years a question asks about (empty if it names none)
+
+    Args:
+        question: Natural-language question
+        latest: Latest fiscal year with a filing ("last 3 years" counts back from it)
+    """
+    years = set()
+    for match in _RANGE.finditer(question):
+        first, last = sorted(int(year) for year in match.groups() if year)
+        years.update(range(first, last + 1))
+    years.update(int(year) for year in _YEAR.findall(question))
+    years.update(2000 + int(year) for year in _SHORT_FY.findall(question))
+    for count in _LAST_N.findall(question):
+        count = int(_NUMBERS.get(count.lower(), count))
+        years.update(range(latest - count + 1, latest + 1))
+    if _YEAR_OVER_YEAR.search(question):
+        base = max(years) if years else latest
+        years.update((base - 1, base))
+    return sorted(years)
+
+
+def select_partitions(question: str, filing_years: List[int]) -> List[int]:
+    """Filing years whose partitions answer the question, oldest first
+
+    Returns the latest filing for questions without a year or about years after
+    it (forward-looking disclosures), and an empty list when the years asked
+    about predate every filing's coverage.
+    """
+    filing_years = sorted(filing_years)
+    if not filing_years:
+        return []
+    years = requested_years(question, filing_years[-1])
+    if not years:
+        return [filing_years[-1]]
+    selected = set()
+    for year in years:
+        covering = [filing for filing in filing_years if year <= filing <= year + COMPARATIVE_YEARS]
+        if covering:
+            selected.add(covering[0])
+        elif year > filing_years[-1]:
+            selected.add(filing_years[-1])
+    return sorted(selected)
+
+
+class PartitionedFilingQueryEngine(CustomQueryEngine):
+    """Routes questions to per-fiscal-year filing engines, fanning out for multi-year questions"""
+
+    symbol: str
+    company_name: str
+    partitions: Dict[int, Callable[[], Any]]  # filing year -> builder of that filing's query engine
+    max_workers: int = 4
+
+    _engines: Dict[int, Any] = PrivateAttr(default_factory=dict)
+    _builds: SingleFlight = PrivateAttr(default_factory=SingleFlight)
+    _executor: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def filing_years(self) -> List[int]:
+        return sorted(self.partitions)
+
+    def built_years(self) -> List[int]:
+        with self._lock:
+            return sorted(self._engines)
+
+    def engine(self, year: int) -> Any:
+        """Query engine of one filing, built on first use"""
+        with self._lock:
+            if year in self._engines:
+                return self._engines[year]
+        engine, _ = self._builds.do((self.symbol, year), self.partitions[year])
+        with self._lock:
+            self._engines.setdefault(year, engine)
+            return self._engines[year]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=f"{self.symbol}-filings")
+            return self._executor
+
+    def _query_partition(self, year: int, query_str: str) -> Any:
+        logger.info(f"Querying {self.symbol} FY{year} filing partition")
+        return self.engine(year).query(query_str)
+
+    def custom_query(self, query_str: str):
+        years = select_partitions(query_str, self.filing_years)
+        if not years:
+            available = ", ".join(f"FY{year}" for year in self.filing_years)
+            return Response(
+                response=f"No {self.company_name} 10-K filing covering the years asked about is available "
+                         f"(filings: {available}).",
+                metadata={"source": "filing_partitions", "partitions": []},
+            )
+        if len(years) == 1:
+            return self._query_partition(years[0], query_str)
+
+        # Each partition runs in a copy of this context so the query deadline applies
+        futures = {year: self._pool().submit(copy_context().run, self._query_partition, year, query_str)
+                   for year in years}
+        sections, source_nodes = [], []
+        for year, future in futures.items():
+            try:
+                response = future.result(timeout=bounded_timeout(None))
+            except FutureTimeout:
+                for pending in futures.values():
+                    pending.cancel()  # partitions that have not started yet
+                raise DeadlineExceeded(f"{self.symbol} FY{year} filing partition missed the query deadline",
+                                       started=True) from None
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.symbol} FY{year} filing partition failed: {e}")
+                sections.append(f"FY{year} 10-K: could not be searched ({e})")
+                continue
+            sections.append(f"FY{year} 10-K:\n{response}")
+            source_nodes.extend(getattr(response, "source_nodes", None) or [])
+        return Response(
+            response="\n\n".join(sections),
+            source_nodes=source_nodes,
+            metadata={"source": "filing_partitions", "partitions": years},
+        )
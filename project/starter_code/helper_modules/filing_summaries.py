@@ -0,0 +1,294 @@
+"""
+Filing Summaries Module - Precomputed hierarchical 10-K summaries for broad questions
+
+Broad questions ("summarize Apple's risk factors") used to make the filing query
+engine retrieve many chunks and summarize them on every request. This module
+summarizes each filing once, when the document tools are built: every 10-K item
+(section) is summarized from its text, and the filing as a whole from the section
+summaries. Summaries are stored next to the other derived data, and broad
+questions are answered with a single lookup.
+
+Key Concepts:
+1. Sections: The filing is split at its "Item 1A. Risk Factors"-style headings
+   (table of contents lines, which end in page numbers, are ignored)
+2. Hierarchical Summaries: Long sections are summarized chunk by chunk and the
+   chunk summaries summarized again (map-reduce); the filing summary is built
+   from the section summaries
+3. Offline Precompute: Summaries are rebuilt only when the PDF changes
+4. Broad-Question Routing: Questions asking for a summary, overview or the
+   main points of a topic are mapped to a section (or the whole filing);
+   everything else, and topics whose section has no summary, falls back to
+   retrieval
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from llama_index.core.base.response.schema import Response
+from llama_index.core.query_engine import CustomQueryEngine
+
+from .llm_usage import count_tokens
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FILING = "filing"  # section id of the whole-filing summary
+SKIPPED_ITEMS = frozenset({"15", "16"})  # exhibit index and optional form summary
+
+_HEADING = re.compile(r"^Item\s+(\d{1,2}[A-C]?)\.\s+(.*\S)\s*$")
+_TOC_ENTRY = re.compile(r"\d+$")
+_BROAD = re.compile(
+    r"\b(summar\w*|overview|outline|highlights?|big picture|in a nutshell|tl;?dr|"
+    r"(?:key|main|major|primary|top|biggest) (?:points|takeaways|themes|risks?|risk factors|challenges)|"
+    r"what (?:does|do) [\w.&' ]+ do)\b",
+    re.IGNORECASE,
+)
+
+# Topic patterns -> 10-K item, checked in order (market risk before risk factors)
+SECTION_TOPICS: List[Tuple[str, re.Pattern]] = [
+    ("7A", re.compile(r"market risk|interest rate risk|foreign (?:currency|exchange) risk", re.IGNORECASE)),
+    ("1C", re.compile(r"cyber", re.IGNORECASE)),
+    ("1A", re.compile(r"risk", re.IGNORECASE)),
+    ("3", re.compile(r"legal|litigation|lawsuit", re.IGNORECASE)),
+    ("7", re.compile(r"md&a|management.s discussion|results of operations|performance|liquidity|outlook",
+                     re.IGNORECASE)),
+    ("5", re.compile(r"dividends?|repurchases?|buybacks?|stockholder", re.IGNORECASE)),
+    ("2", re.compile(r"propert(?:y|ies)|facilities", re.IGNORECASE)),
+    ("9A", re.compile(r"internal control", re.IGNORECASE)),
+    ("1", re.compile(r"business|products?|services|segments?|competition|employees|strategy|what (?:does|do)",
+                     re.IGNORECASE)),
+]
+
+SECTION_PROMPT = (
+    "Summarize the following part of {company}'s 10-K, section \"{title}\", for an investor.\n"
+    "Keep concrete facts, figures and named risks; use at most {words} words.\n\n{text}\n\nSummary:"
+)
+FILING_PROMPT = (
+    "Below are summaries of the sections of {company}'s 10-K filing. Write an overview of the whole "
+    "filing for an investor: the business, financial performance, main risks and notable events. "
+    "Use at most {words} words.\n\n{text}\n\nOverview:"
+)
+
+
+@dataclass
+class FilingSection:
+    """One 10-K item with its text and page range"""
+
+    item: str
+    title: str
+    text: str
+    first_page: str
+    last_page: str
+
+
+def split_sections(documents: Iterable[Any]) -> List[FilingSection]:
+    """Split per-page documents (LlamaIndex Documents or text) at their 10-K item headings"""
+    sections: List[FilingSection] = []
+    current: Optional[FilingSection] = None
+    lines: List[str] = []
+    for position, document in enumerate(documents):
+        text = unicodedata.normalize("NFKC", getattr(document, "text", document))
+        page = str(getattr(document, "metadata", {}).get("page_label", position + 1))
+        for line in text.splitlines():
+            heading = _HEADING.match(" ".join(line.split()))
+            if heading and not _TOC_ENTRY.search(heading.group(2)):
+                if current is not None:
+                    current.text = "\n".join(lines).strip()
+                    sections.append(current)
+                current = FilingSection(heading.group(1).upper(), heading.group(2), "", page, page)
+                lines = []
+            elif current is not None:
+                lines.append(line)
+                current.last_page = page
+    if current is not None:
+        current.text = "\n".join(lines).strip()
+        sections.append(current)
+    return sections
+
+
+def _chunks(text: str, max_tokens: int) -> List[str]:
+    """Split text at line boundaries into chunks of at most max_tokens (approximately)"""
+    chunks, current, size = [], [], 0
+    for line in text.splitlines():
+        tokens = count_tokens(line) + 1
+        if current and size + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class FilingSummarizer:
+    """Builds section and whole-filing summaries with map-reduce over long sections"""
+
+    def __init__(self, complete: Callable[[str], str], chunk_tokens: int = 3000, section_words: int = 200,
+                 filing_words: int = 300, min_section_chars: int = 400):
+        """Initialize the summarizer
+
+        Args:
+            complete: Prompt -> completion text (the LLM)
+            chunk_tokens: Maximum tokens of section text per summarization call
+            section_words: Length limit of a section summary
+            filing_words: Length limit of the filing summary
+            min_section_chars: Shorter sections (e.g. "[Reserved]") are not summarized
+        """
+        self.complete = complete
+        self.chunk_tokens = chunk_tokens
+        self.section_words = section_words
+        self.filing_words = filing_words
+        self.min_section_chars = min_section_chars
+
+    def _summarize_text(self, company: str, title: str, text: str) -> str:
+        prompt = SECTION_PROMPT.format(company=company, title=title, words=self.section_words, text=text)
+        return str(self.complete(prompt)).strip()
+
+    def summarize_section(self, company: str, section: FilingSection) -> str:
+        """Summary of one section; long sections are summarized chunk by chunk first"""
+        title = f"Item {section.item}. {section.title}"
+        parts = _chunks(section.text, self.chunk_tokens)
+        while len(parts) > 1:
+            summaries = [self._summarize_text(company, title, part) for part in parts]
+            parts = _chunks("\n\n".join(summaries), self.chunk_tokens)
+            if len(parts) >= len(summaries):  # summaries are not getting shorter; stop splitting
+                parts = ["\n\n".join(summaries)]
+        return self._summarize_text(company, title, parts[0] if parts else "")
+
+    def summarize(self, company: str, sections: List[FilingSection]) -> List[Tuple[FilingSection, str]]:
+        """Summaries of every substantial section, followed by the whole-filing summary"""
+        results = []
+        for section in sections:
+            if len(section.text) < self.min_section_chars or section.item in SKIPPED_ITEMS:
+                continue
+            results.append((section, self.summarize_section(company, section)))
+            logger.info(f"Summarized {company} Item {section.item} ({section.first_page}-{section.last_page})")
+        if results:
+            text = "\n\n".join(f"Item {section.item}. {section.title}:\n{summary}" for section, summary in results)
+            filing = FilingSection(FILING, "Full filing", "", sections[0].first_page, sections[-1].last_page)
+            results.append((filing, str(self.complete(
+                FILING_PROMPT.format(company=company, words=self.filing_words, text=text))).strip()))
+        return results
+
+
+class FilingSummaryStore:
+    """Local SQLite store of precomputed section and filing summaries, per filing year"""
+
+    def __init__(self, path: Path):
+        """Initialize the store (created if missing)
+
+        Args:
+            path: SQLite file holding the summaries
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS filing_summaries (
+                symbol TEXT NOT NULL,
+                filing_year INTEGER NOT NULL DEFAULT 0,
+                section TEXT NOT NULL,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                first_page TEXT,
+                last_page TEXT,
+                PRIMARY KEY (symbol, filing_year, section)
+            );
+            CREATE TABLE IF NOT EXISTS filing_summary_sources (
+                symbol TEXT NOT NULL,
+                filing_year INTEGER NOT NULL DEFAULT 0,
+                source TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (symbol, filing_year)
+            );
+        """)
+        self._conn.commit()
+
+    def is_current(self, symbol: str, source: Path, filing_year: int = 0) -> bool:
+        """True if the filing's summaries were built from this exact version of the PDF"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source, mtime_ns FROM filing_summary_sources WHERE symbol = ? AND filing_year = ?",
+                (symbol, filing_year)).fetchone()
+        return row is not None and row == (str(source), Path(source).stat().st_mtime_ns)
+
+    def replace(self, symbol: str, summaries: List[Tuple[FilingSection, str]], source: Path = None,
+                filing_year: int = 0):
+        """Replace all summaries of one filing of a company"""
+        with self._lock:
+            self._conn.execute("DELETE FROM filing_summaries WHERE symbol = ? AND filing_year = ?",
+                               (symbol, filing_year))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO filing_summaries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, filing_year, s.item, s.title, summary, s.first_page, s.last_page)
+                 for s, summary in summaries],
+            )
+            if source is not None:
+                self._conn.execute("INSERT OR REPLACE INTO filing_summary_sources VALUES (?, ?, ?, ?)",
+                                   (symbol, filing_year, str(source), Path(source).stat().st_mtime_ns))
+            self._conn.commit()
+
+    def get(self, symbol: str, section: str, filing_year: int = None) -> Optional[Tuple[str, str, str, str]]:
+        """(title, summary, first_page, last_page) of a section, or None
+
+        Without filing_year the section of the latest filing that has it is returned.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT title, summary, first_page, last_page FROM filing_summaries "
+                "WHERE symbol = ? AND section = ? AND (? IS NULL OR filing_year = ?) ORDER BY filing_year DESC",
+                (symbol, section, filing_year, filing_year)).fetchone()
+
+    def sections(self, symbol: str, filing_year: int = None) -> List[str]:
+        with self._lock:
+            return list(dict.fromkeys(row[0] for row in self._conn.execute(
+                "SELECT section FROM filing_summaries WHERE symbol = ? AND (? IS NULL OR filing_year = ?) "
+                "ORDER BY filing_year DESC, rowid", (symbol, filing_year, filing_year))))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def broad_question_section(question: str) -> Optional[str]:
+    """10-K item (or FILING) a broad question asks about; None for specific questions"""
+    if not _BROAD.search(question):
+        return None
+    for item, pattern in SECTION_TOPICS:
+        if pattern.search(question):
+            return item
+    return FILING
+
+
+class FilingSummaryQueryEngine(CustomQueryEngine):
+    """Answers broad questions from precomputed summaries, everything else with the fallback engine"""
+
+    symbol: str
+    company_name: str
+    summaries: Any  # FilingSummaryStore
+    fallback: Any  # BaseQueryEngine
+    filing_year: Optional[int] = None  # one filing's summaries; None for the latest filing
+
+    def custom_query(self, query_str: str):
+        section = broad_question_section(query_str)
+        stored = self.summaries.get(self.symbol, section, self.filing_year) if section else None
+        if stored is None:
+            # The filing overview would not cover the topic; retrieval finds its passages
+            return self.fallback.query(query_str)
+        title, summary, first_page, last_page = stored
+        label = "10-K overview" if section == FILING else f"10-K Item {section}. {title}"
+        if self.filing_year:
+            label = f"FY{self.filing_year} {label}"
+        logger.info(f"Answered from precomputed summary: {self.symbol} {section}")
+        return Response(
+            response=f"{self.company_name} {label} (summary of pages {first_page}-{last_page}):\n{summary}",
+            metadata={"source": "filing_summaries", "section": section, "title": title,
+                      "pages": f"{first_page}-{last_page}"},
+        )
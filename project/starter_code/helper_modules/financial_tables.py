@@ -0,0 +1,388 @@
+"""
+Financial Tables Module - Exact numeric lookups from 10-K financial statements
+
+Questions like "Tesla total revenue 2024" used to go through semantic retrieval
+over prose chunks and an LLM read of them, which is slow and sometimes wrong on
+numbers. This module extracts the primary financial statements (income
+statement, balance sheet, cash flows) from the 10-K pages at ingestion time
+into a local table keyed by company, line item and period, and answers numeric
+questions by direct lookup. Everything else falls back to the RAG query engine.
+
+Key Concepts:
+1. Statement Pages: Pages whose heading is a consolidated statement title are
+   parsed line by line; fiscal periods come from the column header years
+2. Line Items: "Label value value value" rows are stored with their section
+   (e.g. "Net sales: Services"), sign ((565) is negative) and unit
+3. Local Table: Rows live in SQLite next to the database and are re-extracted
+   only when the PDF changes
+4. Conservative Matching: A line item matches only if every word of its label
+   appears in the question (after synonyms such as revenue -> net sales);
+   qualitative questions never match
+5. Fallback: FinancialLookupQueryEngine answers from the table when it can and
+   delegates to the vector query engine otherwise
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from llama_index.core.base.response.schema import Response
+from llama_index.core.query_engine import CustomQueryEngine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+STATEMENTS = {
+    "income_statement": (re.compile(r"CONSOLIDATED STATEMENTS? OF (?:OPERATIONS|INCOME)\b"),
+                         "Consolidated Statements of Operations"),
+    "balance_sheet": (re.compile(r"CONSOLIDATED BALANCE SHEETS?\b"), "Consolidated Balance Sheets"),
+    "cash_flow": (re.compile(r"CONSOLIDATED STATEMENTS? OF CASH FLOWS?\b"), "Consolidated Statements of Cash Flows"),
+}
+STATEMENT_ORDER = list(STATEMENTS)
+
+_VALUE = r"(?:\$\s*)?(?:\(?\d[\d,]*(?:\.\d+)?\)?|—|–)"
+_ROW = re.compile(rf"^(?P<label>.*?[A-Za-z].*?)\s+(?P<values>{_VALUE}(?:\s+{_VALUE})*)\s*$")
+_VALUE_TOKEN = re.compile(_VALUE)
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+_HEADER_DATE = re.compile(r"^(?:January|February|March|April|May|June|July|August|September|October|November|"
+                          r"December)\s+\d{1,2},?(?:\s+(?:19|20)\d{2})?$")
+_PAGE_FOOTER = re.compile(r"Form 10-K", re.IGNORECASE)
+_SCALE = re.compile(r"\(in (thousands|millions|billions)", re.IGNORECASE)
+_SHARE_SCALE = re.compile(r"shares, which are (?:reflected|presented|shown) in (thousands|millions)", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9&]+")
+_STOPWORDS = frozenset("a an and as at by for from in into of on or the to with".split())
+_GENERIC = frozenset({"total", "net", "other"})
+_QUALITATIVE = re.compile(r"\b(why|how (?:does|do|did|will|is|are)|describe|explain|discuss|strategy|risks?|compare)\b",
+                          re.IGNORECASE)
+_FINANCIAL_CUE = re.compile(
+    r"\b(revenues?|sales|income|profit|earnings|eps|margin|cash|assets?|liabilit\w*|equity|debt|expenses?|"
+    r"costs?|dividends?|capex|capital expenditures?|r&d|research|inventor\w*|receivables?|payables?|"
+    r"taxes|how much|amount)\b",
+    re.IGNORECASE,
+)
+
+# Question phrases -> words that appear in the corresponding line item labels
+SYNONYMS = {
+    "revenue": "total net sales total revenues",
+    "revenues": "total net sales total revenues",
+    "sales": "net sales",
+    "profit": "net income",
+    "earnings": "net income",
+    "eps": "diluted earnings per share",
+    "capex": "payments for acquisition of property plant and equipment purchases of property and equipment",
+    "capital expenditure": "payments for acquisition of property plant and equipment purchases of property and equipment",
+    "operating cash flow": "cash generated by operating activities net cash provided by operating activities",
+    "r&d": "research and development",
+    "cash": "cash and cash equivalents",
+    "debt": "term debt",
+    "tax": "provision for income taxes",
+    "taxes": "provision for income taxes",
+}
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def label_words(text: str) -> List[str]:
+    """Normalized content words of a label or question"""
+    return [_stem(word) for word in _WORD.findall(text.lower().replace("’", "'")) if word not in _STOPWORDS]
+
+
+def parse_value(token: str) -> Optional[float]:
+    """Parse '$ 1,234', '(565)' or '—' from a statement row"""
+    token = token.replace("$", "").strip()
+    if token in ("—", "–"):
+        return 0.0
+    negative = token.startswith("(") and token.endswith(")")
+    number = float(token.strip("()").replace(",", ""))
+    return -number if negative else number
+
+
+@dataclass
+class LineItem:
+    """One statement line for one period"""
+
+    symbol: str
+    statement: str
+    section: str
+    line_item: str
+    period: str
+    value: float
+    unit: str
+    page: str = ""
+
+
+def _unit(scale: str, share_scale: str, section: str, label: str) -> str:
+    context = f"{section} {label}".lower()
+    if "per share" in context and "shares used" not in context:
+        return "USD per share"
+    if "shares used" in context or context.startswith("shares"):
+        return f"{share_scale.rstrip('s')} shares" if share_scale else "shares"
+    return f"USD {scale}"
+
+
+def detect_statement(text: str) -> Optional[str]:
+    """Statement type of a page whose heading (first lines) is a consolidated statement title"""
+    heading = "\n".join(text.strip().splitlines()[:5])
+    for statement, (pattern, _) in STATEMENTS.items():
+        if pattern.search(heading) and "COMPREHENSIVE" not in heading:
+            return statement
+    return None
+
+
+def parse_statement_page(symbol: str, text: str, page: str = "") -> List[LineItem]:
+    """Extract the line items of one statement page (empty if it is not one)"""
+    text = unicodedata.normalize("NFKC", text)  # ligatures and non-breaking spaces from PDF extraction
+    statement = detect_statement(text)
+    if statement is None:
+        return []
+    scale_match = _SCALE.search(text)
+    scale = scale_match.group(1).lower() if scale_match else "millions"
+    share_match = _SHARE_SCALE.search(text)
+    share_scale = share_match.group(1).lower() if share_match else ""
+
+    periods: List[str] = []
+    in_body = False
+    section = ""
+    pending = ""  # label continued from the previous line
+    items: List[LineItem] = []
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split())
+        if not line or _PAGE_FOOTER.search(line):
+            continue
+        if not in_body:
+            for year in _YEAR.findall(line):
+                if year not in periods:
+                    periods.append(year)
+        row = None if _HEADER_DATE.match(line) else _ROW.match(line)
+        values = _VALUE_TOKEN.findall(row.group("values")) if row else []
+        if not row or not periods or len(values) != len(periods):
+            if line.endswith(":"):
+                section, pending = line[:-1].strip(), ""
+            elif line.endswith((";", ",")):
+                pending = f"{pending} {line}".strip()
+            else:
+                pending = ""
+            continue
+
+        in_body = True
+        label = f"{pending} {row.group('label')}".strip() if pending else row.group("label").strip()
+        pending = ""
+        lowered = label.lower()
+        if lowered.startswith("cash") and "activities" in lowered:
+            section = ""  # cash flow subtotals stand on their own
+        for period, token in zip(periods, values):
+            items.append(LineItem(symbol, statement, section, label, period, parse_value(token),
+                                  _unit(scale, share_scale, section, label), page))
+        if lowered.startswith("total"):
+            section = ""  # totals close their section
+    return items
+
+
+def extract_financial_tables(symbol: str, documents: Iterable[Any]) -> List[LineItem]:
+    """Extract statement line items from per-page documents (LlamaIndex Documents or text)"""
+    items = []
+    for position, document in enumerate(documents):
+        text = getattr(document, "text", document)
+        page = str(getattr(document, "metadata", {}).get("page_label", position + 1))
+        page_items = parse_statement_page(symbol, text, page)
+        if len({item.line_item for item in page_items}) >= 5:  # skip stray headings (e.g. an index page)
+            items.extend(page_items)
+    return items
+
+
+@dataclass
+class LookupAnswer:
+    """A matched line item with its values for every period"""
+
+    symbol: str
+    statement: str
+    section: str
+    line_item: str
+    unit: str
+    period: str
+    values: Dict[str, float] = field(default_factory=dict)
+    page: str = ""
+
+    @property
+    def value(self) -> float:
+        return self.values[self.period]
+
+    def format_value(self, period: str) -> str:
+        value = self.values[period]
+        if self.unit.startswith("USD"):
+            amount = f"${abs(value):,.2f}" if self.unit == "USD per share" else f"${abs(value):,.0f}"
+            suffix = "" if self.unit == "USD per share" else " " + self.unit.split(" ", 1)[1].rstrip("s")
+            return f"{'-' if value < 0 else ''}{amount}{suffix}"
+        return f"{value:,.0f} {self.unit}"
+
+    def render(self, company_name: str = None) -> str:
+        title = STATEMENTS[self.statement][1]
+        label = f"{self.section}: {self.line_item}" if self.section else self.line_item
+        text = (f"{company_name or self.symbol} - {label} (fiscal {self.period}, {title}): "
+                f"{self.format_value(self.period)}.")
+        others = [f"{period}: {self.format_value(period)}" for period in self.values if period != self.period]
+        if others:
+            text += f" Other periods - {'; '.join(others)}."
+        return text + f" Source: {self.symbol} 10-K, page {self.page}."
+
+
+class FinancialTableStore:
+    """Local SQLite table of 10-K statement line items with exact lookups
+
+    Line items are partitioned by filing (fiscal year of the 10-K); readers pass
+    filing_year=None to see every filing, with the latest filing's value winning
+    when two filings report the same period.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the store (created if missing)
+
+        Args:
+            path: SQLite file holding the extracted tables
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS financial_line_items (
+                symbol TEXT NOT NULL,
+                filing_year INTEGER NOT NULL DEFAULT 0,
+                statement TEXT NOT NULL,
+                section TEXT NOT NULL,
+                line_item TEXT NOT NULL,
+                period TEXT NOT NULL,
+                value REAL NOT NULL,
+                unit TEXT NOT NULL,
+                page TEXT,
+                PRIMARY KEY (symbol, filing_year, statement, section, line_item, period)
+            );
+            CREATE TABLE IF NOT EXISTS financial_table_sources (
+                symbol TEXT NOT NULL,
+                filing_year INTEGER NOT NULL DEFAULT 0,
+                source TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                line_items INTEGER NOT NULL,
+                PRIMARY KEY (symbol, filing_year)
+            );
+        """)
+        self._conn.commit()
+
+    def is_current(self, symbol: str, source: Path, filing_year: int = 0) -> bool:
+        """True if the filing's tables were extracted from this exact version of the PDF"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT source, mtime_ns FROM financial_table_sources WHERE symbol = ? AND filing_year = ?",
+                (symbol, filing_year)).fetchone()
+        return row is not None and row == (str(source), Path(source).stat().st_mtime_ns)
+
+    def replace(self, symbol: str, items: List[LineItem], source: Path = None, filing_year: int = 0):
+        """Replace all line items of one filing of a company"""
+        with self._lock:
+            self._conn.execute("DELETE FROM financial_line_items WHERE symbol = ? AND filing_year = ?",
+                               (symbol, filing_year))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO financial_line_items "
+                "(symbol, filing_year, statement, section, line_item, period, value, unit, page) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(i.symbol, filing_year, i.statement, i.section, i.line_item, i.period, i.value, i.unit, i.page)
+                 for i in items],
+            )
+            if source is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO financial_table_sources VALUES (?, ?, ?, ?, ?)",
+                    (symbol, filing_year, str(source), Path(source).stat().st_mtime_ns, len(items)))
+            self._conn.commit()
+
+    def line_items(self, symbol: str, filing_year: int = None) -> List[Tuple[str, str, str]]:
+        """Distinct (statement, section, line_item) of a company (one filing or all)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT DISTINCT statement, section, line_item FROM financial_line_items "
+                "WHERE symbol = ? AND (? IS NULL OR filing_year = ?)",
+                (symbol, filing_year, filing_year)).fetchall()
+
+    def values(self, symbol: str, statement: str, section: str, line_item: str,
+               filing_year: int = None) -> List[Tuple[str, float, str, str]]:
+        """(period, value, unit, page) of one line item, latest period first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT period, value, unit, page FROM financial_line_items "
+                "WHERE symbol = ? AND statement = ? AND section = ? AND line_item = ? "
+                "AND (? IS NULL OR filing_year = ?) ORDER BY period DESC, filing_year DESC",
+                (symbol, statement, section, line_item, filing_year, filing_year)).fetchall()
+        latest: Dict[str, Tuple[str, float, str, str]] = {}
+        for row in rows:
+            latest.setdefault(row[0], row)  # restated values: the most recent filing wins
+        return list(latest.values())
+
+    def match(self, symbol: str, question: str, filing_year: int = None) -> Optional[Tuple[str, str, str]]:
+        """Best (statement, section, line_item) for a numeric question, or None"""
+        if _QUALITATIVE.search(question) or not (_FINANCIAL_CUE.search(question) or _YEAR.search(question)):
+            return None
+        original = set(label_words(question))
+        expanded = set(original)
+        lowered = question.lower()
+        for phrase, words in SYNONYMS.items():
+            if re.search(rf"\b{re.escape(phrase)}\b", lowered):
+                expanded.update(label_words(words))
+
+        best, best_score = None, None
+        for statement, section, line_item in self.line_items(symbol, filing_year):
+            words = set(label_words(line_item))
+            if not words or not words <= expanded or words <= _GENERIC:
+                continue
+            section_words = set(label_words(section))
+            matched_section = section_words & expanded
+            weight = sum(2 if word in original else 1 for word in words | matched_section)
+            score = (weight, len(matched_section) / len(section_words) if section_words else 1.0,
+                     -STATEMENT_ORDER.index(statement), -len(words))
+            if best_score is None or score > best_score:
+                best, best_score = (statement, section, line_item), score
+        return best
+
+    def lookup(self, symbol: str, question: str, filing_year: int = None) -> Optional[LookupAnswer]:
+        """Answer a numeric question from the extracted statements, or None to fall back"""
+        matched = self.match(symbol, question, filing_year)
+        if matched is None:
+            return None
+        rows = self.values(symbol, *matched, filing_year=filing_year)
+        values = {period: value for period, value, _, _ in rows}
+        years = [year for year in _YEAR.findall(question) if year in values]
+        period = years[0] if years else rows[0][0]
+        if _YEAR.search(question) and not years:
+            return None  # asked for a period the filing does not report
+        page = next(page for p, _, _, page in rows if p == period)
+        return LookupAnswer(symbol, matched[0], matched[1], matched[2], rows[0][2], period, values, page)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FinancialLookupQueryEngine(CustomQueryEngine):
+    """Answers numeric questions from the statement table, everything else with the fallback engine"""
+
+    symbol: str
+    company_name: str
+    tables: Any  # FinancialTableStore
+    fallback: Any  # BaseQueryEngine
+    filing_year: Optional[int] = None  # one filing's statements; None for all filings
+
+    def custom_query(self, query_str: str):
+        answer = self.tables.lookup(self.symbol, query_str, self.filing_year)
+        if answer is None:
+            return self.fallback.query(query_str)
+        logger.info(f"Answered from financial tables: {answer.symbol} {answer.line_item} {answer.period}")
+        return Response(
+            response=answer.render(self.company_name),
+            metadata={"source": "financial_tables", "statement": answer.statement, "section": answer.section,
+                      "line_item": answer.line_item, "period": answer.period, "value": answer.value,
+                      "unit": answer.unit, "page": answer.page},
+        )
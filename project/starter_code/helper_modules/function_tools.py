@@ -12,8 +12,6 @@ Learning Objectives:
 - Build PII protection mechanisms
 - Learn about real-time API integration
 
-Your Task: Complete the missing implementations marked with YOUR CODE HERE
-
 Key Concepts:
 1. FunctionTool Creation: Wrap Python functions as LlamaIndex tools
 2. SQL Generation: Use LLM to generate SQL from natural language
@@ -22,17 +20,31 @@ Key Concepts:
 5. PII Protection: Automatically mask sensitive information
 """
 
+import re
 import logging
 import sqlite3
 import random
+import threading
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 # LlamaIndex imports
-from llama_index.core import Settings
 from llama_index.core.tools import FunctionTool
-from llama_index.llms.openai import OpenAI
-from llama_index.embeddings.openai import OpenAIEmbedding
+
+from .analytics_engine import ColumnarUnavailable, create_analytics_engine, is_analytical_query
+from .deadlines import DeadlineExceeded
+from .entity_resolver import get_entity_resolver
+from .llm_client import get_llm_client
+from .llm_usage import get_usage_tracker
+from .market_data import get_market_data_client
+from .market_store import LocalQuoteStore, MarketDataService
+from .pii_masking import PIIMaskingEngine, parse_column_names
+from .prompt_layout import PromptLayout
+from .query_guard import QueryGuard, QueryRejected
+from .sql_candidates import DEFAULT_SQL_VARIANTS, SQLVariant, race_sql_candidates
+from .sql_examples import SEED_EXAMPLES, SUMMARY_SEED_EXAMPLES, SQLExample, SQLExampleStore, format_examples
+from .sql_templates import SQLTemplateMatcher
+from .tool_results import ToolResult
 
 # Environment setup
 from dotenv import load_dotenv
@@ -41,6 +53,32 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Symbols quoted when a market question names no company
+DEFAULT_MARKET_SYMBOLS = ["AAPL", "GOOGL", "TSLA"]
+
+# Static SQL generation instructions; they follow the schema so both are cached as one prefix
+SQL_INSTRUCTIONS = (
+    "Write a single SQLite SELECT statement that answers the question at the end.\n"
+    "Return only the SQL, without explanations or markdown."
+)
+
+# Advertised to the SQL generator when build_database.py created the summary tables
+SUMMARY_TABLES_SCHEMA = """
+PRE-AGGREGATED SUMMARY TABLES (kept current by triggers - prefer them over joins for totals):
+
+TABLE: customer_portfolio_summary (One row per customer with holdings)
+- customer_id (PRIMARY KEY → customers.id)
+- holdings_count (INTEGER) - Number of holdings
+- total_shares (REAL) - Shares across all holdings
+- total_cost (REAL) - Sum of shares * purchase_price
+- total_value (REAL) - Sum of holdings current_value (total portfolio value)
+
+TABLE: symbol_holdings_summary (One row per held stock symbol)
+- symbol (PRIMARY KEY → companies.symbol)
+- holdings_count (INTEGER) - Number of customer holdings of the stock
+- total_shares, total_cost, total_value (REAL) - Same aggregates per symbol
+"""
+
 class FunctionToolsManager:
     """Manager for all function tools - Database, market data, and PII protection"""
     
@@ -57,6 +95,45 @@ class FunctionToolsManager:
         # Database schema for SQL generation
         self.db_schema = self._get_database_schema()
         
+        # Shared company/ticker resolver (companies table + filing inventory)
+        self.entity_resolver = get_entity_resolver(self.db_path, self.project_root / "data" / "10k_documents")
+        
+        # Columnar PII masking engine (patterns are precompiled once)
+        self.pii_engine = PIIMaskingEngine()
+        
+        # Optional columnar engine (DuckDB) for aggregate-heavy SQL; None keeps
+        # every query on SQLite
+        self.analytics_engine = create_analytics_engine(self.db_path)
+        
+        # Shared market data client (pooled session, TTL quote cache) behind the
+        # local market_data store, which answers fresh quotes without the network
+        self.market_client = get_market_data_client()
+        self.market_service = self._create_market_service()
+        
+        # SQL execution limits: plan check, wall-clock limit and row budget
+        self.query_guard = QueryGuard(timeout=5.0, max_rows=10_000)
+        self.max_sql_retries = 1
+        
+        # Speculative SQL generation: with sql_candidates > 1, that many variants
+        # are generated in parallel and the cheapest valid plan is executed
+        self.sql_candidates = 1
+        self.sql_candidate_variants = list(DEFAULT_SQL_VARIANTS)
+        
+        # Parameterized SQL templates answer recurring question shapes without
+        # the LLM (validated against the database on first use)
+        self.sql_templates = SQLTemplateMatcher(self.entity_resolver)
+        self._sql_templates_validated_for = None
+        
+        # Few-shot examples: top-k verified question -> SQL pairs per prompt
+        # (store opened on first use next to the database)
+        self.sql_examples_k = 3
+        self._sql_examples = None
+        self._sql_examples_lock = threading.Lock()
+        self.max_result_rows = 100
+        
+        # Process-wide LLM token/latency accounting
+        self.usage_tracker = get_usage_tracker()
+        
         # Storage for tools
         self.function_tools = []
         
@@ -68,22 +145,36 @@ class FunctionToolsManager:
     def _configure_settings(self):
         """Configure LlamaIndex settings
         
-        TODO: Set up the LLM for SQL generation and other AI tasks
+        Uses the process-wide LLM client: the OpenAI LLM used for SQL generation
+        (gpt-3.5-turbo, temperature=0) and the embedding model are shared with the
+        other managers, registered on Settings, and the LLM is kept in self.llm for
+        use in tools.
         
-        Requirements:
-        - Create OpenAI LLM with "gpt-3.5-turbo" model and temperature=0
-        - Set Settings.llm and Settings.embed_model
-        - Store LLM reference in self.llm for use in tools
-        
-        IMPORTANT NOTE FOR VOCAREUM:
-        LlamaIndex requires the api_base parameter to work with Vocareum's OpenAI endpoint.
-        Get the base URL from environment: os.getenv("OPENAI_API_BASE", "https://openai.vocareum.com/v1")
-        Pass it as api_base parameter to both OpenAI() and OpenAIEmbedding() constructors.
-        
-        Hint: This is similar to document_tools configuration
+        Vocareum requires the api_base parameter, read from OPENAI_API_BASE.
         """
-        # YOUR CODE HERE
-        pass
+        self.llm = get_llm_client().configure_settings()
+    
+    def _create_market_service(self):
+        """Create the local-first market data service, or None without a database"""
+        if not self.db_path.exists():
+            return None
+        try:
+            write_scope = self.analytics_engine.quote_write if self.analytics_engine is not None else None
+            return MarketDataService(LocalQuoteStore(self.db_path, write_scope=write_scope), self.market_client)
+        except sqlite3.Error as e:
+            logger.warning(f"Local market data store unavailable: {e}")
+            return None
+    
+    def get_sql_example_store(self) -> SQLExampleStore:
+        """Open the few-shot example store next to the database, seeding it on first use"""
+        with self._sql_examples_lock:
+            if self._sql_examples is None:
+                store = SQLExampleStore(self.db_path.parent / "sql_examples.db")
+                store.seed(SEED_EXAMPLES)
+                if "customer_portfolio_summary" in self.db_schema:
+                    store.seed(SUMMARY_SEED_EXAMPLES)
+                self._sql_examples = store
+            return self._sql_examples
     
     def _get_database_schema(self) -> str:
         """Get enhanced database schema with relationships for SQL generation
@@ -95,12 +186,14 @@ class FunctionToolsManager:
             String containing detailed database schema with table relationships
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get table names to verify database connection
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
+            # Get table names to verify database connection (read-only: never create the file)
+            tables = set()
+            if self.db_path.exists():
+                conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+                try:
+                    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")}
+                finally:
+                    conn.close()
             
             # Return comprehensive schema for SQL generation
             schema_info = """Enhanced Database Schema with Relationships:
@@ -147,40 +240,17 @@ TABLE: market_data (Current Market Information)
 - market_cap (REAL) - Current market cap
 - date (TEXT) - Date of data
 
-COMMON QUERY PATTERNS & JOINS:
-
-1. Customer holdings with names:
-   SELECT c.first_name, c.last_name, ph.symbol, ph.shares, ph.current_value
-   FROM customers c 
-   JOIN portfolio_holdings ph ON c.id = ph.customer_id
-
-2. Holdings with company information:
-   SELECT ph.symbol, co.name, ph.shares, ph.current_value, co.sector
-   FROM portfolio_holdings ph
-   JOIN companies co ON ph.symbol = co.symbol
-
-3. Holdings with current market prices:
-   SELECT ph.symbol, ph.shares, ph.current_value, md.close_price
-   FROM portfolio_holdings ph
-   JOIN market_data md ON ph.symbol = md.symbol
-
-4. Complete customer portfolio view:
-   SELECT c.first_name, c.last_name, co.name, ph.shares, 
-          ph.current_value, md.close_price, co.sector
-   FROM customers c
-   JOIN portfolio_holdings ph ON c.id = ph.customer_id
-   JOIN companies co ON ph.symbol = co.symbol
-   JOIN market_data md ON ph.symbol = md.symbol
-
 KEY TIPS:
-- Use LIKE '%Tesla%' or LIKE '%Apple%' for company name searches
-- Use symbol = 'TSLA', 'AAPL', 'MSFT', 'GOOGL' for exact stock matches
+- Company names in the question are resolved to ticker symbols for you (see "Resolved companies")
+- Filter with symbol = 'TSLA', 'AAPL', 'MSFT', 'GOOGL' for exact stock matches instead of LIKE on names
 - JOIN portfolio_holdings with customers to get customer names
 - JOIN with companies to get full company names and sectors
 - JOIN with market_data to get current prices and volumes
+- Verified queries for similar questions, when available, are listed under "Similar examples"
 """
+            if {"customer_portfolio_summary", "symbol_holdings_summary"} <= tables:
+                schema_info += SUMMARY_TABLES_SCHEMA
             
-            conn.close()
             return schema_info
             
         except Exception as e:
@@ -203,94 +273,217 @@ KEY TIPS:
         # Clear existing tools
         self.function_tools = []
         
-        # TODO: Create the three main function tools
-        # Implement these three nested functions and wrap them with FunctionTool:
-        # 1. database_query_tool - Natural language to SQL conversion and execution
-        # 2. finance_market_search_tool - Real-time Yahoo Finance API integration
-        # 3. pii_protection_tool - Automatic PII detection and masking
-        
         # 1. DATABASE QUERY TOOL
-        def database_query_tool(query: str) -> str:
+        def database_query_tool(query: str) -> ToolResult:
             """Generate and execute SQL queries for customer/portfolio database
             
             This tool takes a natural language query, converts it to SQL using
-            the LLM, executes it against the database, and returns formatted results.
+            the LLM, executes it against the database, and returns the rows.
             
             Args:
                 query: Natural language question about the database
                 
             Returns:
-                String containing SQL query and formatted results
+                ToolResult with column names, row tuples and the executed SQL in
+                its metadata (rendered to text only when needed)
             """
             
-            def generate_sql(query_text: str, error_context: str = None) -> str:
+            def generate_sql(query_text: str, error_context: str = None, variant: SQLVariant = None) -> str:
                 """Generate SQL query from natural language using LLM"""
-                # TODO: Build prompt that includes database schema and query
-                # Handle error_context for retry logic if previous query failed
-                # Use self.llm.complete() to generate SQL
-                # Clean up response (remove markdown, handle multiple statements)
-                # YOUR CODE HERE
+                prompt = sql_prompt(
+                    self.db_schema,
+                    query_text,
+                    examples=self.get_sql_example_store().search(query_text, k=self.sql_examples_k),
+                    resolved=self.entity_resolver.describe(query_text),
+                    hint=variant.hint if variant is not None else None,
+                    error_context=error_context,
+                ).render()
                 
-                return "SELECT 1"  # Placeholder - replace with your implementation
+                if variant is None:
+                    response = self.usage_tracker.complete(self.llm, prompt, "sql_generation")
+                else:
+                    response = self.usage_tracker.complete(self.llm, prompt, "sql_generation",
+                                                           temperature=variant.temperature)
+                return clean_sql(str(response))
+            
+            def validate_sql(sql_query: str) -> Tuple[Optional[int], Optional[str]]:
+                """Plan a candidate without running it and return (estimated cost, error)"""
+                try:
+                    conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+                    try:
+                        return self.query_guard.check(conn, sql_query).estimated_cost, None
+                    finally:
+                        conn.close()
+                except (sqlite3.Error, QueryRejected) as e:
+                    return None, str(e)
             
-            def execute_sql(sql_query: str) -> Tuple[bool, list, list, str]:
-                """Execute SQL and return (success, results, column_names, error)"""
-                # TODO: Connect to database, execute query, extract results and column names
-                # Return tuple: (success_flag, results_list, column_names_list, error_message)
-                # YOUR CODE HERE
+            def generate_candidates(query_text: str) -> Tuple[str, Optional[str]]:
+                """Race parallel SQL candidates and return (sql, error of the failed candidates)"""
+                best, candidates = race_sql_candidates(
+                    lambda variant: generate_sql(query_text, variant=variant),
+                    validate_sql,
+                    variants=self.sql_candidate_variants[:self.sql_candidates],
+                )
+                if best is not None:
+                    return best.sql, None
+                errors = "\n".join(f"SQL: {c.sql}\nError: {c.error}" for c in candidates)
+                return (candidates[0].sql if candidates else None), errors or "no candidate finished in time"
+            
+            def execute_sql(sql_query: str) -> Tuple[Optional[ToolResult], Optional[str]]:
+                """Execute SQL under the query guard and return (result, error)
+                
+                The plan is checked first (cartesian products are rejected with a
+                reason the LLM can act on), then aggregate-heavy queries run on the
+                columnar engine when it is loaded and gives the same result; point
+                lookups, and anything DuckDB rejects, run on SQLite. Both are bounded by the guard's wall-clock
+                limit and row budget.
+                """
+                guard = self.query_guard
+                try:
+                    conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+                    try:
+                        guard.check(conn, sql_query)
+                        engine, results = "sqlite", None
+                        if self.analytics_engine is not None and is_analytical_query(sql_query):
+                            try:
+                                results, column_names = self.analytics_engine.execute(
+                                    sql_query, timeout=guard.timeout, max_rows=guard.max_rows + 1)
+                                engine, truncated = "duckdb", len(results) > guard.max_rows
+                                results = results[:guard.max_rows]
+                            except (QueryRejected, DeadlineExceeded):
+                                raise
+                            except ColumnarUnavailable:
+                                pass
+                            except Exception as e:
+                                logger.info(f"Columnar engine could not run query, using SQLite: {e}")
+                        if results is None:
+                            results, column_names, truncated = guard.run(conn, sql_query)
+                    finally:
+                        conn.close()
+                except (sqlite3.Error, QueryRejected) as e:
+                    return None, str(e)
                 
-                return False, None, None, "Not implemented"
+                metadata = {"sql": sql_query, "total_rows": len(results), "engine": engine}
+                if truncated:
+                    metadata["notes"] = [f"⚠️ Row budget reached: only the first {guard.max_rows:,} "
+                                         "rows were read; add filters or aggregate"]
+                return ToolResult(columns=column_names, rows=results, metadata=metadata), None
+            
+            def run_template(query_text: str) -> Optional[ToolResult]:
+                """Answer the question from a parameterized SQL template, if one matches"""
+                if self.sql_templates is None:
+                    return None
+                try:
+                    conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+                    try:
+                        if self._sql_templates_validated_for != self.db_path:
+                            self.sql_templates.validate(conn)
+                            self._sql_templates_validated_for = self.db_path
+                        # One extra row tells whether more rows match
+                        match = self.sql_templates.match(query_text, limit=self.max_result_rows + 1)
+                        if match is None:
+                            return None
+                        results, column_names, _ = self.query_guard.run(conn, match.sql, match.params)
+                    finally:
+                        conn.close()
+                except (sqlite3.Error, QueryRejected) as e:
+                    logger.info(f"SQL template failed, using the LLM: {e}")
+                    return None
+                
+                if not results:
+                    return None  # e.g. a misread customer name; let the LLM try
+                metadata = {"sql": match.sql, "engine": "sqlite", "template": match.template}
+                if len(results) > self.max_result_rows:
+                    results = results[:self.max_result_rows]
+                    metadata["notes"] = [f"... showing the first {self.max_result_rows} matching rows"]
+                return ToolResult(columns=column_names, rows=results, metadata=metadata)
             
             try:
-                # TODO: Implement the main database query logic
-                # 1. Generate SQL from natural language query
-                # 2. Execute the SQL and get results
-                # 3. Format results with column names
-                # 4. If execution fails, retry with error context
-                # YOUR CODE HERE
+                # Recurring question shapes are answered without an LLM call
+                result = run_template(query)
+                if result is not None:
+                    return result
+                
+                if self.sql_candidates > 1:
+                    # Candidates are validated before execution; error_context
+                    # holds their failures when none of them planned
+                    sql_query, error_context = generate_candidates(query)
+                else:
+                    sql_query, error_context = generate_sql(query), None
+                
+                result, error = None, error_context
+                if error_context is None:
+                    result, error = execute_sql(sql_query)
+                
+                # Retry with the error message so the LLM can correct (or, for
+                # guard rejections, rewrite) the query
+                attempts = 0
+                while result is None and attempts < self.max_sql_retries:
+                    attempts += 1
+                    sql_query = generate_sql(query, error_context or f"SQL: {sql_query}\nError: {error}")
+                    error_context = None
+                    result, error = execute_sql(sql_query)
+                
+                if result is None:
+                    return ToolResult.failure(f"Database query failed: {error}\nSQL Query: {sql_query}",
+                                              sql=sql_query)
+                
+                # Non-empty results can still be wrong: queue the SQL for confirmation
+                # instead of feeding it to later prompts
+                if result.rows:
+                    self.get_sql_example_store().add(query, sql_query, verified=False)
                 
-                return "Database query not implemented yet"
+                return result.head(self.max_result_rows)
                         
+            except DeadlineExceeded:
+                raise  # the coordinator tells deadline outcomes from database failures
             except Exception as e:
-                return f"Database system error: {e}"
+                return ToolResult.failure(f"Database system error: {e}")
         
         # 2. MARKET DATA TOOL
-        def finance_market_search_tool(query: str) -> str:
+        def finance_market_search_tool(query: str) -> ToolResult:
             """Get real current stock prices and market information
             
             This tool fetches real-time stock data from Yahoo Finance API
-            for Apple (AAPL), Tesla (TSLA), and Google (GOOGL).
+            for Apple (AAPL), Tesla (TSLA), and Google (GOOGL). All symbols in
+            the query are fetched concurrently through the shared market data
+            client, which caches quotes and coalesces duplicate requests.
             
             Args:
                 query: Natural language query mentioning companies
                 
             Returns:
-                String containing current market data
+                ToolResult with one row per symbol (price, change, volume)
             """
             
-            def get_real_stock_data(symbol: str) -> dict:
-                """Fetch real stock data from Yahoo Finance API"""
-                # TODO: Make API call to Yahoo Finance
-                # URL: https://query1.finance.yahoo.com/v8/finance/chart/{symbol}
-                # Extract: current price, previous close, volume, market cap
-                # Calculate: price change and change percentage
-                # Return: Dictionary with stock data and success flag
-                # YOUR CODE HERE
-                
-                return {'success': False, 'error': 'Not implemented'}
+            def get_real_stock_data(symbols: List[str]) -> dict:
+                """Fetch stock data for all symbols, locally when fresh, else from Yahoo Finance"""
+                if self.market_service is not None:
+                    return self.market_service.get_quotes(symbols)
+                return self.market_client.get_quotes(symbols)
             
             try:
-                # TODO: Identify companies mentioned in the query
-                # Map company names/symbols to ticker symbols (AAPL, TSLA, GOOGL)
-                # Fetch stock data for each identified company
-                # Format results with price, change, volume
-                # Handle API failures with appropriate fallbacks
-                # YOUR CODE HERE
+                symbols = self.entity_resolver.symbols(query) or DEFAULT_MARKET_SYMBOLS
+                
+                quotes = get_real_stock_data(symbols)
+                
+                rows, notes = [], []
+                for symbol, quote in quotes.items():
+                    if quote.get("success"):
+                        rows.append((symbol, round(quote["price"], 2), round(quote["change"], 2),
+                                     round(quote["change_percent"], 2), quote.get("volume"),
+                                     quote.get("source", "yahoo")))
+                    else:
+                        notes.append(f"⚠️ {symbol}: market data unavailable ({quote.get('error')})")
                 
-                return "Market data tool not implemented yet"
+                return ToolResult(
+                    columns=["symbol", "price", "change", "change_percent", "volume", "source"],
+                    rows=rows,
+                    metadata={"title": "Current Market Data:", "notes": notes},
+                )
                     
             except Exception as e:
-                return f"Market data error: {e}"
+                return ToolResult.failure(f"Market data error: {e}")
         
         # 3. PII PROTECTION TOOL
         def pii_protection_tool(database_results: str, column_names: str) -> str:
@@ -298,6 +491,8 @@ KEY TIPS:
             
             This tool identifies and masks personally identifiable information
             in database query results based on column names and content patterns.
+            Masking is delegated to the columnar PIIMaskingEngine, which masks
+            whole columns at once instead of value by value.
             
             Args:
                 database_results: Raw database results as string
@@ -306,39 +501,42 @@ KEY TIPS:
             Returns:
                 String with PII fields masked for privacy protection
             """
+            field_names = parse_column_names(column_names)
+            masked_results, masked_fields = self.pii_engine.mask_text(database_results, field_names)
             
-            def detect_pii_fields(field_names: list) -> set:
-                """Detect which fields contain PII based on field names"""
-                # TODO: Create patterns for common PII field names
-                # Check field names against patterns (email, phone, names, address, ssn, etc.)
-                # Return set of detected PII field names
-                # YOUR CODE HERE
-                
-                return set()  # Placeholder
-            
-            def mask_field_value(field_name: str, value: str) -> str:
-                """Apply appropriate masking based on field type"""
-                # TODO: Implement field-specific masking strategies
-                # Examples: abc@gmail.com -> ***@gmail.com
-                #          123-456-7890 -> ***-***-7890
-                #          John -> ****
-                # YOUR CODE HERE
-                
-                return str(value)  # Placeholder
-            
-            # TODO: Parse column names and detect PII fields
-            # Parse database results line by line
-            # For each line with PII fields, apply masking
-            # Add notice about which fields were masked
-            # YOUR CODE HERE
+            if not masked_fields:
+                return masked_results
             
-            return database_results  # Placeholder - no masking implemented
+            return (f"{masked_results}\n\n"
+                    f"🔒 PII protection applied - masked fields: {', '.join(sorted(masked_fields))}")
         
-        # TODO: Create FunctionTool objects for each function
-        # Wrap each function with FunctionTool.from_defaults()
-        # Provide descriptive names and descriptions for agent routing
-        # Add all tools to self.function_tools list
-        # YOUR CODE HERE
+        self.function_tools = [
+            FunctionTool.from_defaults(
+                fn=database_query_tool,
+                name="database_query_tool",
+                description=(
+                    "Query the customer portfolio database with natural language. Use for customer "
+                    "information, portfolio holdings, share counts, holding values, company master "
+                    "data and stored financial metrics."
+                ),
+            ),
+            FunctionTool.from_defaults(
+                fn=finance_market_search_tool,
+                name="finance_market_search_tool",
+                description=(
+                    "Get current stock prices, daily price changes and trading volume for "
+                    "Apple (AAPL), Google (GOOGL) and Tesla (TSLA)."
+                ),
+            ),
+            FunctionTool.from_defaults(
+                fn=pii_protection_tool,
+                name="pii_protection_tool",
+                description=(
+                    "Mask personally identifiable information (names, emails, phone numbers, SSNs) "
+                    "in database results given the results text and their column names."
+                ),
+            ),
+        ]
         
         if self.verbose:
             print("   ✅ Function tools created")
@@ -353,3 +551,37 @@ KEY TIPS:
         """
         return self.function_tools
 
+
+
+def sql_prompt(schema: str, question: str, examples: List[SQLExample] = None, resolved: str = "",
+               hint: str = None, error_context: str = None) -> PromptLayout:
+    """SQL generation prompt: schema and instructions first, per-question text last
+    
+    Args:
+        schema: Database schema description
+        question: Natural language question
+        examples: Stored examples similar to the question
+        resolved: Companies resolved from the question
+        hint: Candidate-specific hint (parallel SQL candidates)
+        error_context: Failed SQL and error of the previous attempt
+    """
+    layout = PromptLayout().stable(schema).stable(SQL_INSTRUCTIONS)
+    if examples:
+        layout.variable(f"Similar examples:\n\n{format_examples(examples)}")
+    request = f"Question: {question}\n"
+    if resolved:
+        request += f"Resolved companies: {resolved}\n"
+    if hint:
+        request += f"Hint: {hint}\n"
+    if error_context:
+        request += f"\nThe previous attempt failed, fix it:\n{error_context}\n"
+    return layout.variable(request + "\nSQL:")
+
+
+def clean_sql(response: str) -> str:
+    """Strip markdown fences and explanations, keeping the first SQL statement"""
+    sql = re.sub(r"```(?:sql)?", "", response, flags=re.IGNORECASE).strip()
+    match = re.search(r"\b(WITH|SELECT)\b", sql, flags=re.IGNORECASE)
+    if match:
+        sql = sql[match.start():]
+    return sql.split(";")[0].strip()
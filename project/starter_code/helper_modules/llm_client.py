@@ -0,0 +1,296 @@
+"""
+LLM Client Module - Shared OpenAI clients with pooling, rate limiting and retries
+
+Every manager used to create its own OpenAI and OpenAIEmbedding clients, each
+with its own connection pool and retry policy, and nothing bounded the total
+request rate. This module creates the LLM and embedding clients once per
+process on top of one pooled HTTP client, so all managers share keep-alive
+connections and one request budget.
+
+Key Concepts:
+1. Connection Pooling: One httpx.Client with keep-alive connections is passed
+   to every OpenAI client, so TLS handshakes are paid once per connection
+2. Token Bucket: Requests wait for a token; the bucket refills at
+   requests_per_minute and allows short bursts up to its capacity
+3. Concurrency Limit: A semaphore bounds in-flight requests across all managers;
+   a slot is held until the response body has been read and closed
+4. Retries: 429 and 5xx responses and connection errors are retried with
+   exponential backoff and full jitter, honoring Retry-After; the OpenAI SDK's
+   own retries are disabled so requests are not retried twice
+5. Deadlines: Under a query deadline, rate-limit and concurrency waits and
+   request timeouts are capped to the time left, and retries that cannot
+   finish in time are not attempted
+6. Shared Settings: LlamaIndex Settings are configured once, with the shared clients
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+
+# LlamaIndex imports
+from llama_index.core import Settings
+from llama_index.llms.openai import OpenAI
+from llama_index.embeddings.openai import OpenAIEmbedding
+
+from .deadlines import DeadlineExceeded, bounded_timeout, current_deadline
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://openai.vocareum.com/v1"
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, timeout: Optional[float]) -> Optional[float]:
+        """Take a token, returning how long the caller must wait for it (None, taking nothing, if over timeout)"""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Block until a request may be sent; returns the time waited
+
+        Returns None at once, without taking a token, if the wait would exceed timeout.
+        """
+        wait = self._reserve(timeout)
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Delay requested by the server (Retry-After in seconds or as an HTTP date)"""
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that releases a concurrency slot once, when it is closed"""
+
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            with self._lock:
+                released, self._released = self._released, True
+            if not released:
+                self._release()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """httpx transport adding rate limiting, a concurrency limit and jittered retries"""
+
+    def __init__(self, transport: httpx.BaseTransport, bucket: TokenBucket, max_concurrency: int = 8,
+                 max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 20.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize the transport
+
+        Args:
+            transport: Underlying (pooled) transport
+            bucket: Shared request rate limiter
+            max_concurrency: Maximum number of requests in flight
+            max_retries: Retries after the first attempt
+            backoff: Base delay in seconds; attempt n waits up to backoff * 2**n
+            max_backoff: Upper bound of a single delay
+        """
+        self.transport = transport
+        self.bucket = bucket
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.stats = {"requests": 0, "retries": 0, "throttled_s": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _delay(self, attempt: int, response: httpx.Response = None) -> float:
+        requested = retry_after_seconds(response) if response is not None else None
+        if requested is not None:
+            return min(requested, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _cap_timeout(request: httpx.Request, seconds: float) -> bool:
+        """Limit the request's connect/read/write/pool timeouts to `seconds`
+
+        Returns True if any configured timeout was shortened.
+        """
+        timeouts = dict(request.extensions.get("timeout") or {})
+        capped = False
+        for phase in ("connect", "read", "write", "pool"):
+            current = timeouts.get(phase)
+            capped = capped or current is None or current > seconds
+            timeouts[phase] = seconds if current is None else min(current, seconds)
+        request.extensions["timeout"] = timeouts
+        return capped
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        deadline = current_deadline()
+        attempt = 0
+        while True:
+            capped = False
+            if deadline is not None:
+                deadline.check("LLM request")
+                capped = self._cap_timeout(request, deadline.remaining())
+            waited = self.bucket.acquire(timeout=bounded_timeout(None))
+            if waited is None:
+                raise DeadlineExceeded("LLM request would wait for the rate limit past the query deadline")
+            with self._stats_lock:
+                self.stats["requests"] += 1
+                self.stats["throttled_s"] += waited
+                self.stats["retries"] += 1 if attempt else 0
+            if not self.semaphore.acquire(timeout=bounded_timeout(None)):
+                raise DeadlineExceeded("LLM request waited for a free slot past the query deadline")
+            try:
+                response = self.transport.handle_request(request)
+            except BaseException as e:
+                self.semaphore.release()
+                if not isinstance(e, httpx.TransportError):
+                    raise
+                if capped and isinstance(e, httpx.TimeoutException):
+                    # The deadline, not the client's own limit, ended a request still in progress
+                    raise DeadlineExceeded("LLM request cut short by the query deadline", started=True) from e
+                delay = self._delay(attempt)
+                if attempt == self.max_retries or (deadline is not None and delay >= deadline.remaining()):
+                    raise
+                logger.warning(f"LLM request failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if response.is_closed:
+                    self.semaphore.release()  # body already read by the transport
+                else:
+                    # The slot is released when the client has read and closed the body
+                    response.stream = _ReleasingStream(response.stream, self.semaphore.release)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                delay = self._delay(attempt, response)
+                if deadline is not None and delay >= deadline.remaining():
+                    return response
+                response.close()
+                logger.warning(f"LLM request returned {response.status_code}, retrying in {delay:.2f}s")
+            self.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.transport.close()
+
+
+class SharedLLMClient:
+    """Process-wide factory for OpenAI LLM and embedding clients sharing one HTTP pool"""
+
+    def __init__(self, api_base: str = None, requests_per_minute: float = 500, burst: int = 20,
+                 max_concurrency: int = 8, max_connections: int = 20, max_retries: int = 3,
+                 timeout: float = 60.0, transport: httpx.BaseTransport = None):
+        """Initialize the shared HTTP client
+
+        Args:
+            api_base: OpenAI-compatible endpoint (default: OPENAI_API_BASE, then Vocareum)
+            requests_per_minute: Sustained request rate across all clients
+            burst: Requests allowed back to back before throttling starts
+            max_concurrency: Maximum number of requests in flight
+            max_connections: Size of the keep-alive connection pool
+            max_retries: Retries on 429/5xx and connection errors
+            timeout: Per-request timeout in seconds
+            transport: Underlying transport (default: pooled httpx.HTTPTransport)
+        """
+        self.api_base = api_base or os.getenv("OPENAI_API_BASE", DEFAULT_API_BASE)
+        self.bucket = TokenBucket(requests_per_minute / 60.0, capacity=burst)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                              keepalive_expiry=60.0)
+        self.transport = ResilientTransport(transport or httpx.HTTPTransport(limits=limits), self.bucket,
+                                            max_concurrency=max_concurrency, max_retries=max_retries)
+        self.http_client = httpx.Client(transport=self.transport, timeout=timeout)
+        self._llms: Dict[Tuple[str, float], OpenAI] = {}
+        self._embed_models: Dict[str, OpenAIEmbedding] = {}
+        self._lock = threading.Lock()
+
+    def llm(self, model: str = "gpt-3.5-turbo", temperature: float = 0.0) -> OpenAI:
+        """Return the shared OpenAI LLM for a model and temperature"""
+        with self._lock:
+            key = (model, temperature)
+            if key not in self._llms:
+                self._llms[key] = OpenAI(model=model, temperature=temperature, api_base=self.api_base,
+                                         http_client=self.http_client, max_retries=0)
+            return self._llms[key]
+
+    def embed_model(self, model: str = "text-embedding-ada-002") -> OpenAIEmbedding:
+        """Return the shared OpenAI embedding model"""
+        with self._lock:
+            if model not in self._embed_models:
+                self._embed_models[model] = OpenAIEmbedding(model=model, api_base=self.api_base,
+                                                            http_client=self.http_client, max_retries=0)
+            return self._embed_models[model]
+
+    def configure_settings(self) -> OpenAI:
+        """Register the shared LLM and embedding model on LlamaIndex Settings and return the LLM"""
+        llm = self.llm()
+        Settings.llm = llm
+        Settings.embed_model = self.embed_model()
+        return llm
+
+    def stats(self) -> Dict[str, float]:
+        with self.transport._stats_lock:
+            return dict(self.transport.stats)
+
+    def close(self):
+        self.http_client.close()
+
+
+_default_client: Optional[SharedLLMClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_llm_client() -> SharedLLMClient:
+    """Return the process-wide LLM client (shared connection pool and request budget)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = SharedLLMClient()
+        return _default_client
@@ -0,0 +1,344 @@
+"""
+LLM Usage Module - Token, latency and cost accounting for every LLM call
+
+Routing, SQL generation, synthesis and the document query engines all call the
+LLM. This module records prompt/completion tokens, latency and model for each
+call, attributed to a named call site, and aggregates them per query and per
+process so the most expensive call sites can be cached or shrunk.
+
+Key Concepts:
+1. Call Wrapper: tracker.complete(llm, prompt, call_site) times a direct call
+   and reads the token counts the OpenAI client reports
+2. LlamaIndex Instrumentation: Calls made inside LlamaIndex components (query
+   engines) are recorded from the LLM start/end events, attributed to the
+   call site opened with tracker.call_site(name)
+3. Per-Query Totals: tracker.query() collects every call made while answering
+   one question, including calls made on worker threads that copy the context
+4. Estimation: When a response carries no usage (mocks, streaming), tokens are
+   counted with tiktoken if installed, otherwise estimated from the text length
+5. Cost: Token counts are priced per model (USD per million tokens)
+6. Prompt Caching: Prompt tokens the provider served from its prefix cache
+   (reported as cached_tokens) are counted per call site and priced at the
+   cached-input discount
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from llama_index.core.instrumentation import get_dispatcher
+from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+from llama_index.core.instrumentation.events import BaseEvent
+from llama_index.core.instrumentation.events.llm import (
+    LLMChatEndEvent,
+    LLMChatStartEvent,
+    LLMCompletionEndEvent,
+    LLMCompletionStartEvent,
+)
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# USD per million (prompt, completion) tokens
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "text-embedding-ada-002": (0.10, 0.0),
+}
+CACHED_PROMPT_DISCOUNT = 0.5  # cached prompt tokens cost this fraction of the prompt price
+
+_call_site: contextvars.ContextVar[str] = contextvars.ContextVar("llm_call_site", default="other")
+_query_totals: contextvars.ContextVar[tuple] = contextvars.ContextVar("llm_query_totals", default=())
+# Set while tracker.complete runs; the event handler marks the call as recorded
+_direct_call: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("llm_direct_call", default=None)
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None if tiktoken or its files are unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # encoding files are downloaded on first use
+        logger.info(f"tiktoken unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens with tiktoken, or estimate about four characters per token"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def model_name(llm: Any) -> str:
+    """Model identifier of a LlamaIndex LLM (class name if it has none)"""
+    model = getattr(llm, "model", None)
+    return model if isinstance(model, str) else type(llm).__name__
+
+
+@dataclass
+class LLMCall:
+    """One recorded LLM call"""
+
+    call_site: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float
+    cost: float = 0.0
+    estimated: bool = False  # token counts were not reported by the API
+    cached_tokens: int = 0  # prompt tokens served from the provider's prefix cache
+
+
+@dataclass
+class UsageTotals:
+    """Aggregated usage of a set of LLM calls"""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency: float = 0.0
+    cost: float = 0.0
+    models: Dict[str, int] = field(default_factory=dict)  # model -> calls
+
+    def add(self, call: LLMCall):
+        self.calls += 1
+        self.prompt_tokens += call.prompt_tokens
+        self.cached_tokens += call.cached_tokens
+        self.completion_tokens += call.completion_tokens
+        self.latency += call.latency
+        self.cost += call.cost
+        self.models[call.model] = self.models.get(call.model, 0) + 1
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_prompt_tokens": self.cached_tokens,
+            "cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+            "latency_s": round(self.latency, 3),
+            "cost_usd": round(self.cost, 6),
+            "models": dict(self.models),
+        }
+
+
+def _reported_tokens(response: Any) -> Optional[Tuple[int, int]]:
+    """(prompt, completion) tokens reported with a LlamaIndex response, if any"""
+    usage = getattr(response, "additional_kwargs", None)
+    if isinstance(usage, dict) and "prompt_tokens" in usage:
+        return int(usage["prompt_tokens"]), int(usage.get("completion_tokens", 0))
+    return None
+
+
+def _cached_tokens(response: Any) -> int:
+    """Prompt tokens the provider reports as served from its prompt cache (0 if not reported)"""
+    usage = getattr(response, "additional_kwargs", None)
+    if isinstance(usage, dict) and "cached_tokens" in usage:
+        return int(usage["cached_tokens"])
+    raw = getattr(response, "raw", None)
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(
+        usage, "prompt_tokens_details", None)
+    cached = details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", None)
+    return int(cached) if isinstance(cached, (int, float)) else 0
+
+
+class LLMUsageTracker:
+    """Thread-safe per-call-site, per-query and per-process LLM usage totals"""
+
+    def __init__(self, prices: Dict[str, Tuple[float, float]] = None, history: int = 200):
+        """Initialize the tracker
+
+        Args:
+            prices: USD per million (prompt, completion) tokens by model
+            history: Number of recent calls kept for inspection
+        """
+        self.prices = dict(MODEL_PRICES if prices is None else prices)
+        self._lock = threading.Lock()
+        self._process = UsageTotals()
+        self._by_call_site: Dict[str, UsageTotals] = {}
+        self._recent = deque(maxlen=history)
+        self.last_query: Optional[UsageTotals] = None
+
+    def price(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        prompt_cost = (prompt_tokens - cached_tokens + cached_tokens * CACHED_PROMPT_DISCOUNT) * prompt_price
+        return (prompt_cost + completion_tokens * completion_price) / 1_000_000
+
+    def record(self, call_site: str, model: str, prompt_tokens: int, completion_tokens: int,
+               latency: float, estimated: bool = False, cached_tokens: int = 0) -> LLMCall:
+        """Record one call against its call site, the active queries and the process"""
+        call = LLMCall(call_site, model, prompt_tokens, completion_tokens, latency,
+                       self.price(model, prompt_tokens, completion_tokens, cached_tokens), estimated, cached_tokens)
+        with self._lock:
+            self._process.add(call)
+            self._by_call_site.setdefault(call_site, UsageTotals()).add(call)
+            for totals in _query_totals.get():
+                totals.add(call)
+            self._recent.append(call)
+        return call
+
+    def complete(self, llm: Any, prompt: str, call_site: str, **kwargs) -> Any:
+        """Call llm.complete(prompt, **kwargs) and record its usage under call_site"""
+        state = {"recorded": False}
+        site_token = _call_site.set(call_site)
+        direct_token = _direct_call.set(state)
+        start = time.perf_counter()
+        try:
+            response = llm.complete(prompt, **kwargs)
+        finally:
+            _direct_call.reset(direct_token)
+            _call_site.reset(site_token)
+        if not state["recorded"]:
+            # The LLM did not emit LlamaIndex events (e.g. a mock): record here
+            model = model_name(llm)
+            reported = _reported_tokens(response)
+            if reported:
+                self.record(call_site, model, *reported, time.perf_counter() - start,
+                            cached_tokens=_cached_tokens(response))
+            else:
+                self.record(call_site, model, count_tokens(prompt, model), count_tokens(str(response), model),
+                            time.perf_counter() - start, estimated=True)
+        return response
+
+    @contextmanager
+    def call_site(self, name: str) -> Iterator[None]:
+        """Attribute LLM calls made by LlamaIndex components in this block to name"""
+        token = _call_site.set(name)
+        try:
+            yield
+        finally:
+            _call_site.reset(token)
+
+    @contextmanager
+    def query(self) -> Iterator[UsageTotals]:
+        """Collect the usage of every LLM call made while answering one question"""
+        totals = UsageTotals()
+        token = _query_totals.set(_query_totals.get() + (totals,))
+        try:
+            yield totals
+        finally:
+            _query_totals.reset(token)
+            self.last_query = totals
+
+    def recent_calls(self) -> List[LLMCall]:
+        with self._lock:
+            return list(self._recent)
+
+    def summary(self) -> Dict[str, Any]:
+        """Process totals, totals per call site (most expensive first) and the last query"""
+        with self._lock:
+            by_call_site = sorted(self._by_call_site.items(),
+                                  key=lambda item: (item[1].cost, item[1].total_tokens), reverse=True)
+            return {
+                "process": self._process.as_dict(),
+                "by_call_site": {site: totals.as_dict() for site, totals in by_call_site},
+                "last_query": self.last_query.as_dict() if self.last_query else None,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._process = UsageTotals()
+            self._by_call_site.clear()
+            self._recent.clear()
+            self.last_query = None
+
+
+class LLMUsageEventHandler(BaseEventHandler):
+    """Records LlamaIndex LLM start/end events in a usage tracker
+
+    LLM classes may implement chat on top of complete (or the other way round),
+    so one call can emit nested events. Only the innermost call is recorded: an
+    end event is skipped if a call was recorded in the same thread since its
+    start. Failed calls emit no end event; their start entries expire.
+    """
+
+    tracker: Any = None
+    local: Any = None
+    stale_after: float = 600.0
+
+    def __init__(self, tracker: LLMUsageTracker, **kwargs):
+        super().__init__(tracker=tracker, local=threading.local(), **kwargs)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LLMUsageEventHandler"
+
+    def handle(self, event: BaseEvent, **kwargs: Any) -> Any:
+        if not hasattr(self.local, "open_calls"):
+            self.local.open_calls = {}  # span_id -> (model, start, recorded count at start)
+            self.local.recorded = 0
+        open_calls = self.local.open_calls
+
+        if isinstance(event, (LLMCompletionStartEvent, LLMChatStartEvent)):
+            now = time.perf_counter()
+            for span_id in [s for s, (_, start, _) in open_calls.items() if now - start > self.stale_after]:
+                del open_calls[span_id]
+            model_dict = event.model_dict or {}
+            model = model_dict.get("model") or model_dict.get("model_name")  # LLM.metadata reports model_name
+            if not model or model == "unknown":
+                model = model_dict.get("class_name", "unknown")
+            open_calls[event.span_id] = (str(model), now, self.local.recorded)
+        elif isinstance(event, (LLMCompletionEndEvent, LLMChatEndEvent)):
+            if event.span_id not in open_calls:
+                return
+            model, start, recorded_at_start = open_calls.pop(event.span_id)
+            if self.local.recorded > recorded_at_start:
+                return  # an inner call of this one was already recorded
+            if isinstance(event, LLMCompletionEndEvent):
+                prompt = event.prompt
+            else:
+                prompt = "\n".join(str(message.content or "") for message in event.messages)
+            reported = _reported_tokens(event.response)
+            if reported:
+                self.tracker.record(_call_site.get(), model, *reported, time.perf_counter() - start,
+                                    cached_tokens=_cached_tokens(event.response))
+            else:
+                completion = str(event.response) if event.response is not None else ""
+                self.tracker.record(_call_site.get(), model, count_tokens(prompt, model),
+                                    count_tokens(completion, model), time.perf_counter() - start, estimated=True)
+            self.local.recorded += 1
+            direct = _direct_call.get()
+            if direct is not None:
+                direct["recorded"] = True
+
+
+_default_tracker: Optional[LLMUsageTracker] = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_usage_tracker() -> LLMUsageTracker:
+    """Return the process-wide usage tracker (registered with LlamaIndex instrumentation)"""
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is None:
+            _default_tracker = LLMUsageTracker()
+            get_dispatcher().add_event_handler(LLMUsageEventHandler(_default_tracker))
+        return _default_tracker
@@ -0,0 +1,255 @@
+"""
+Market Data Module - Batched Yahoo Finance quotes with a shared TTL cache
+
+This module provides the market data client behind finance_market_search_tool.
+All symbols of a query are fetched concurrently over one pooled HTTP session,
+quotes are kept in a process-wide cache, and concurrent requests for the same
+symbol are coalesced into a single upstream call.
+
+Key Concepts:
+1. Connection Pooling: One requests.Session with keep-alive connections
+2. Concurrent Fetching: Missing symbols are fetched in parallel on a thread pool
+3. TTL Cache: Quotes live 15 seconds during market hours and until the next open after close
+4. Request Coalescing: One in-flight upstream call per symbol, shared by all waiters
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, time as dtime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+from zoneinfo import ZoneInfo
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .deadlines import bounded_timeout
+from .single_flight import SingleFlight
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart"
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+
+class MarketHoursTTL:
+    """Quote TTL policy based on US equity market hours
+
+    During regular trading hours quotes expire after open_ttl seconds. Outside
+    of them prices do not move, so quotes stay valid until the next open.
+    Exchange holidays are not modelled.
+    """
+
+    def __init__(self, open_ttl: float = 15.0):
+        self.open_ttl = open_ttl
+
+    @staticmethod
+    def is_market_open(now: datetime) -> bool:
+        local = now.astimezone(MARKET_TZ)
+        return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+    @staticmethod
+    def next_open(now: datetime) -> datetime:
+        local = now.astimezone(MARKET_TZ)
+        candidate = local.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0)
+        if local >= candidate:
+            candidate += timedelta(days=1)
+        while candidate.weekday() >= 5:
+            candidate += timedelta(days=1)
+        return candidate
+
+    def __call__(self, now: Optional[datetime] = None) -> float:
+        """Return the TTL in seconds for a quote fetched at `now`"""
+        now = now or datetime.now(tz=MARKET_TZ)
+        if self.is_market_open(now):
+            return self.open_ttl
+        return max((self.next_open(now) - now).total_seconds(), self.open_ttl)
+
+
+class QuoteCache:
+    """Thread-safe in-process quote cache with per-entry expiry"""
+
+    def __init__(self, ttl: Callable[[], float] = None, clock: Callable[[], float] = time.monotonic):
+        """Initialize the cache
+
+        Args:
+            ttl: Callable returning the TTL in seconds for a quote stored now
+            clock: Monotonic clock used for expiry (injectable for tests)
+        """
+        self.ttl = ttl or MarketHoursTTL()
+        self.clock = clock
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                return None
+            expires_at, quote = entry
+            if self.clock() >= expires_at:
+                del self._entries[symbol]
+                return None
+            return quote
+
+    def set(self, symbol: str, quote: dict):
+        expires_at = self.clock() + self.ttl()
+        with self._lock:
+            self._entries[symbol] = (expires_at, quote)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MarketDataClient:
+    """Concurrent, cached and coalescing client for the Yahoo Finance chart endpoint"""
+
+    def __init__(
+        self,
+        base_url: str = YAHOO_CHART_URL,
+        cache: QuoteCache = None,
+        max_workers: int = 8,
+        timeout: float = 5.0,
+        session: requests.Session = None,
+    ):
+        """Initialize the market data client
+
+        Args:
+            base_url: Chart endpoint; quotes are requested from {base_url}/{symbol}
+            cache: Quote cache (a new MarketHoursTTL cache by default)
+            max_workers: Maximum concurrent upstream requests (also the pool size)
+            timeout: Per-request timeout in seconds
+            session: Optional pre-configured requests session
+        """
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache or QuoteCache()
+        self.timeout = timeout
+        self.session = session or self._create_session(max_workers)
+        self.upstream_calls = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data")
+        self._single_flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"User-Agent": "Mozilla/5.0 (financial-agent)"})
+        return session
+
+    def get_quote(self, symbol: str) -> dict:
+        """Get a quote for one symbol"""
+        return self.get_quotes([symbol])[symbol.upper()]
+
+    def get_quotes(self, symbols: Iterable[str], timeout: Optional[float] = None) -> Dict[str, dict]:
+        """Get quotes for several symbols, fetching cache misses concurrently
+
+        Args:
+            symbols: Ticker symbols
+            timeout: Maximum seconds to wait for upstream calls (capped by the
+                query deadline). Calls still running are reported as failed but
+                keep filling the cache.
+
+        Returns:
+            Dict mapping symbol -> quote dict. Failed symbols map to
+            {'symbol': ..., 'success': False, 'error': ...}.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        quotes: Dict[str, dict] = {}
+        pending: Dict[str, Future] = {}
+
+        for symbol in symbols:
+            cached = self.cache.get(symbol)
+            if cached is not None:
+                quotes[symbol] = cached
+            else:
+                pending[symbol] = self._load(symbol)
+
+        wait(pending.values(), timeout=bounded_timeout(timeout))
+        for symbol, future in pending.items():
+            if not future.done():
+                quotes[symbol] = {"symbol": symbol, "success": False, "error": "upstream timed out"}
+                continue
+            try:
+                quotes[symbol] = future.result()
+            except Exception as e:
+                quotes[symbol] = {"symbol": symbol, "success": False, "error": str(e)}
+
+        return {symbol: quotes[symbol] for symbol in symbols}
+
+    def _load(self, symbol: str) -> Future:
+        """Return the in-flight upstream call for a symbol, starting one if needed"""
+        return self._single_flight.submit(symbol, self._executor, lambda: self._fetch_and_cache(symbol))
+
+    def _fetch_and_cache(self, symbol: str) -> dict:
+        quote = self.fetch_quote(symbol)
+        self.cache.set(symbol, quote)
+        return quote
+
+    def fetch_quote(self, symbol: str) -> dict:
+        """Fetch one quote from the chart endpoint (no caching)"""
+        with self._lock:
+            self.upstream_calls += 1
+        response = self.session.get(
+            f"{self.base_url}/{symbol}",
+            params={"interval": "1d", "range": "1d"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return parse_chart_response(symbol, response.json())
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+def parse_chart_response(symbol: str, payload: dict) -> dict:
+    """Extract price, change and volume from a Yahoo chart API payload"""
+    chart = payload.get("chart") or {}
+    if chart.get("error"):
+        raise ValueError(chart["error"].get("description", "chart error"))
+    results = chart.get("result") or []
+    if not results:
+        raise ValueError(f"No market data returned for {symbol}")
+
+    meta = results[0].get("meta", {})
+    price = meta.get("regularMarketPrice")
+    previous_close = meta.get("chartPreviousClose", meta.get("previousClose"))
+    if price is None:
+        raise ValueError(f"No price returned for {symbol}")
+
+    change = price - previous_close if previous_close else 0.0
+    change_percent = (change / previous_close * 100) if previous_close else 0.0
+    return {
+        "symbol": symbol,
+        "price": price,
+        "previous_close": previous_close,
+        "change": change,
+        "change_percent": change_percent,
+        "volume": meta.get("regularMarketVolume"),
+        "market_cap": meta.get("marketCap"),
+        "currency": meta.get("currency", "USD"),
+        "source": "yahoo",
+        "success": True,
+    }
+
+
+_default_client: Optional[MarketDataClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_market_data_client() -> MarketDataClient:
+    """Return the process-wide market data client (shared session and cache)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = MarketDataClient()
+        return _default_client
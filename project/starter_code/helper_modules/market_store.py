@@ -0,0 +1,184 @@
+"""
+Market Store Module - Local market_data table as fast path and offline fallback
+
+build_database.py seeds the market_data table with daily closes for every
+symbol. This module serves quotes from that table whenever they are fresh
+enough, refreshes only stale symbols from the upstream market data client and
+writes the refreshed quotes back, so the next request is answered locally.
+
+Key Concepts:
+1. Indexed Time Series: market_data is read through build_database.py's (symbol, date) index
+2. In-Memory Snapshot: Latest quote per symbol is kept in memory for sub-millisecond reads
+3. Freshness Policy: A daily close is fresh until the next market open
+4. Write-Back: Upstream quotes are upserted into market_data for today's date
+5. Offline Fallback: When upstream is slow or down, the last local quote is served (flagged stale)
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterable, Optional
+
+from .market_data import MARKET_CLOSE, MARKET_TZ, MarketDataClient, MarketHoursTTL
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LATEST_QUOTES_SQL = """
+    SELECT symbol, date, close_price, volume, market_cap FROM (
+        SELECT symbol, date, close_price, volume, market_cap,
+               ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY date DESC) AS rn
+        FROM market_data
+    )
+    WHERE rn <= 2
+    ORDER BY symbol, date DESC
+"""
+
+
+class LocalQuoteStore:
+    """Latest quotes per symbol backed by the market_data table"""
+
+    def __init__(self, db_path: Path, ttl: Callable[[datetime], float] = None,
+                 clock: Callable[[], datetime] = None, write_scope: Callable[[], ContextManager] = None):
+        """Initialize the store and load the latest quotes into memory
+
+        Args:
+            db_path: Path to financial.db
+            ttl: Freshness policy, seconds a quote observed at a given time stays fresh
+            clock: Returns the current time (timezone-aware; injectable for tests)
+            write_scope: Context manager entered around each write-back (the columnar
+                engine's quote_write, so write-backs do not invalidate its snapshot)
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl or MarketHoursTTL(open_ttl=60.0)
+        self.clock = clock or (lambda: datetime.now(tz=MARKET_TZ))
+        self.write_scope = write_scope or nullcontext
+        self._quotes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # Indexes are created by data/build_database.py (INDEXES), never at runtime
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.reload()
+
+    def reload(self):
+        """Load the latest two closes per symbol into the in-memory snapshot"""
+        latest: Dict[str, dict] = {}
+        with self._lock:
+            rows = self._conn.execute(LATEST_QUOTES_SQL).fetchall()
+        for symbol, date, close_price, volume, market_cap in rows:
+            if symbol not in latest:
+                latest[symbol] = {
+                    "symbol": symbol,
+                    "price": close_price,
+                    "previous_close": None,
+                    "volume": volume,
+                    "market_cap": market_cap,
+                    "date": date,
+                    "as_of": session_close(date),
+                }
+            elif latest[symbol]["previous_close"] is None:
+                latest[symbol]["previous_close"] = close_price
+        for quote in latest.values():
+            self._finish(quote)
+        self._quotes = latest
+
+    @staticmethod
+    def _finish(quote: dict) -> dict:
+        previous_close = quote.get("previous_close")
+        quote["change"] = quote["price"] - previous_close if previous_close else 0.0
+        quote["change_percent"] = (quote["change"] / previous_close * 100) if previous_close else 0.0
+        quote["source"] = "local"
+        quote["success"] = True
+        return quote
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Return the latest local quote for a symbol (from memory)"""
+        return self._quotes.get(symbol.upper())
+
+    def is_fresh(self, quote: dict) -> bool:
+        """A quote is fresh while less than ttl(as_of) seconds old"""
+        as_of = quote["as_of"]
+        return (self.clock() - as_of).total_seconds() < self.ttl(as_of)
+
+    def write_back(self, quote: dict) -> dict:
+        """Upsert an upstream quote into market_data for today's date and the snapshot"""
+        now = self.clock()
+        symbol = quote["symbol"]
+        date = now.astimezone(MARKET_TZ).strftime("%Y-%m-%d")
+        previous = self._quotes.get(symbol)
+
+        stored = dict(quote)
+        stored.update(date=date, as_of=now)
+        if stored.get("previous_close") is None and previous is not None and previous["date"] != date:
+            stored["previous_close"] = previous["price"]
+        self._finish(stored)
+
+        with self._lock, self.write_scope():
+            params = (quote["price"], quote.get("volume") or 0, quote.get("market_cap"), symbol, date)
+            updated = self._conn.execute(
+                "UPDATE market_data SET close_price = ?, volume = ?, market_cap = COALESCE(?, market_cap) "
+                "WHERE symbol = ? AND date = ?", params,
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO market_data (close_price, volume, market_cap, symbol, date) VALUES (?, ?, ?, ?, ?)",
+                    params,
+                )
+            self._conn.commit()
+            self._quotes[symbol] = stored
+        return {**stored, "source": quote.get("source", "upstream")}
+
+    def close(self):
+        self._conn.close()
+
+
+class MarketDataService:
+    """Market data layer: local fast path, upstream refresh of stale symbols, offline fallback"""
+
+    def __init__(self, store: LocalQuoteStore, client: MarketDataClient, upstream_timeout: float = 3.0):
+        """Initialize the service
+
+        Args:
+            store: Local quote store seeded from market_data
+            client: Upstream market data client
+            upstream_timeout: Maximum seconds to wait for upstream refreshes
+        """
+        self.store = store
+        self.client = client
+        self.upstream_timeout = upstream_timeout
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """Get quotes, refreshing only stale or missing symbols upstream"""
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        quotes: Dict[str, dict] = {}
+        stale = []
+
+        for symbol in symbols:
+            local = self.store.get(symbol)
+            if local is not None and self.store.is_fresh(local):
+                quotes[symbol] = local
+            else:
+                stale.append(symbol)
+
+        if stale:
+            refreshed = self.client.get_quotes(stale, timeout=self.upstream_timeout)
+            for symbol, quote in refreshed.items():
+                if quote.get("success"):
+                    quotes[symbol] = self.store.write_back(quote)
+                    continue
+                local = self.store.get(symbol)
+                if local is None:
+                    quotes[symbol] = quote
+                else:
+                    logger.warning(f"Serving stale local quote for {symbol}: {quote.get('error')}")
+                    quotes[symbol] = {**local, "stale": True, "source": "local (stale)"}
+
+        return {symbol: quotes[symbol] for symbol in symbols}
+
+
+def session_close(date: str) -> datetime:
+    """Market close time for a YYYY-MM-DD trading date"""
+    day = datetime.strptime(date[:10], "%Y-%m-%d")
+    return day.replace(hour=MARKET_CLOSE.hour, minute=MARKET_CLOSE.minute, tzinfo=MARKET_TZ)
@@ -0,0 +1,264 @@
+"""
+PII Masking Module - Columnar PII masking engine for structured query results
+
+This module provides the masking engine behind the PII protection tool. Instead
+of parsing formatted result strings line by line and masking value by value, the
+engine works on structured rows (column names + row tuples) before they are
+formatted for the LLM.
+
+Key Concepts:
+1. Precompiled Patterns: Field-name and content patterns are compiled once at import
+2. Column Classification: Each column is mapped to a PII kind (email, phone, name, ssn, ...)
+3. Columnar Masking: One masker per column is applied to the whole column at once
+4. Value Memoization: Repeated values (common first names, shared domains) are masked once
+
+Masking examples:
+    abc@gmail.com -> ***@gmail.com
+    123-456-7890  -> ***-***-7890
+    John          -> ****
+"""
+
+import ast
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Field-name patterns used to classify columns, checked in order (first match wins)
+PII_FIELD_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("email", re.compile(r"e[-_ ]?mail", re.IGNORECASE)),
+    ("ssn", re.compile(r"(^|_)ssn($|_)|social[-_ ]?security|(^|_)(tax_id|tin)($|_)", re.IGNORECASE)),
+    ("phone", re.compile(r"phone|mobile|(^|_)cell($|_)|(^|_)fax($|_)|(^|_)tel(ephone)?($|_)", re.IGNORECASE)),
+    ("name", re.compile(
+        r"(first|last|middle|full|given|family|customer|client|holder|contact)[-_ ]?name|surname",
+        re.IGNORECASE,
+    )),
+    ("address", re.compile(r"address|street|(^|_)zip(_?code)?($|_)|postal", re.IGNORECASE)),
+]
+
+# Content patterns used to scrub free text and unclassified columns
+EMAIL_PATTERN = re.compile(r"\b([A-Za-z0-9._%+-]+)@([A-Za-z0-9.-]+\.[A-Za-z]{2,})\b")
+SSN_PATTERN = re.compile(r"\b\d{3}-\d{2}-\d{4}\b")
+# Dots and spaces only count as separators in the full 3-3-4 form with one consistent separator,
+# so decimals ("1234.5678") and runs of plain numbers ("100 2500") are left alone
+PHONE_PATTERN = re.compile(
+    r"(?<![\w.-])(?:\+?1[-. ])?"
+    r"(?:\(\d{3}\) ?\d{3}[-.]\d{4}|\d{3}-\d{3}-\d{4}|\d{3}-\d{4}|\d{3}([. ])\d{3}\1\d{4})"
+    r"(?![\w-]|[.,]\d)"
+)
+_DIGIT = re.compile(r"\d")
+_COLUMNS_LINE = re.compile(r"^\s*COLUMNS:\s*(.*)$", re.MULTILINE)
+
+
+def _mask_email(value: str) -> str:
+    """abc@gmail.com -> ***@gmail.com"""
+    local, sep, domain = value.rpartition("@")
+    if not sep:
+        return "*" * len(value)
+    return f"***@{domain}"
+
+
+def _mask_digits(value: str) -> str:
+    """Mask every digit except the last four: 123-456-7890 -> ***-***-7890"""
+    if len(value) <= 4:
+        return "*" * len(value)
+    return _DIGIT.sub("*", value[:-4]) + value[-4:]
+
+
+def _mask_name(value: str) -> str:
+    """John -> ****"""
+    return "*" * len(value)
+
+
+def _mask_address(value: str) -> str:
+    return "[REDACTED]"
+
+
+def scrub_text(value: str) -> str:
+    """Mask emails, SSNs and phone numbers found anywhere in free text."""
+    value = EMAIL_PATTERN.sub(lambda m: _mask_email(m.group(0)), value)
+    value = SSN_PATTERN.sub(lambda m: _mask_digits(m.group(0)), value)
+    return PHONE_PATTERN.sub(lambda m: _mask_digits(m.group(0)), value)
+
+
+MASKERS: Dict[str, Callable[[str], str]] = {
+    "email": _mask_email,
+    "phone": _mask_digits,
+    "ssn": _mask_digits,
+    "name": _mask_name,
+    "address": _mask_address,
+    "text": scrub_text,
+}
+
+
+class PIIMaskingEngine:
+    """Columnar PII masking engine
+
+    Classifies columns once per result set and masks whole columns with a single
+    per-column masker, memoizing repeated values within the column.
+    """
+
+    def __init__(self, scrub_unclassified: bool = False):
+        """Initialize the masking engine
+
+        Args:
+            scrub_unclassified: Also scan non-PII text columns for embedded emails,
+                phone numbers and SSNs (slower; useful for computed columns)
+        """
+        self.scrub_unclassified = scrub_unclassified
+        self._kind_cache: Dict[str, Optional[str]] = {}
+
+    def classify_field(self, field_name: str) -> Optional[str]:
+        """Return the PII kind for a column name, or None if it is not PII"""
+        key = str(field_name)
+        if key not in self._kind_cache:
+            kind = None
+            for candidate, pattern in PII_FIELD_PATTERNS:
+                if pattern.search(key):
+                    kind = candidate
+                    break
+            self._kind_cache[key] = kind
+        return self._kind_cache[key]
+
+    def detect_pii_fields(self, field_names: Iterable[str]) -> Set[str]:
+        """Detect which fields contain PII based on field names"""
+        return {name for name in field_names if self.classify_field(name)}
+
+    def column_maskers(self, columns: Sequence[str]) -> Dict[int, Callable[[str], str]]:
+        """Pick one masker per column index from the PII column set"""
+        maskers = {}
+        for index, column in enumerate(columns):
+            kind = self.classify_field(column)
+            if kind is None and self.scrub_unclassified:
+                kind = "text"
+            if kind is not None:
+                maskers[index] = MASKERS[kind]
+        return maskers
+
+    def mask_value(self, field_name: str, value: Any) -> Any:
+        """Apply the appropriate masking for a single value"""
+        kind = self.classify_field(field_name)
+        if kind is None or value is None:
+            return value
+        return MASKERS[kind](str(value))
+
+    @staticmethod
+    def mask_column(values: Sequence[Any], masker: Callable[[str], str]) -> List[Any]:
+        """Mask a whole column, masking each distinct value only once"""
+        memo: Dict[Any, Any] = {None: None}
+        out = []
+        append = out.append
+        for value in values:
+            try:
+                append(memo[value])
+            except KeyError:
+                masked = memo[value] = masker(str(value))
+                append(masked)
+            except TypeError:  # unhashable value, mask without memoizing
+                append(masker(str(value)))
+        return out
+
+    def mask_rows(
+        self, columns: Sequence[str], rows: Sequence[Sequence[Any]]
+    ) -> Tuple[List[Tuple[Any, ...]], Set[str]]:
+        """Mask PII columns of structured rows
+
+        Args:
+            columns: Column names, in row order
+            rows: Row tuples (e.g. from cursor.fetchall())
+
+        Returns:
+            Tuple of (masked rows, set of masked column names). When no column
+            needs masking the input rows are returned as-is.
+        """
+        maskers = self.column_maskers(columns)
+        if not maskers or not rows:
+            return list(rows), {columns[i] for i in maskers}
+
+        data = list(zip(*rows))
+        for index, masker in maskers.items():
+            data[index] = self.mask_column(data[index], masker)
+        return list(zip(*data)), {columns[i] for i in maskers}
+
+    def mask_text(self, text: str, field_names: Iterable[str]) -> Tuple[str, Set[str]]:
+        """Mask PII in already formatted result text
+
+        Compatibility path for callers that only have a string. Lines holding
+        dict or tuple literals are parsed into rows and masked as columns in one
+        batch; every other line is scrubbed for labelled values and content patterns.
+
+        Returns:
+            Tuple of (masked text, set of masked field names)
+        """
+        field_names = [str(name) for name in field_names]
+        pii_fields = self.detect_pii_fields(field_names)
+        lines = text.splitlines()
+
+        # Collect literal rows so they can be masked column-wise in one pass
+        parsed: Dict[int, Any] = {}
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped and stripped[0] in "{(" and stripped[-1] in "})":
+                try:
+                    parsed[i] = ast.literal_eval(stripped)
+                except (ValueError, SyntaxError):
+                    pass
+
+        dict_rows = {i: row for i, row in parsed.items() if isinstance(row, dict)}
+        tuple_rows = {i: row for i, row in parsed.items() if isinstance(row, tuple)}
+        masked_fields: Set[str] = set()
+
+        if dict_rows:
+            keys = list(dict.fromkeys(k for row in dict_rows.values() for k in row))
+            masked, fields = self.mask_rows(keys, [tuple(row.get(k) for k in keys) for row in dict_rows.values()])
+            masked_fields |= fields
+            for (i, row), values in zip(dict_rows.items(), masked):
+                lines[i] = _line_indent(lines[i]) + repr({k: v for k, v in zip(keys, values) if k in row})
+
+        if tuple_rows and field_names:
+            width = len(field_names)
+            same_shape = {i: row for i, row in tuple_rows.items() if len(row) == width}
+            masked, fields = self.mask_rows(field_names, list(same_shape.values()))
+            masked_fields |= fields
+            for i, values in zip(same_shape, masked):
+                lines[i] = _line_indent(lines[i]) + repr(tuple(values))
+
+        label_pattern = _label_pattern(pii_fields)
+        for i, line in enumerate(lines):
+            if i in parsed or _COLUMNS_LINE.match(line):
+                continue
+            if label_pattern is not None:
+                line = label_pattern.sub(lambda m: m.group(1) + self.mask_value(m.group(2), m.group(3)), line)
+            lines[i] = scrub_text(line)
+
+        masked_text = "\n".join(lines)
+        if masked_text != text:
+            masked_fields |= pii_fields
+        return masked_text, masked_fields
+
+
+def _line_indent(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _label_pattern(pii_fields: Set[str]) -> Optional["re.Pattern[str]"]:
+    """Build a 'label: value' pattern for the detected PII fields"""
+    if not pii_fields:
+        return None
+    labels = "|".join(re.escape(f) for f in sorted(pii_fields, key=len, reverse=True))
+    return re.compile(rf"(\b({labels})\s*[:=]\s*)([^,;\n]+)", re.IGNORECASE)
+
+
+def parse_column_names(column_names: str) -> List[str]:
+    """Parse a column list given as a string ("['id', 'email']" or "id, email")"""
+    text = column_names.strip()
+    if text.startswith("["):
+        try:
+            return [str(c) for c in ast.literal_eval(text)]
+        except (ValueError, SyntaxError):
+            text = text.strip("[]")
+    return [c.strip().strip("'\"") for c in text.split(",") if c.strip()]
+
+
+def extract_columns(result: str) -> List[str]:
+    """Extract the column names from a result string's 'COLUMNS: [...]' line"""
+    match = _COLUMNS_LINE.search(result)
+    return parse_column_names(match.group(1)) if match else []
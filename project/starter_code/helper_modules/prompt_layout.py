@@ -0,0 +1,89 @@
+"""
+Prompt Layout Module - Stable-prefix prompt assembly for provider-side prompt caching
+
+LLM providers cache the longest previously seen prompt prefix and bill and
+process it faster; any per-query byte before the end of a static block stops
+the match there. Routing, SQL generation and synthesis each mix static text
+(tool catalog, schema, instructions) with per-query text (question, examples,
+tool results). A PromptLayout collects the sections of one prompt, each tagged
+stable or variable, and always renders the stable sections first, so every
+prompt of a call site shares one byte-identical prefix.
+
+Key Concepts:
+1. Sections: Prompts are built from stable sections (identical across queries)
+   and variable sections (question, retrieved examples, tool results)
+2. Stable First: render() emits all stable sections in the order they were
+   added, then all variable ones; render(stable_first=False) keeps the
+   authoring order (used as the baseline in benchmarks)
+3. Prefix Identity: prefix_hash identifies the cacheable prefix; a call site
+   whose hash changes between queries has per-query text in a stable section
+4. Cache Accounting: The cached prompt tokens the API reports are recorded by
+   the usage tracker (llm_usage) per call site
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import List
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n"
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    """One block of prompt text"""
+
+    text: str
+    stable: bool
+
+
+class PromptLayout:
+    """Sections of one prompt, rendered with the stable ones first"""
+
+    def __init__(self, separator: str = SEPARATOR):
+        """Initialize an empty layout
+
+        Args:
+            separator: Text placed between sections
+        """
+        self.separator = separator
+        self.sections: List[PromptSection] = []
+
+    def stable(self, text: str) -> "PromptLayout":
+        """Add a section that is identical for every query of the call site (empty text is skipped)"""
+        if text and text.strip():
+            self.sections.append(PromptSection(text.strip("\n"), True))
+        return self
+
+    def variable(self, text: str) -> "PromptLayout":
+        """Add a per-query section (empty text is skipped)"""
+        if text and text.strip():
+            self.sections.append(PromptSection(text.strip("\n"), False))
+        return self
+
+    @property
+    def prefix(self) -> str:
+        """The stable sections as they start the rendered prompt"""
+        stable = [section.text for section in self.sections if section.stable]
+        if not stable:
+            return ""
+        has_variable = any(not section.stable for section in self.sections)
+        return self.separator.join(stable) + (self.separator if has_variable else "")
+
+    @property
+    def prefix_hash(self) -> str:
+        return hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:16]
+
+    def render(self, stable_first: bool = True) -> str:
+        """Prompt text; stable sections first unless stable_first is False"""
+        if stable_first:
+            sections = sorted(self.sections, key=lambda section: not section.stable)
+        else:
+            sections = self.sections
+        return self.separator.join(section.text for section in sections)
+
+    def __str__(self) -> str:
+        return self.render()
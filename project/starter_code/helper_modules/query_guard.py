@@ -0,0 +1,197 @@
+"""
+Query Guard Module - Bounded execution of LLM-generated SQL
+
+The SQL tool executes whatever the model writes. A missing join condition on
+portfolio_holdings turns into a cartesian product that runs for minutes. This
+module inspects the plan before execution and bounds execution time and result
+size, so tail latency stays bounded regardless of the SQL.
+
+Key Concepts:
+1. Plan Inspection: EXPLAIN QUERY PLAN shows full scans (SCAN) and index
+   lookups (SEARCH); nested full scans of large tables are cartesian products
+2. Cost Estimate: Scanned table sizes (from sqlite_stat1, or MAX(rowid)) are
+   multiplied along the join loop and compared against a budget; a single
+   full scan over the budget passes only with a LIMIT or an aggregate
+3. Rejection as Feedback: Rejected plans raise QueryRejected with a reason the
+   SQL generator can use to rewrite the query
+4. Wall-Clock Limit: SQLite's progress handler interrupts queries past a deadline,
+   the guard's timeout or the query deadline, whichever comes first
+5. Row Budget: Results are read with fetchmany up to a maximum row count
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .deadlines import DeadlineExceeded, bounded_timeout
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_TABLE_REF = re.compile(r"(?:\bFROM|\bJOIN|,)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_STAT_ROWS = re.compile(r"^(\d+)")
+# LIMIT or aggregation: the query returns few rows even when it scans a large table
+_BOUNDED_RESULT = re.compile(
+    r"\blimit\s+\d+|\bgroup\s+by\b|\b(?:sum|avg|count|min|max|total)\s*\(", re.IGNORECASE
+)
+
+
+class QueryRejected(Exception):
+    """Raised when a query is refused or cancelled by the guard"""
+
+
+class QueryTimeout(QueryRejected):
+    """Raised when a query runs past the wall-clock limit"""
+
+
+@dataclass
+class PlanAssessment:
+    """What EXPLAIN QUERY PLAN says about a query"""
+
+    steps: List[str] = field(default_factory=list)
+    scans: List[Tuple[str, int]] = field(default_factory=list)  # (table, estimated rows)
+    estimated_cost: int = 0  # rows visited by nested full scans
+
+    @property
+    def cartesian(self) -> bool:
+        return len(self.scans) > 1
+
+
+class QueryGuard:
+    """Plan check, wall-clock limit and row budget for SQLite queries"""
+
+    def __init__(self, max_cost: int = 10_000_000, timeout: float = 5.0, max_rows: int = 10_000,
+                 check_interval: int = 10_000):
+        """Initialize the guard
+
+        Args:
+            max_cost: Largest allowed product of scanned table sizes along a join loop
+            timeout: Wall-clock limit per query in seconds
+            max_rows: Maximum number of result rows read
+            check_interval: SQLite VM instructions between deadline checks
+        """
+        self.max_cost = max_cost
+        self.timeout = timeout
+        self.max_rows = max_rows
+        self.check_interval = check_interval
+
+    def table_sizes(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """Estimated row count per table, from planner statistics or MAX(rowid)"""
+        sizes: Dict[str, int] = {}
+        try:
+            for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+                match = _STAT_ROWS.match(stat or "")
+                if match:
+                    sizes[table.lower()] = max(sizes.get(table.lower(), 0), int(match.group(1)))
+        except sqlite3.OperationalError:
+            pass  # no ANALYZE has been run
+        tables = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            if table.lower() not in sizes:
+                try:
+                    sizes[table.lower()] = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+                except sqlite3.OperationalError:
+                    sizes[table.lower()] = 0  # WITHOUT ROWID table
+        return sizes
+
+    @staticmethod
+    def table_aliases(sql: str, tables: Dict[str, int]) -> Dict[str, str]:
+        """Map the aliases used in FROM/JOIN clauses (as shown in plans) to table names"""
+        aliases = {}
+        for table, alias in _TABLE_REF.findall(sql):
+            if table.lower() in tables:
+                aliases[table.lower()] = table.lower()
+                if alias:
+                    aliases.setdefault(alias.lower(), table.lower())
+        return aliases
+
+    def assess(self, conn: sqlite3.Connection, sql: str) -> PlanAssessment:
+        """Inspect the query plan and estimate the cost of its full scans"""
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        sizes = self.table_sizes(conn)
+        aliases = self.table_aliases(sql, sizes)
+        assessment = PlanAssessment(steps=[detail for _, _, _, detail in plan])
+
+        # Full scans nested in the same join loop share a parent; scans in
+        # separate subqueries or compound SELECTs do not multiply
+        loops: Dict[int, List[Tuple[str, int]]] = {}
+        for _, parent, _, detail in plan:
+            match = _SCAN.match(detail)
+            if match:
+                table = aliases.get(match.group(1).lower(), match.group(1).lower())
+                loops.setdefault(parent, []).append((table, sizes.get(table, 0)))
+
+        for scans in loops.values():
+            cost = 1
+            for _, rows in scans:
+                cost *= max(rows, 1)
+            if cost > assessment.estimated_cost:
+                assessment.estimated_cost = cost
+                assessment.scans = scans
+        return assessment
+
+    def check(self, conn: sqlite3.Connection, sql: str) -> PlanAssessment:
+        """Raise QueryRejected for plans whose full scans exceed the budget
+
+        Nested full scans over the budget are rejected outright; a single full scan
+        over the budget is rejected unless the query has a LIMIT or aggregates.
+        """
+        assessment = self.assess(conn, sql)
+        if assessment.estimated_cost <= self.max_cost:
+            return assessment
+        if assessment.cartesian:
+            tables = " x ".join(f"{table} (~{rows:,} rows)" for table, rows in assessment.scans)
+            raise QueryRejected(
+                f"Query rejected: the plan joins full scans of {tables}, about "
+                f"{assessment.estimated_cost:,} row combinations (likely a missing join condition). "
+                "Join the tables on their key columns (customer_id, symbol) or add a WHERE filter."
+            )
+        if not _BOUNDED_RESULT.search(sql):
+            table, rows = assessment.scans[0]
+            raise QueryRejected(
+                f"Query rejected: the plan reads all of {table} (~{rows:,} rows) and returns every row. "
+                "Add a WHERE filter on customer_id or symbol, a LIMIT, or aggregate the rows."
+            )
+        return assessment
+
+    def execute(self, conn: sqlite3.Connection, sql: str) -> Tuple[list, list, bool]:
+        """Check and run a query within the time limit and row budget
+
+        Returns:
+            (rows, column_names, truncated) where truncated means the row budget was hit
+        """
+        self.check(conn, sql)
+        return self.run(conn, sql)
+
+    def run(self, conn: sqlite3.Connection, sql: str, params=()) -> Tuple[list, list, bool]:
+        """Run an already checked query (with optional bound parameters) within the time limit and row budget"""
+        timeout = bounded_timeout(self.timeout)
+        if timeout <= 0:
+            raise DeadlineExceeded("SQL query started after the query deadline")
+        deadline = time.monotonic() + timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, self.check_interval)
+        try:
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchmany(self.max_rows + 1)
+            column_names = [col[0] for col in cursor.description or []]
+        except sqlite3.OperationalError as e:
+            if "interrupted" in str(e) and time.monotonic() > deadline:
+                if timeout < self.timeout:
+                    raise DeadlineExceeded(f"SQL query cut short by the query deadline after {timeout:.2f}s",
+                                           started=True) from e
+                logger.warning(f"Query cancelled after {self.timeout}s: {sql}")
+                raise QueryTimeout(
+                    f"Query cancelled after {self.timeout:g}s. Add filters, aggregate, or use the "
+                    "summary tables instead of scanning large tables."
+                ) from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+        truncated = len(rows) > self.max_rows
+        return rows[:self.max_rows], column_names, truncated
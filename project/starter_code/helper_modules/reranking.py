@@ -0,0 +1,202 @@
+"""
+Reranking Module - Local reranking stage for 10-K document retrieval
+
+The filing query engines used to pass their raw vector top-k straight to the
+LLM, so better recall meant a larger similarity_top_k and more synthesis
+tokens. This module adds a CPU reranking stage: retrieval over-fetches cheaply
+and a local scorer keeps a tight top-n, so fewer and better chunks reach the
+LLM. The latency of each stage is measured and reported with the response.
+
+Key Concepts:
+1. Over-Retrieve, Rerank: Vector search fetches retrieve_top_k candidates;
+   the reranker keeps the best top_n for synthesis
+2. Lexical + Embedding Scorer: BM25 over the candidates, local hashed
+   embedding similarity and the retrieval score, each min-max normalized and
+   blended; no model download or network access needed
+3. Optional Cross-Encoder: With sentence-transformers installed, a small
+   cross-encoder model can score (question, chunk) pairs instead
+4. Stage Timings: retrieve / rerank / synthesize latency is logged and
+   returned in the response metadata
+"""
+
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+from pydantic import PrivateAttr
+
+from llama_index.core import get_response_synthesizer
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.query_engine import CustomQueryEngine
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from .sql_examples import HashingEmbedder
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:  # optional dependency
+    CrossEncoder = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+_WORD = re.compile(r"[a-z0-9&]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how in is it its of on or the their this "
+    "to was were what when which who why with".split()
+)
+
+
+def _terms(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def _normalize(scores: Sequence[float]) -> np.ndarray:
+    """Min-max scale scores to 0-1 (all equal -> all zero)"""
+    values = np.asarray(scores, dtype=np.float64)
+    spread = values.max() - values.min() if len(values) else 0.0
+    return (values - values.min()) / spread if spread > 0 else np.zeros_like(values)
+
+
+def bm25_scores(query: str, texts: Sequence[str], k1: float = 1.2, b: float = 0.75) -> List[float]:
+    """BM25 of each text for the query, with document frequencies taken over the texts themselves"""
+    documents = [Counter(_terms(text)) for text in texts]
+    lengths = [sum(document.values()) for document in documents]
+    average = (sum(lengths) / len(lengths)) if lengths else 0.0
+    scores = []
+    for document, length in zip(documents, lengths):
+        score = 0.0
+        for term in set(_terms(query)):
+            frequency = document.get(term, 0)
+            if not frequency:
+                continue
+            containing = sum(1 for other in documents if term in other)
+            idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / (average or 1)))
+        scores.append(score)
+    return scores
+
+
+class LexicalEmbeddingScorer:
+    """Blend of BM25, hashed-embedding cosine and the retrieval score"""
+
+    def __init__(self, bm25_weight: float = 0.45, embedding_weight: float = 0.25, retrieval_weight: float = 0.3,
+                 embedder: Callable[[str], np.ndarray] = None):
+        """Initialize the scorer
+
+        Args:
+            bm25_weight: Weight of BM25 term matching
+            embedding_weight: Weight of local hashed-embedding similarity
+            retrieval_weight: Weight of the original vector retrieval score
+            embedder: Text -> vector function (default: local hashed bag-of-words)
+        """
+        self.bm25_weight = bm25_weight
+        self.embedding_weight = embedding_weight
+        self.retrieval_weight = retrieval_weight
+        self.embedder = embedder or HashingEmbedder()
+        self.name = "lexical+embedding"
+
+    def _cosines(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.vstack([np.asarray(self.embedder(text), dtype=np.float32) for text in [query, *texts]])
+        norms = np.linalg.norm(vectors, axis=1)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)[:, None]
+        return vectors[1:] @ vectors[0]
+
+    def __call__(self, query: str, texts: Sequence[str], retrieval_scores: Sequence[float]) -> List[float]:
+        blended = (self.bm25_weight * _normalize(bm25_scores(query, texts))
+                   + self.embedding_weight * _normalize(self._cosines(query, texts))
+                   + self.retrieval_weight * _normalize(retrieval_scores))
+        return blended.tolist()
+
+
+class CrossEncoderScorer:
+    """Local cross-encoder scoring of (question, chunk) pairs (requires sentence-transformers)"""
+
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER, batch_size: int = 16):
+        if CrossEncoder is None:
+            raise ImportError("sentence-transformers is required for cross-encoder reranking")
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.name = model_name
+
+    def __call__(self, query: str, texts: Sequence[str], retrieval_scores: Sequence[float]) -> List[float]:
+        return [float(score) for score in self.model.predict([(query, text) for text in texts],
+                                                              batch_size=self.batch_size)]
+
+
+def default_scorer(cross_encoder: Optional[str] = None):
+    """Cross-encoder scorer when requested and installed, otherwise the lexical+embedding scorer"""
+    if cross_encoder:
+        try:
+            return CrossEncoderScorer(cross_encoder)
+        except Exception as e:
+            logger.warning(f"Cross-encoder {cross_encoder} unavailable ({e}), using lexical+embedding reranking")
+    return LexicalEmbeddingScorer()
+
+
+class LocalReranker(BaseNodePostprocessor):
+    """Node postprocessor that reranks retrieved nodes on CPU and keeps the top_n"""
+
+    top_n: int = 3
+    _scorer: Any = PrivateAttr()
+
+    def __init__(self, top_n: int = 3, scorer: Callable[[str, Sequence[str], Sequence[float]], List[float]] = None,
+                 **kwargs):
+        super().__init__(top_n=top_n, **kwargs)
+        self._scorer = scorer or LexicalEmbeddingScorer()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalReranker"
+
+    def _postprocess_nodes(self, nodes: List[NodeWithScore],
+                           query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        if query_bundle is None or len(nodes) <= 1:
+            return nodes[:self.top_n]
+        texts = [node.node.get_content() for node in nodes]
+        scores = self._scorer(query_bundle.query_str, texts, [node.score or 0.0 for node in nodes])
+        ranked = sorted(zip(nodes, scores), key=lambda pair: pair[1], reverse=True)[:self.top_n]
+        return [NodeWithScore(node=node.node, score=score) for node, score in ranked]
+
+
+class RerankedQueryEngine(CustomQueryEngine):
+    """Retrieve -> rerank -> synthesize, timing each stage"""
+
+    retriever: Any  # BaseRetriever
+    reranker: Any  # BaseNodePostprocessor
+    synthesizer: Any  # BaseSynthesizer
+
+    @classmethod
+    def from_index(cls, index, retrieve_top_k: int = 12, top_n: int = 3, scorer=None,
+                   llm=None) -> "RerankedQueryEngine":
+        """Build an over-retrieving, reranking engine over a vector index (llm defaults to Settings.llm)"""
+        return cls(
+            retriever=index.as_retriever(similarity_top_k=retrieve_top_k),
+            reranker=LocalReranker(top_n=top_n, scorer=scorer),
+            synthesizer=get_response_synthesizer(llm=llm),
+        )
+
+    def custom_query(self, query_str: str):
+        timings = {}
+        start = time.perf_counter()
+        candidates = self.retriever.retrieve(query_str)
+        timings["retrieve_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        nodes = self.reranker.postprocess_nodes(candidates, query_str=query_str)
+        timings["rerank_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = self.synthesizer.synthesize(query_str, nodes)
+        timings["synthesize_s"] = time.perf_counter() - start
+
+        logger.info(f"Document query: retrieved {len(candidates)}, kept {len(nodes)}; "
+                    + ", ".join(f"{stage} {seconds * 1000:.1f}ms" for stage, seconds in timings.items()))
+        response.metadata = {**(response.metadata or {}), "timings": timings,
+                             "retrieved": len(candidates), "reranked": len(nodes)}
+        return response
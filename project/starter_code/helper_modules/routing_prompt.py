@@ -0,0 +1,205 @@
+"""
+Routing Prompt Module - Compact, cached tool catalog for the routing LLM call
+
+The router used to paste the full description of every tool into each routing
+prompt, so the prompt grew linearly with the number of tools (one per 10-K
+filing). This module builds a numbered tool catalog once per tool set and keeps
+it compact: tools are grouped into categories, a category of per-company tools
+is a single line, and only the categories a question touches are expanded
+(for the companies it mentions).
+
+Key Concepts:
+1. Hierarchical Catalog: Categories first (10-K filings, market data, database),
+   then the specific tools; singleton categories are one numbered line
+2. Selective Expansion: Per-company tools are listed only for the companies the
+   question mentions; all of them when it asks about filings in general, or
+   names no company but has a financial or document cue ("highest revenue")
+3. Stable Numbering: Tool numbers follow the registration order and never
+   depend on the question, so the LLM's answer maps back unambiguously
+4. Prefix-Cache Friendly: Instructions and the catalog are the stable sections
+   of a PromptLayout, byte-identical across queries; the question-specific part
+   comes last, so provider-side prompt caching can reuse the prefix
+5. Cached Catalog: The catalog text is rebuilt only when the tool set changes
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .prompt_layout import PromptLayout
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FILINGS = "filings"
+_FILING_TOOL = re.compile(r"^([A-Z.\-]+)_10k_filing_tool$", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[a-z0-9)])[.:;](?:\s|$)")
+_FISCAL_YEARS = re.compile(r"fiscal years? ((?:\d{4}, )*\d{4})")
+
+# Per-company categories: title line and the wording that touches all of their tools
+CATEGORIES: Dict[str, Tuple[str, re.Pattern]] = {
+    FILINGS: (
+        "10-K filing tools, one per company: business, risks, strategy and reported financials "
+        "(listed below for the companies in the question)",
+        re.compile(r"10-?k|filings?|annual reports?|\ball (?:the )?compan|\bevery compan|\beach compan",
+                   re.IGNORECASE),
+    ),
+}
+
+# Financial/document wording that points at the 10-K filings
+DOCUMENT_KEYWORDS = ("10-k", "filing", "risk", "revenue", "business", "strategy", "segment", "annual report")
+
+ROUTING_INSTRUCTIONS = (
+    "You are routing a financial question to the tools needed to answer it.\n\n"
+    "Routing guidelines:\n"
+    "- Use the database tool for customers, portfolios and holdings\n"
+    "- Use the market tool for current stock prices, price changes and volume\n"
+    "- Use a company's 10-K filing tool for business, risks, strategy and reported financials\n"
+    "- Select every tool needed for a complete answer\n"
+    "- Answer with the tool numbers only, comma-separated (e.g. 1, 4)\n\n"
+)
+
+
+def short_description(description: str, max_words: int = 16) -> str:
+    """First sentence of a tool description, capped at max_words"""
+    text = " ".join(str(description or "").split())
+    match = _SENTENCE_END.search(text)
+    if match:
+        text = text[:match.start()]
+    words = text.split()
+    return " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+
+
+def has_document_cue(question: str) -> bool:
+    question_lower = question.lower()
+    return any(word in question_lower for word in DOCUMENT_KEYWORDS)
+
+
+def tool_category(name: str) -> Tuple[str, Optional[str]]:
+    """(category, symbol) of a tool; tools outside a per-company category are their own category"""
+    match = _FILING_TOOL.match(name)
+    if match:
+        return FILINGS, match.group(1).upper()
+    return name, None
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """One numbered tool of the catalog"""
+
+    number: int
+    name: str
+    category: str
+    symbol: Optional[str]
+    summary: str
+
+
+@dataclass(frozen=True)
+class ToolCatalog:
+    """Numbered tools and the rendered, question-independent catalog text"""
+
+    entries: Tuple[CatalogEntry, ...]
+    text: str
+
+    def members(self, category: str, symbols: Iterable[str] = None) -> List[CatalogEntry]:
+        """Entries of a category, optionally only those of the given companies"""
+        wanted = None if symbols is None else {symbol.upper() for symbol in symbols}
+        return [entry for entry in self.entries
+                if entry.category == category and (wanted is None or entry.symbol in wanted)]
+
+
+def build_catalog(tools: List[Any], company_names: Dict[str, str] = None) -> ToolCatalog:
+    """Number the tools in registration order and render the compact catalog"""
+    company_names = company_names or {}
+    entries = []
+    for number, tool in enumerate(tools, start=1):
+        category, symbol = tool_category(tool.metadata.name)
+        if symbol:
+            years = _FISCAL_YEARS.search(tool.metadata.description or "")
+            summary = company_names.get(symbol, symbol) + (f" (fiscal {years.group(1)})" if years else "")
+        else:
+            summary = short_description(tool.metadata.description)
+        entries.append(CatalogEntry(number, tool.metadata.name, category, symbol, summary))
+
+    lines, seen = [], set()
+    for entry in entries:
+        if entry.category in seen:
+            continue
+        seen.add(entry.category)
+        if entry.category in CATEGORIES:
+            count = sum(1 for other in entries if other.category == entry.category)
+            lines.append(f"- {CATEGORIES[entry.category][0]}; {count} companies")
+        else:
+            lines.append(f"{entry.number}. {entry.name}: {entry.summary}")
+    return ToolCatalog(tuple(entries), "Tool catalog:\n" + "\n".join(lines) + "\n\n")
+
+
+class RoutingPromptBuilder:
+    """Builds routing prompts from a cached catalog, expanding only the categories a question touches"""
+
+    def __init__(self, company_names: Dict[str, str] = None):
+        """Initialize the builder
+
+        Args:
+            company_names: Symbol -> company name, used to label per-company tools
+        """
+        self.company_names = dict(company_names or {})
+        self._catalog: Optional[ToolCatalog] = None
+        self._catalog_key: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.stats = {"catalog_builds": 0, "prompts": 0}
+
+    def catalog(self, tools: List[Any]) -> ToolCatalog:
+        """Catalog of the tool set, rebuilt only when tools are added, removed or changed"""
+        key = tuple((tool.metadata.name, tool.metadata.description) for tool in tools)
+        with self._lock:
+            if key != self._catalog_key:
+                self._catalog = build_catalog(tools, self.company_names)
+                self._catalog_key = key
+                self.stats["catalog_builds"] += 1
+                logger.info(f"Routing catalog built for {len(tools)} tools")
+            return self._catalog
+
+    def expanded(self, catalog: ToolCatalog, question: str, symbols: List[str]) -> List[CatalogEntry]:
+        """Per-company tools relevant to the question
+
+        Without a resolved company, a document cue lists every filing tool so the
+        LLM can still pick them (e.g. "Which company reported the highest revenue?").
+        """
+        entries = []
+        for category, (_, wants_all) in CATEGORIES.items():
+            members = catalog.members(category, symbols) if symbols else []
+            if not members and (wants_all.search(question)
+                                or (category == FILINGS and not symbols and has_document_cue(question))):
+                members = catalog.members(category)
+            entries.extend(members)
+        return entries
+
+    def layout(self, question: str, tools: List[Any], symbols: List[str] = None,
+               resolved: str = "") -> PromptLayout:
+        """Routing prompt sections: instructions and catalog are stable, the rest per question
+
+        Args:
+            question: User question
+            tools: Routable tools; the LLM answers with their 1-based positions
+            symbols: Companies resolved from the question
+            resolved: Human-readable resolution, e.g. "Apple -> AAPL (Apple Inc.)"
+        """
+        catalog = self.catalog(tools)
+        expanded = self.expanded(catalog, question, symbols or [])
+        with self._lock:
+            self.stats["prompts"] += 1
+        layout = PromptLayout().stable(ROUTING_INSTRUCTIONS).stable(catalog.text)
+        if expanded:
+            layout.variable("Tools for this question:\n" + "\n".join(
+                f"{entry.number}. {entry.name}: {entry.summary}" for entry in expanded))
+        request = f"Question: {question}\n"
+        if resolved:
+            request += f"Companies mentioned: {resolved}\n"
+        return layout.variable(request + "\nTool numbers:")
+
+    def build(self, question: str, tools: List[Any], symbols: List[str] = None, resolved: str = "") -> str:
+        """Routing prompt text, static instructions and catalog first (see layout())"""
+        return self.layout(question, tools, symbols, resolved).render()
@@ -0,0 +1,133 @@
+"""
+Single Flight Module - Coalescing of identical in-flight calls
+
+When many users ask about the same ticker or filing section at the same
+moment, each request used to run its own tool execution, multiplying upstream
+calls and LLM spend. A single-flight group lets the first caller for a key run
+the work while concurrent callers with the same key wait for, and share, its
+result. Nothing is cached: once the call finishes the key is forgotten, so the
+next request runs fresh.
+
+Key Concepts:
+1. Keys: Calls are identified by a hashable key, e.g. (tool name, normalized input)
+2. Leader and Followers: The first caller executes; callers arriving while it
+   runs block on the same Future and receive the same result or exception
+3. Blocking or Pooled: do() runs the work in the calling thread, submit()
+   starts it on an executor and returns the shared Future
+4. Unshareable Outcomes: do() accepts a shareable() check run by the leader;
+   when it fails (e.g. the leader's own deadline cut the call short) the
+   followers run the call again instead of inheriting that outcome
+5. Bounded Waits: Followers wait at most until their own query deadline
+6. Stats: Executions and shared results are counted, so the saved calls are visible
+"""
+
+import logging
+import re
+import threading
+from concurrent.futures import Executor, Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .deadlines import DeadlineExceeded, bounded_timeout
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_SPACE = re.compile(r"\s+")
+_RERUN = object()  # set on the shared future when followers must run the call themselves
+
+
+def normalize_input(text: str) -> str:
+    """Normalize a tool input for coalescing (case, whitespace, trailing punctuation)"""
+    return _SPACE.sub(" ", str(text)).strip().rstrip("?!. ").lower()
+
+
+class SingleFlight:
+    """Group of keyed calls where concurrent callers of the same key share one execution"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, Future] = {}
+        # Re-entrant: a done-callback may run inline while submit() holds the lock
+        self._lock = threading.RLock()
+        self.stats = {"executions": 0, "shared": 0}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Return (future for the key, True if this caller must execute it)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["shared"] += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.stats["executions"] += 1
+            return future, True
+
+    def _forget(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           shareable: Callable[[Optional[BaseException]], bool] = None) -> Tuple[Any, bool]:
+        """Run fn for the key in this thread, or wait for the call already in flight
+
+        Args:
+            key: Identity of the call
+            fn: The call
+            shareable: Called by the leader with its exception (None on success);
+                False makes waiting followers run fn themselves
+
+        Returns:
+            (result, shared) where shared is True if another caller's execution was reused
+
+        Raises:
+            DeadlineExceeded: A follower's query deadline passed while it waited
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            logger.debug(f"Coalesced call for {key!r}")
+            try:
+                result = future.result(timeout=bounded_timeout(None))
+            except FutureTimeout:
+                raise DeadlineExceeded(f"shared call {key!r} did not finish before the query deadline",
+                                       started=True) from None
+            if result is not _RERUN:
+                return result, True
+            with self._lock:
+                self.stats["shared"] -= 1
+        # The key is forgotten before the future resolves, so re-running followers start a new call
+        try:
+            result = fn()
+        except BaseException as e:
+            self._forget(key, future)
+            if shareable is not None and not shareable(e):
+                future.set_result(_RERUN)
+            else:
+                future.set_exception(e)
+            raise
+        self._forget(key, future)
+        future.set_result(result if shareable is None or shareable(None) else _RERUN)
+        return result, False
+
+    def submit(self, key: Hashable, executor: Executor, fn: Callable[[], Any]) -> Future:
+        """Start fn for the key on the executor, or return the future already in flight"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["shared"] += 1
+                return future
+            future = executor.submit(fn)
+            self._inflight[key] = future
+            self.stats["executions"] += 1
+            future.add_done_callback(lambda done, k=key: self._forget(k, done))
+            return future
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._inflight)}
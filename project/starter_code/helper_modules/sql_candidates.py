@@ -0,0 +1,121 @@
+"""
+SQL Candidates Module - Speculative parallel SQL generation
+
+Retrying failed SQL serializes LLM call -> execute -> error -> LLM call. This
+module instead requests several candidate queries at once (different
+temperatures and prompt hints), validates each locally by planning it, and
+returns the cheapest valid plan, so hard questions usually finish in one LLM
+round-trip.
+
+Key Concepts:
+1. Variants: Each candidate uses its own temperature and optional prompt hint
+2. Local Validation: Candidates are planned (EXPLAIN QUERY PLAN), not executed
+3. Racing: Candidates are generated concurrently; once the first valid one
+   arrives, the others get a short grace period before the best is chosen
+4. Cheapest Plan: Among valid candidates the lowest estimated cost wins, ties
+   going to the earlier (lower temperature) variant
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SQLVariant:
+    """How one candidate is generated"""
+
+    temperature: float
+    hint: str = ""
+
+
+# Deterministic candidate first, then more exploratory ones
+DEFAULT_SQL_VARIANTS = [
+    SQLVariant(0.0),
+    SQLVariant(0.4, "Join tables only on their key columns (customer_id, symbol) and "
+                    "prefer the summary tables for totals."),
+    SQLVariant(0.8, "Double-check every column name against the schema before using it."),
+]
+
+
+@dataclass
+class SQLCandidate:
+    """A generated query and the result of validating it"""
+
+    index: int
+    variant: SQLVariant
+    sql: Optional[str] = None
+    cost: Optional[int] = None
+    error: Optional[str] = None
+    latency: float = 0.0
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None and self.sql is not None
+
+
+def race_sql_candidates(generate: Callable[[SQLVariant], str],
+                        validate: Callable[[str], Tuple[Optional[int], Optional[str]]],
+                        variants: List[SQLVariant] = None,
+                        grace: float = 0.5,
+                        timeout: float = 30.0) -> Tuple[Optional[SQLCandidate], List[SQLCandidate]]:
+    """Generate and validate candidates concurrently and pick the cheapest valid one
+
+    Args:
+        generate: Produces SQL for a variant (one LLM call)
+        validate: Returns (estimated cost, None) for a valid query or (None, error)
+        variants: Candidate variants, in order of preference
+        grace: Seconds to wait for cheaper candidates after the first valid one
+        timeout: Overall limit in seconds
+
+    Returns:
+        (best candidate or None, all finished candidates in variant order)
+    """
+    variants = variants or DEFAULT_SQL_VARIANTS
+    start = time.perf_counter()
+
+    def build(index: int, variant: SQLVariant) -> SQLCandidate:
+        candidate = SQLCandidate(index, variant)
+        try:
+            candidate.sql = generate(variant)
+            candidate.cost, candidate.error = validate(candidate.sql)
+        except Exception as e:
+            candidate.error = str(e)
+        candidate.latency = time.perf_counter() - start
+        return candidate
+
+    executor = ThreadPoolExecutor(max_workers=len(variants), thread_name_prefix="sql-candidate")
+    # Each candidate runs in a copy of the caller's context (e.g. LLM usage accounting)
+    pending = {executor.submit(contextvars.copy_context().run, build, index, variant)
+               for index, variant in enumerate(variants)}
+    finished: List[SQLCandidate] = []
+    deadline = start + timeout
+    try:
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            finished.extend(future.result() for future in done)
+            if any(candidate.valid for candidate in finished):
+                # Give slower candidates a short chance to beat the first valid plan
+                done, pending = wait(pending, timeout=grace)
+                finished.extend(future.result() for future in done)
+                break
+    finally:
+        # Do not wait for stragglers; their results are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    finished.sort(key=lambda candidate: candidate.index)
+    valid = [candidate for candidate in finished if candidate.valid]
+    best = min(valid, key=lambda candidate: (candidate.cost or 0, candidate.index)) if valid else None
+    if best is not None:
+        logger.info(f"SQL candidate {best.index} chosen (cost {best.cost}) "
+                    f"from {len(valid)}/{len(variants)} valid in {time.perf_counter() - start:.2f}s")
+    return best, finished
@@ -0,0 +1,316 @@
+"""
+SQL Examples Module - Few-shot question -> SQL retrieval
+
+Instead of pasting a fixed list of join patterns into every SQL prompt, verified
+question -> SQL pairs are kept in a small local store and only the examples
+most similar to the current question are added to the prompt. The store is
+seeded with the canonical join patterns; SQL generated for new questions is
+kept as pending until it is confirmed.
+
+Key Concepts:
+1. Verified Examples: Only seeds and confirmed examples are retrieved; SQL that
+   merely returned rows may still be wrong, so it waits in a pending queue until
+   a reviewer confirms or removes it (remove() also evicts a bad verified example):
+       python -m helper_modules.sql_examples list
+       python -m helper_modules.sql_examples confirm "Which customers own Tesla?"
+2. Embedding Index: Questions are embedded once; vectors live in a normalized
+   numpy matrix and top-k search is a single matrix-vector product
+3. Local Embeddings: A hashed bag-of-words embedder (no network) is the
+   default; any text -> vector function (e.g. an OpenAI embedding) can be used
+4. Bounded Library: The least used examples are evicted beyond max_examples,
+   the oldest pending ones beyond the same limit
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Canonical join patterns (formerly listed in the schema prompt)
+SEED_EXAMPLES = [
+    ("Show each customer's holdings with their names",
+     "SELECT c.first_name, c.last_name, ph.symbol, ph.shares, ph.current_value\n"
+     "FROM customers c\nJOIN portfolio_holdings ph ON c.id = ph.customer_id"),
+    ("List holdings with company names and sectors",
+     "SELECT ph.symbol, co.name, ph.shares, ph.current_value, co.sector\n"
+     "FROM portfolio_holdings ph\nJOIN companies co ON ph.symbol = co.symbol"),
+    ("Show holdings with their latest closing prices",
+     "SELECT ph.symbol, ph.shares, ph.current_value, md.close_price\n"
+     "FROM portfolio_holdings ph\nJOIN market_data md ON ph.symbol = md.symbol\n"
+     "WHERE md.date = (SELECT MAX(date) FROM market_data WHERE symbol = ph.symbol)"),
+    ("Which customers own Tesla stock and how many shares?",
+     "SELECT c.first_name, c.last_name, ph.shares, ph.current_value\n"
+     "FROM customers c\nJOIN portfolio_holdings ph ON c.id = ph.customer_id\n"
+     "WHERE ph.symbol = 'TSLA'"),
+    ("Complete portfolio view for every customer",
+     "SELECT c.first_name, c.last_name, co.name, ph.shares, ph.current_value, md.close_price, co.sector\n"
+     "FROM customers c\nJOIN portfolio_holdings ph ON c.id = ph.customer_id\n"
+     "JOIN companies co ON ph.symbol = co.symbol\nJOIN market_data md ON ph.symbol = md.symbol\n"
+     "WHERE md.date = (SELECT MAX(date) FROM market_data WHERE symbol = ph.symbol)"),
+]
+
+# Only valid when build_database.py created the summary tables
+SUMMARY_SEED_EXAMPLES = [
+    ("What is the total portfolio value per customer?",
+     "SELECT c.first_name, c.last_name, s.total_value, s.total_value - s.total_cost AS unrealized_gain\n"
+     "FROM customer_portfolio_summary s\nJOIN customers c ON c.id = s.customer_id\n"
+     "ORDER BY s.total_value DESC"),
+    ("What is our exposure by sector?",
+     "SELECT co.sector, SUM(ss.total_value) AS total_value\n"
+     "FROM symbol_holdings_summary ss\nJOIN companies co ON co.symbol = ss.symbol\n"
+     "GROUP BY co.sector"),
+]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("a an and are by do does for from how i in is me of on our show the to what which who with".split())
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedding (unigrams and bigrams hashed into a fixed vector)"""
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def __call__(self, text: str) -> np.ndarray:
+        words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            vector[zlib.crc32(feature.encode()) % self.dimensions] += 1.0
+        return vector
+
+
+@dataclass
+class SQLExample:
+    """A verified question -> SQL pair"""
+
+    question: str
+    sql: str
+    score: float = 0.0
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(_TOKEN.findall(question.lower()))
+
+
+class SQLExampleStore:
+    """Local store of verified question -> SQL examples with top-k similarity search"""
+
+    def __init__(self, path: Path, embedder: Callable[[str], np.ndarray] = None,
+                 max_examples: int = 1000, min_similarity: float = 0.2):
+        """Initialize the store and load the embedding index
+
+        Args:
+            path: SQLite file holding the examples (created if missing)
+            embedder: Text -> vector function; its `name` attribute keys stored vectors
+            max_examples: Library size limit; least used examples are evicted
+            min_similarity: Examples below this cosine similarity are never returned
+        """
+        self.path = Path(path)
+        self.embedder = embedder or HashingEmbedder()
+        self.model = getattr(self.embedder, "name", type(self.embedder).__name__)
+        self.max_examples = max_examples
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sql_examples (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                question_key TEXT UNIQUE NOT NULL,
+                question TEXT NOT NULL,
+                sql TEXT NOT NULL,
+                model TEXT,
+                embedding BLOB,
+                uses INTEGER NOT NULL DEFAULT 0,
+                verified INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._ids: List[int] = []
+        self._examples: List[SQLExample] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._load()
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedder(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load(self):
+        """Load the verified examples, embedding those stored for a different model"""
+        rows = self._conn.execute("SELECT id, question, sql, model, embedding FROM sql_examples "
+                                  "WHERE verified = 1 ORDER BY id").fetchall()
+        ids, examples, vectors = [], [], []
+        for example_id, question, sql, model, blob in rows:
+            if model == self.model and blob is not None:
+                vector = np.frombuffer(blob, dtype=np.float32)
+            else:
+                vector = self._embed(question)
+                self._conn.execute("UPDATE sql_examples SET model = ?, embedding = ? WHERE id = ?",
+                                   (self.model, vector.tobytes(), example_id))
+            ids.append(example_id)
+            examples.append(SQLExample(question, sql))
+            vectors.append(vector)
+        self._conn.commit()
+        self._ids, self._examples = ids, examples
+        self._matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._examples)
+
+    def seed(self, examples: Iterable[Tuple[str, str]]):
+        """Add examples that are not in the store yet"""
+        for question, sql in examples:
+            self.add(question, sql)
+
+    def add(self, question: str, sql: str, verified: bool = True) -> bool:
+        """Store an example; returns False if the question is already known
+
+        Args:
+            question: Natural-language question
+            sql: SQL that answers it
+            verified: False queues the example until confirm(); it is not retrieved before
+        """
+        key = normalize_question(question)
+        if not key:
+            return False
+        vector = self._embed(question)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO sql_examples "
+                "(question_key, question, sql, model, embedding, verified, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, question, sql, self.model, vector.tobytes(), int(verified), datetime.now().isoformat()),
+            )
+            if not cursor.rowcount:
+                return False
+            if verified:
+                self._index(cursor.lastrowid, SQLExample(question, sql), vector)
+            else:
+                self._conn.execute(
+                    "DELETE FROM sql_examples WHERE id IN (SELECT id FROM sql_examples WHERE verified = 0 "
+                    "ORDER BY id DESC LIMIT -1 OFFSET ?)", (self.max_examples,))
+            self._conn.commit()
+        return True
+
+    def _index(self, example_id: int, example: SQLExample, vector: np.ndarray):
+        """Make a verified example searchable (lock held)"""
+        self._ids.append(example_id)
+        self._examples.append(example)
+        self._matrix = vector[None, :] if self._matrix.size == 0 else np.vstack([self._matrix, vector])
+        if len(self._ids) > self.max_examples:
+            self._evict()
+
+    def pending(self) -> List[SQLExample]:
+        """Examples waiting for confirmation, oldest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT question, sql FROM sql_examples WHERE verified = 0 ORDER BY id")
+            return [SQLExample(question, sql) for question, sql in rows]
+
+    def confirm(self, question: str) -> bool:
+        """Mark a pending example as verified so it is retrieved; returns False if none is pending"""
+        key = normalize_question(question)
+        with self._lock:
+            row = self._conn.execute("SELECT id, question, sql FROM sql_examples WHERE question_key = ? "
+                                     "AND verified = 0", (key,)).fetchone()
+            if row is None:
+                return False
+            example_id, stored_question, sql = row
+            vector = self._embed(stored_question)
+            self._conn.execute("UPDATE sql_examples SET verified = 1, model = ?, embedding = ? WHERE id = ?",
+                               (self.model, vector.tobytes(), example_id))
+            self._index(example_id, SQLExample(stored_question, sql), vector)
+            self._conn.commit()
+        return True
+
+    def remove(self, question: str) -> bool:
+        """Delete a pending or verified example (e.g. one found to be wrong)"""
+        key = normalize_question(question)
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM sql_examples WHERE question_key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM sql_examples WHERE id = ?", row)
+            self._conn.commit()
+            self._unindex({row[0]})
+        return True
+
+    def _evict(self):
+        """Drop the least used, oldest verified examples beyond max_examples (lock held)"""
+        excess = len(self._ids) - self.max_examples
+        evicted = {example_id for (example_id,) in self._conn.execute(
+            "SELECT id FROM sql_examples WHERE verified = 1 ORDER BY uses, id LIMIT ?", (excess,))}
+        self._conn.executemany("DELETE FROM sql_examples WHERE id = ?", [(i,) for i in evicted])
+        self._unindex(evicted)
+
+    def _unindex(self, removed: set):
+        """Drop examples from the search index (lock held)"""
+        keep = [i for i, example_id in enumerate(self._ids) if example_id not in removed]
+        self._ids = [self._ids[i] for i in keep]
+        self._examples = [self._examples[i] for i in keep]
+        self._matrix = self._matrix[keep]
+
+    def search(self, question: str, k: int = 3) -> List[SQLExample]:
+        """Return up to k stored examples most similar to the question"""
+        with self._lock:
+            if not self._examples:
+                return []
+            scores = self._matrix @ self._embed(question)
+            top = np.argsort(-scores)[:k]
+            hits = [i for i in top if scores[i] >= self.min_similarity]
+            self._conn.executemany("UPDATE sql_examples SET uses = uses + 1 WHERE id = ?",
+                                   [(self._ids[i],) for i in hits])
+            self._conn.commit()
+            return [SQLExample(self._examples[i].question, self._examples[i].sql, float(scores[i])) for i in hits]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_examples(examples: List[SQLExample]) -> str:
+    """Render examples for the SQL prompt"""
+    return "\n\n".join(f"Question: {example.question}\nSQL:\n{example.sql}" for example in examples)
+
+
+def main(argv=None):
+    """Review pending examples: list them, confirm good ones, remove wrong ones"""
+    parser = argparse.ArgumentParser(description="Review generated question -> SQL examples")
+    parser.add_argument("--db-path", default=str(Path("data") / "sql_examples.db"),
+                        help="Example store (default: data/sql_examples.db)")
+    parser.add_argument("action", choices=["list", "confirm", "remove"])
+    parser.add_argument("question", nargs="?", help="Question of the example to confirm or remove")
+    args = parser.parse_args(argv)
+    if args.action != "list" and not args.question:
+        parser.error(f"{args.action} needs the example's question")
+    if not Path(args.db_path).exists():
+        parser.error(f"{args.db_path} does not exist")
+
+    store = SQLExampleStore(Path(args.db_path))
+    try:
+        if args.action == "list":
+            pending = store.pending()
+            print(format_examples(pending) if pending else "No pending examples.")
+            return 0
+        done = store.confirm(args.question) if args.action == "confirm" else store.remove(args.question)
+        verb = {"confirm": "Confirmed", "remove": "Removed"}[args.action]
+        print(f"{verb}: {args.question}" if done else f"No matching example: {args.question}")
+        return 0 if done else 1
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
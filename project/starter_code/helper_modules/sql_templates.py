@@ -0,0 +1,176 @@
+"""
+SQL Templates Module - Parameterized SQL for recurring question shapes
+
+Most database questions have one of a few shapes: "holdings of customer X",
+"who owns symbol Y", "value of Z's portfolio". This module matches such
+questions to pre-validated parameterized SQL without calling the LLM. Only
+questions that match no template fall through to SQL generation.
+
+Key Concepts:
+1. Intent Patterns: Precompiled regular expressions recognize the question shape
+2. Slot Extraction: Symbols come from the shared entity resolver; customers are
+   matched by id ("customer 42") or by "First Last" name
+3. Conservative Matching: Questions with extra constraints (comparisons,
+   rankings, dates, numbers) are left to the LLM
+4. Safe Binding: Slot values (and the row limit) are bound as SQL parameters,
+   never formatted into SQL
+5. Pre-Validation: Every template is planned against the database once; templates
+   that do not fit the schema are disabled
+"""
+
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from .entity_resolver import EntityResolver
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_CUSTOMER_ID = re.compile(r"\b(?:customer|client|account)\s*(?:id\s*)?#?\s*(\d+)\b", re.IGNORECASE)
+# Last two words of a run of capitalized words, so a leading "Show"/"List" is not part of the name
+_PERSON_NAME = re.compile(r"\b(?:[A-Z][a-z]+\s+)*([A-Z][a-z]+)\s+([A-Z][a-z]+)('s?)?\b")
+# Anything beyond a plain lookup is left to the LLM
+_DISQUALIFIERS = re.compile(
+    r"\b(more|less|fewer|greater|than|between|above|below|over|under|top|most|least|average|avg|"
+    r"compare|comparison|versus|vs|sector|since|before|after|during|year|month|percent|rank|"
+    r"highest|lowest|largest|smallest|each|every|and|or)\b|[<>%]|\d",
+    re.IGNORECASE,
+)
+
+CUSTOMER_FILTERS = {
+    "customer_id": "c.id = :customer_id",
+    "customer_name": "c.first_name = :first_name AND c.last_name = :last_name",
+}
+
+
+@dataclass
+class SQLTemplate:
+    """A question shape and its parameterized SQL"""
+
+    name: str
+    intent: "re.Pattern[str]"
+    sql: str  # may contain {customer_filter}
+    needs_symbol: bool = False
+    needs_customer: bool = False
+    enabled: bool = True
+
+
+@dataclass
+class TemplateMatch:
+    """A template with bound parameters, ready to execute"""
+
+    template: str
+    sql: str
+    params: Dict[str, object] = field(default_factory=dict)
+
+
+DEFAULT_TEMPLATES = [
+    SQLTemplate(
+        name="customer_portfolio_value",
+        intent=re.compile(r"\b(value|worth|total)\b", re.IGNORECASE),
+        sql=("SELECT c.first_name, c.last_name, COUNT(ph.id) AS holdings_count, "
+             "SUM(ph.current_value) AS total_value\n"
+             "FROM customers c\nJOIN portfolio_holdings ph ON ph.customer_id = c.id\n"
+             "WHERE {customer_filter}\nGROUP BY c.id\nLIMIT :limit"),
+        needs_customer=True,
+    ),
+    SQLTemplate(
+        name="customer_holdings",
+        intent=re.compile(r"\b(holdings?|positions?|owns?|holds?|stocks?|shares|portfolio|invested)\b",
+                          re.IGNORECASE),
+        sql=("SELECT c.first_name, c.last_name, ph.symbol, ph.shares, ph.purchase_price, ph.current_value\n"
+             "FROM customers c\nJOIN portfolio_holdings ph ON ph.customer_id = c.id\n"
+             "WHERE {customer_filter}\nORDER BY ph.current_value DESC\nLIMIT :limit"),
+        needs_customer=True,
+    ),
+    SQLTemplate(
+        name="symbol_holders",
+        intent=re.compile(r"\b(who|which|what)\b.*\b(owns?|holds?|holding|invested|shareholders?|holders?)\b"
+                          r"|\b(shareholders?|holders|owners)\b", re.IGNORECASE),
+        sql=("SELECT c.first_name, c.last_name, ph.shares, ph.current_value\n"
+             "FROM portfolio_holdings ph\nJOIN customers c ON c.id = ph.customer_id\n"
+             "WHERE ph.symbol = :symbol\nORDER BY ph.shares DESC\nLIMIT :limit"),
+        needs_symbol=True,
+    ),
+]
+
+
+class SQLTemplateMatcher:
+    """Match questions to parameterized SQL templates"""
+
+    def __init__(self, resolver: EntityResolver, templates: List[SQLTemplate] = None):
+        """Initialize the matcher
+
+        Args:
+            resolver: Shared company/ticker resolver used for symbol slots
+            templates: Templates in priority order
+        """
+        self.resolver = resolver
+        # Copies, so validating against one database does not disable templates elsewhere
+        self.templates = [replace(template) for template in templates or DEFAULT_TEMPLATES]
+
+    def validate(self, conn: sqlite3.Connection):
+        """Plan every template variant once and disable those the schema cannot run"""
+        for template in self.templates:
+            variants = [template.sql.format(customer_filter=f) for f in CUSTOMER_FILTERS.values()] \
+                if template.needs_customer else [template.sql]
+            try:
+                for sql in variants:
+                    conn.execute(f"EXPLAIN QUERY PLAN {sql}", {
+                        "customer_id": 0, "first_name": "", "last_name": "", "symbol": "", "limit": 1})
+                template.enabled = True
+            except sqlite3.Error as e:
+                logger.info(f"SQL template {template.name} disabled: {e}")
+                template.enabled = False
+
+    def _slots(self, question: str) -> Tuple[List[str], Optional[Tuple[str, Dict[str, object]]], str]:
+        """Extract (symbols, customer filter, remaining text) from a question"""
+        matches = self.resolver.resolve(question)
+        symbols = list(dict.fromkeys(match.symbol for match in matches))
+        remaining = question
+        for match in sorted(matches, key=lambda m: m.start, reverse=True):
+            remaining = remaining[:match.start] + " " + remaining[match.end:]
+
+        customer = None
+        id_match = _CUSTOMER_ID.search(remaining)
+        if id_match:
+            customer = ("customer_id", {"customer_id": int(id_match.group(1))})
+            remaining = remaining[:id_match.start()] + " " + remaining[id_match.end():]
+        else:
+            names = list(_PERSON_NAME.finditer(remaining))
+            # A possessive ("Sarah Johnson's") marks the name when several runs are capitalized
+            name_match = next((m for m in names if m.group(3)), names[0] if names else None)
+            if name_match:
+                customer = ("customer_name", {"first_name": name_match.group(1),
+                                              "last_name": name_match.group(2)})
+                remaining = remaining[:name_match.start(1)] + " " + remaining[name_match.end():]
+        return symbols, customer, remaining
+
+    def match(self, question: str, limit: int = 100) -> Optional[TemplateMatch]:
+        """Return the bound template for a question, or None to fall through to the LLM
+
+        Args:
+            question: Natural language question
+            limit: Maximum number of rows the query returns
+        """
+        symbols, customer, remaining = self._slots(question)
+        if _DISQUALIFIERS.search(remaining):
+            return None
+
+        for template in self.templates:
+            if not template.enabled or not template.intent.search(remaining):
+                continue
+            if template.needs_customer:
+                if customer is None or symbols:
+                    continue
+                kind, params = customer
+                return TemplateMatch(template.name, template.sql.format(customer_filter=CUSTOMER_FILTERS[kind]),
+                                     {**params, "limit": limit})
+            if template.needs_symbol:
+                if len(symbols) != 1 or customer is not None:
+                    continue
+                return TemplateMatch(template.name, template.sql, {"symbol": symbols[0], "limit": limit})
+        return None
@@ -0,0 +1,115 @@
+"""
+Tool Results Module - Typed results passed between tools and the coordinator
+
+Function tools return a ToolResult (column names, row tuples and metadata)
+instead of a pre-formatted string. Masking and truncation operate directly on
+the rows, and the result is rendered to text only once, when the coordinator
+hands it to the LLM for synthesis.
+
+Key Concepts:
+1. Structured Data: Columns and row tuples exactly as produced by the data source
+2. Metadata: SQL text, row counts, truncation and masking information
+3. Lazy Rendering: Text is produced on first use and cached
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class ToolResult:
+    """Structured result returned by a function tool
+
+    Attributes:
+        columns: Column names, in row order
+        rows: Row tuples
+        metadata: Extra information (e.g. 'sql', 'title', 'truncated', 'total_rows', 'notes')
+        error: Error message when the tool failed
+    """
+
+    columns: List[str] = field(default_factory=list)
+    rows: List[Tuple[Any, ...]] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    _rendered: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def failure(cls, message: str, **metadata) -> "ToolResult":
+        """Create a result describing a failed tool call"""
+        return cls(metadata=metadata, error=message)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Return the rows as column -> value dictionaries"""
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def with_rows(self, rows: Sequence[Tuple[Any, ...]], **metadata) -> "ToolResult":
+        """Return a copy with different rows and merged metadata (rendering is reset)"""
+        return replace(self, rows=list(rows), metadata={**self.metadata, **metadata})
+
+    def head(self, max_rows: int) -> "ToolResult":
+        """Truncate to the first max_rows rows, recording the original row count"""
+        if len(self.rows) <= max_rows:
+            return self
+        return self.with_rows(
+            self.rows[:max_rows],
+            truncated=True,
+            total_rows=self.metadata.get("total_rows", len(self.rows)),
+        )
+
+    def mask_pii(self, engine) -> "ToolResult":
+        """Mask PII columns with a PIIMaskingEngine, column by column"""
+        if not self.rows:
+            return self
+        masked_rows, masked_fields = engine.mask_rows(self.columns, self.rows)
+        if not masked_fields:
+            return self
+        return self.with_rows(masked_rows, pii_masked_fields=sorted(masked_fields))
+
+    def render(self) -> str:
+        """Render the result as text for the LLM (cached after the first call)"""
+        if self._rendered is None:
+            self._rendered = self._render()
+        return self._rendered
+
+    def _render(self) -> str:
+        if self.error is not None:
+            return self.error
+
+        lines = []
+        if self.metadata.get("sql"):
+            lines.append(f"SQL Query: {self.metadata['sql']}\n")
+
+        if self.columns:
+            lines.append(self.metadata.get("title") or f"Database Results ({self.row_count} rows):")
+            lines.extend(repr(row) for row in self.as_dicts())
+        else:
+            lines.extend(str(row[0]) if len(row) == 1 else repr(row) for row in self.rows)
+
+        if self.metadata.get("truncated"):
+            lines.append(f"... showing {self.row_count} of {self.metadata['total_rows']} rows")
+        if self.metadata.get("notes"):
+            lines.extend(self.metadata["notes"])
+        if self.metadata.get("pii_masked_fields"):
+            lines.append(f"🔒 PII protection applied - masked fields: "
+                         f"{', '.join(self.metadata['pii_masked_fields'])}")
+        if self.columns:
+            lines.append(f"COLUMNS: {self.columns}")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+def render_result(result: Any) -> str:
+    """Render any tool output (ToolResult, ToolOutput, Response, str) as text"""
+    if isinstance(result, ToolResult):
+        return result.render()
+    return str(result)
@@ -0,0 +1,43 @@
+"""
+Shared Test Fixtures
+
+Usage:
+    Picked up automatically by python -m pytest tests/
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def make_function_tools(tmp_path, monkeypatch):
+    """Factory for a FunctionToolsManager over a test database
+
+    make_function_tools(db_path, **attributes) returns (manager, tools by name). The
+    manager is built in an empty working directory, so nothing is read from or created
+    in the project's data directory; it has a Mock LLM and no columnar engine, and
+    `attributes` override manager attributes before the tools are created.
+    """
+    from helper_modules.function_tools import FunctionToolsManager
+
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    def make(db_path, **attributes):
+        manager = FunctionToolsManager(verbose=False)
+        manager.db_path = Path(db_path)
+        manager.analytics_engine = None
+        manager.llm = Mock()
+        for name, value in attributes.items():
+            setattr(manager, name, value)
+        tools = {tool.metadata.name: tool for tool in manager.create_function_tools()}
+        return manager, tools
+
+    return make
@@ -0,0 +1,178 @@
+"""
+Test Analytics Engine Module - Columnar execution of aggregate-heavy SQL
+
+Usage:
+    python -m pytest tests/test_analytics_engine.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.analytics_engine import is_analytical_query
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Holdings and companies for two sectors"""
+    path = tmp_path / "financial.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE companies (id INTEGER PRIMARY KEY, symbol TEXT, name TEXT, sector TEXT);
+        CREATE TABLE portfolio_holdings (id INTEGER PRIMARY KEY, customer_id INTEGER, symbol TEXT,
+            shares REAL, current_value REAL);
+        INSERT INTO companies (symbol, name, sector) VALUES
+            ('AAPL', 'Apple Inc.', 'Technology'), ('TSLA', 'Tesla Inc.', 'Automotive');
+        INSERT INTO portfolio_holdings (customer_id, symbol, shares, current_value) VALUES
+            (1, 'AAPL', 10, 1750.0), (2, 'AAPL', 5, 875.0), (2, 'TSLA', 4, 840.0);
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+SECTOR_ROLLUP = ("SELECT co.sector, SUM(ph.current_value) AS total_value FROM portfolio_holdings ph "
+                 "JOIN companies co ON ph.symbol = co.symbol GROUP BY co.sector ORDER BY co.sector")
+
+
+class TestRouting:
+    """Test query-shape routing"""
+
+    def test_aggregates_route_to_columnar_engine(self):
+        """Test 1: Rollups, window functions and table-wide aggregates are analytical"""
+        assert is_analytical_query(SECTOR_ROLLUP)
+        assert is_analytical_query("SELECT symbol, AVG(close_price) OVER (PARTITION BY symbol) FROM market_data")
+        assert is_analytical_query("WITH t AS (SELECT COUNT(*) AS n FROM customers) SELECT n FROM t")
+
+    def test_point_lookups_stay_on_sqlite(self):
+        """Test 2: Key lookups and non-SELECT statements are not analytical"""
+        assert not is_analytical_query("SELECT * FROM portfolio_holdings WHERE customer_id = 42")
+        assert not is_analytical_query("SELECT SUM(current_value) FROM portfolio_holdings WHERE symbol = 'AAPL'")
+        assert not is_analytical_query("SELECT c.first_name FROM customers c WHERE c.id = 7")
+        assert not is_analytical_query("DELETE FROM customers WHERE id IN (SELECT MAX(id) FROM customers)")
+
+    def test_dialect_sensitive_queries_stay_on_sqlite(self):
+        """Test 3: LIKE, division and SQLite date functions are not routed; string literals are ignored"""
+        assert not is_analytical_query("SELECT COUNT(*) FROM companies WHERE name LIKE '%tesla%'")
+        assert not is_analytical_query("SELECT COUNT(*) / COUNT(DISTINCT customer_id) FROM portfolio_holdings")
+        assert not is_analytical_query("SELECT strftime('%Y', date) AS year, AVG(close_price) FROM market_data "
+                                       "GROUP BY year")
+        assert is_analytical_query("SELECT sector, COUNT(*) FROM companies WHERE sector <> 'like a/b' "
+                                   "GROUP BY sector")
+
+
+class TestColumnarEngine:
+    """Test DuckDB execution over the SQLite file"""
+
+    def test_results_match_sqlite(self, db_path):
+        """Test 4: DuckDB returns the same rows as SQLite; stale snapshots are reloaded off the request path"""
+        pytest.importorskip("duckdb")
+        from helper_modules.analytics_engine import ColumnarAnalyticsEngine, ColumnarUnavailable
+
+        engine = ColumnarAnalyticsEngine(db_path, refresh_interval=3600)
+        with pytest.raises(ColumnarUnavailable):
+            engine.execute(SECTOR_ROLLUP)  # not loaded yet: the caller uses SQLite
+        assert engine.load() in ("attached", "snapshot")
+        rows, columns = engine.execute(SECTOR_ROLLUP)
+        assert columns == ["sector", "total_value"]
+        assert rows == [("Automotive", 840.0), ("Technology", 2625.0)]
+
+        # A snapshot older than the database file is never queried; it is reloaded in the background
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO portfolio_holdings (customer_id, symbol, shares, current_value) "
+                     "VALUES (3, 'TSLA', 1, 210.0)")
+        conn.commit()
+        conn.close()
+        if engine.mode == "snapshot":
+            with pytest.raises(ColumnarUnavailable):
+                engine.execute(SECTOR_ROLLUP)
+            engine.load()
+        rows, _ = engine.execute(SECTOR_ROLLUP)
+        assert rows[0] == ("Automotive", 1050.0)
+        engine.close()
+
+    @pytest.mark.parametrize("sql", [
+        SECTOR_ROLLUP,
+        "SELECT customer_id, COUNT(*) AS n, MAX(symbol) AS top FROM portfolio_holdings "
+        "GROUP BY customer_id ORDER BY customer_id",
+        "SELECT symbol, SUM(shares) AS shares, AVG(current_value) AS avg_value FROM portfolio_holdings "
+        "GROUP BY symbol ORDER BY shares DESC",
+        "SELECT co.name, COUNT(ph.id) AS holders FROM companies co LEFT JOIN portfolio_holdings ph "
+        "ON ph.symbol = co.symbol AND ph.shares > 100 GROUP BY co.name ORDER BY holders, co.name",
+        "SELECT sector, COUNT(*) AS n FROM companies GROUP BY sector ORDER BY sector",
+    ])
+    def test_routed_queries_match_on_both_engines(self, db_path, sql):
+        """Test 5: Every query routed to DuckDB returns exactly what SQLite returns"""
+        pytest.importorskip("duckdb")
+        from helper_modules.analytics_engine import ColumnarAnalyticsEngine
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO companies (symbol, name, sector) VALUES ('XOM', 'Exxon Mobil', NULL)")
+        conn.commit()
+        expected = conn.execute(sql).fetchall()
+        conn.close()
+
+        engine = ColumnarAnalyticsEngine(db_path)
+        engine.load()
+        assert is_analytical_query(sql)
+        assert engine.execute(sql)[0] == expected
+        engine.close()
+
+    def test_quote_write_back_keeps_snapshot(self, db_path):
+        """Test 6: Quote write-backs do not stale the snapshot and queries run concurrently"""
+        pytest.importorskip("duckdb")
+        from concurrent.futures import ThreadPoolExecutor
+        from helper_modules.analytics_engine import ColumnarAnalyticsEngine
+        from helper_modules.market_store import LocalQuoteStore
+
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE market_data (id INTEGER PRIMARY KEY, symbol TEXT, date TEXT, close_price REAL,
+                volume INTEGER, market_cap REAL);
+            INSERT INTO market_data (symbol, date, close_price, volume, market_cap) VALUES
+                ('AAPL', '2024-01-02', 175.0, 100, NULL);
+        """)
+        conn.commit()
+        conn.close()
+
+        engine = ColumnarAnalyticsEngine(db_path, refresh_interval=0)
+        engine.load()
+        store = LocalQuoteStore(db_path, write_scope=engine.quote_write)
+        store.write_back({"symbol": "AAPL", "price": 180.0, "volume": 50, "success": True})
+        store.close()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: engine.execute(SECTOR_ROLLUP)[0], range(8)))
+        assert results == [[("Automotive", 840.0), ("Technology", 2625.0)]] * 8
+
+        # The write-back reaches the snapshot with the next background reload
+        engine.close()
+        engine.load()
+        assert engine.execute("SELECT COUNT(*) FROM market_data")[0] == [(2,)]
+        engine.close()
+
+    def test_database_tool_routes_by_shape(self, db_path, make_function_tools):
+        """Test 7: The SQL tool uses the columnar engine for rollups and SQLite otherwise"""
+        manager, tools = make_function_tools(db_path, analytics_engine=Mock())
+        manager.analytics_engine.execute.return_value = ([("Technology", 1.0)], ["sector", "total_value"])
+        database_query_tool = tools["database_query_tool"].fn
+
+        manager.llm.complete.return_value = SECTOR_ROLLUP
+        assert database_query_tool("Sector exposure").metadata["engine"] == "duckdb"
+
+        manager.llm.complete.return_value = "SELECT symbol FROM portfolio_holdings WHERE customer_id = 1"
+        result = database_query_tool("Holdings of customer 1")
+        assert result.metadata["engine"] == "sqlite" and result.rows == [("AAPL",)]
+
+        # Queries DuckDB rejects are re-run on SQLite
+        manager.analytics_engine.execute.side_effect = RuntimeError("unsupported function")
+        manager.llm.complete.return_value = SECTOR_ROLLUP
+        result = database_query_tool("Sector exposure")
+        assert result.metadata["engine"] == "sqlite"
+        assert result.rows == [("Automotive", 840.0), ("Technology", 2625.0)]
@@ -0,0 +1,117 @@
+"""
+Test Database Builder - Synthetic data generation at configurable scale
+
+Usage:
+    python -m pytest tests/test_build_database.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add the data directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+
+from build_database import create_database, make_symbols
+
+
+def table_dump(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            table: conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+            for table in ["companies", "customers", "portfolio_holdings", "market_data"]
+        }
+    finally:
+        conn.close()
+
+
+class TestSyntheticData:
+    """Test the scale-out synthetic generator"""
+
+    def test_requested_scale(self, tmp_path):
+        """Test 1: Row counts follow --customers/--symbols/--days"""
+        db_path = str(tmp_path / "financial.db")
+        create_database(db_path, customers=250, symbols=40, days=15, seed=7, batch_size=100)
+        tables = table_dump(db_path)
+
+        assert len(tables["customers"]) == 250
+        assert len(tables["companies"]) == 40
+        assert len(tables["market_data"]) == 40 * 15
+        assert {row[1] for row in tables["companies"][:3]} == {"AAPL", "GOOGL", "TSLA"}
+
+        conn = sqlite3.connect(db_path)
+        orphans = conn.execute("""
+            SELECT COUNT(*) FROM portfolio_holdings h
+            LEFT JOIN customers c ON c.id = h.customer_id
+            LEFT JOIN companies co ON co.symbol = h.symbol
+            WHERE c.id IS NULL OR co.symbol IS NULL
+        """).fetchone()[0]
+        assert orphans == 0
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        conn.close()
+
+    def test_seed_is_deterministic_across_workers(self, tmp_path):
+        """Test 2: Same seed gives identical data with one or several workers"""
+        serial, parallel = str(tmp_path / "serial.db"), str(tmp_path / "parallel.db")
+        create_database(serial, customers=300, symbols=10, days=20, seed=3, workers=1, batch_size=64)
+        create_database(parallel, customers=300, symbols=10, days=20, seed=3, workers=2, batch_size=64)
+        assert table_dump(serial) == table_dump(parallel)
+
+    def test_symbols_avoid_finance_acronyms(self):
+        """Test 3: Synthetic tickers never spell acronyms the entity resolver treats as words"""
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from helper_modules.entity_resolver import TICKER_STOPWORDS
+
+        symbols = [symbol for symbol, *_ in make_symbols(20000)]
+        assert len(set(symbols)) == 20000
+        assert not TICKER_STOPWORDS & set(symbols)
+
+
+SUMMARY_CHECK = """
+    SELECT {key}, COUNT(*), ROUND(SUM(shares), 4), ROUND(SUM(shares * purchase_price), 4),
+           ROUND(SUM(current_value), 4)
+    FROM portfolio_holdings GROUP BY {key} ORDER BY {key}
+"""
+SUMMARY_ROWS = """
+    SELECT {key}, holdings_count, ROUND(total_shares, 4), ROUND(total_cost, 4), ROUND(total_value, 4)
+    FROM {table} ORDER BY {key}
+"""
+
+
+def assert_summaries_match(conn):
+    for table, key in [("customer_portfolio_summary", "customer_id"), ("symbol_holdings_summary", "symbol")]:
+        expected = conn.execute(SUMMARY_CHECK.format(key=key)).fetchall()
+        assert conn.execute(SUMMARY_ROWS.format(key=key, table=table)).fetchall() == expected
+
+
+class TestSummaryTables:
+    """Test the materialized portfolio summaries"""
+
+    def test_summaries_built_and_maintained(self, tmp_path):
+        """Test 4: Summaries match a full GROUP BY after load and after changes"""
+        db_path = str(tmp_path / "financial.db")
+        create_database(db_path, customers=200, symbols=10, days=5, seed=1)
+        conn = sqlite3.connect(db_path)
+        assert_summaries_match(conn)
+
+        conn.execute("INSERT INTO portfolio_holdings (customer_id, symbol, shares, purchase_price, current_value) "
+                     "VALUES (1, 'AAPL', 10, 100.0, 1500.0)")
+        conn.execute("UPDATE portfolio_holdings SET symbol = 'TSLA', shares = shares + 1 WHERE customer_id = 2")
+        conn.execute("DELETE FROM portfolio_holdings WHERE customer_id = 3")
+        conn.commit()
+        assert_summaries_match(conn)
+        assert conn.execute("SELECT COUNT(*) FROM customer_portfolio_summary WHERE customer_id = 3").fetchone()[0] == 0
+        conn.close()
+
+    def test_schema_prompt_advertises_summaries(self, tmp_path, monkeypatch):
+        """Test 5: The SQL generator sees the summary tables and their examples when present"""
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from helper_modules.function_tools import FunctionToolsManager
+
+        create_database(str(tmp_path / "data" / "financial.db"))
+        monkeypatch.chdir(tmp_path)
+        manager = FunctionToolsManager()
+        assert "TABLE: customer_portfolio_summary" in manager.db_schema
+        examples = manager.get_sql_example_store().search("What is our exposure by sector?", k=1)
+        assert "FROM symbol_holdings_summary ss" in examples[0].sql
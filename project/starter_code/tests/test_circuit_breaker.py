@@ -0,0 +1,208 @@
+"""
+Test Circuit Breaker Module - Per-tool health tracking and fast failure
+
+Usage:
+    python -m pytest tests/test_circuit_breaker.py -v
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from helper_modules.tool_results import ToolResult
+
+
+def breaker(now, **kwargs):
+    config = dict(window_size=10, window_seconds=60.0, min_calls=4, failure_rate=0.5,
+                  slow_call_seconds=2.0, slow_call_rate=0.75, open_seconds=30.0)
+    return CircuitBreaker("finance_market_search_tool", clock=lambda: now[0], **{**config, **kwargs})
+
+
+class TestCircuitBreaker:
+    """Test state transitions"""
+
+    def test_opens_on_error_rate_and_fails_fast(self):
+        """Test 1: The breaker opens once the error rate is reached and rejects calls"""
+        now = [0.0]
+        cb = breaker(now)
+        for success in (True, False, True):
+            cb.record(success, 0.1)
+        assert cb.state == CLOSED  # below min_calls
+
+        cb.record(False, 0.1)  # 2 of 4 failed
+        assert cb.state == OPEN
+        assert not cb.allow()
+        with pytest.raises(CircuitOpenError):
+            cb.call(lambda: "never called")
+        snapshot = cb.snapshot()
+        assert snapshot["state"] == OPEN and snapshot["error_rate"] == 0.5 and snapshot["rejected"] == 2
+        assert snapshot["retry_in_s"] == 30.0
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """Test 2: After open_seconds one probe decides between closing and re-opening"""
+        now = [0.0]
+        cb = breaker(now)
+        for _ in range(4):
+            cb.record(False, 0.1)
+
+        now[0] = 31.0
+        assert cb.allow() and cb.state == HALF_OPEN
+        assert not cb.allow()  # only one probe at a time
+        cb.record(False, 0.1)
+        assert cb.state == OPEN
+
+        now[0] = 62.0
+        assert cb.call(lambda: "recovered") == "recovered"
+        assert cb.state == CLOSED and cb.snapshot()["calls"] == 0
+
+    def test_slow_calls_and_window_expiry(self):
+        """Test 3: Slow calls trip the breaker; old outcomes leave the window"""
+        now = [0.0]
+        cb = breaker(now)
+        for _ in range(3):
+            cb.record(False, 0.1)
+        now[0] = 61.0
+        cb.record(True, 0.1)
+        assert cb.state == CLOSED and cb.snapshot()["calls"] == 1  # old failures forgotten
+
+        for _ in range(3):
+            cb.record(True, 5.0)
+        assert cb.state == OPEN and cb.snapshot()["slow_call_rate"] == 0.75
+
+    def test_returned_failures_count(self):
+        """Test 4: call() classifies returned error results as failures"""
+        now = [0.0]
+        cb = breaker(now, min_calls=2)
+        for _ in range(2):
+            cb.call(lambda: ToolResult.failure("Yahoo Finance returned 503"), is_failure=lambda r: not r.ok)
+        assert cb.state == OPEN
+
+    def test_neutral_failures_discarded(self):
+        """Test 5: Neutral failures leave the window untouched and free the half-open probe"""
+        now = [0.0]
+        cb = breaker(now, min_calls=2)
+
+        def timeout():
+            raise TimeoutError("capped by our deadline")
+
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                cb.call(timeout, is_neutral=lambda e: True)
+        assert cb.state == CLOSED and cb.snapshot()["calls"] == 0
+
+        for _ in range(2):
+            cb.record(False, 0.1)
+        now[0] = 31.0
+        assert cb.allow() and cb.state == HALF_OPEN
+        cb.discard()
+        assert cb.allow()  # the probe slot was released
+
+    def test_abandoned_calls_count_as_slow(self):
+        """Test 6: Calls the caller stopped waiting for are slow whatever their latency"""
+        now = [0.0]
+        cb = breaker(now, min_calls=2)
+
+        def cut_short():
+            raise TimeoutError("cut short by our deadline")
+
+        with pytest.raises(TimeoutError):
+            cb.call(cut_short, is_slow=lambda e: True)
+        cb.record(True, 0.05, slow=True)
+        assert cb.state == OPEN
+        assert cb.snapshot()["error_rate"] == 0.0 and cb.snapshot()["slow_call_rate"] == 1.0
+
+
+class TestCoordinatorBreakers:
+    """Test breakers in the coordinator's tool execution path"""
+
+    @pytest.fixture
+    def agent(self):
+        from llama_index.core.tools import FunctionTool
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        agent = AgentCoordinator()
+        agent.circuit_breakers.config.update(min_calls=3, failure_rate=0.5)
+        agent.upstream = Mock(side_effect=["AAPL price: $230.00"] + [RuntimeError("503 from upstream")] * 10)
+        tool = FunctionTool.from_defaults(fn=lambda query: agent.upstream(query),
+                                          name="finance_market_search_tool", description="Market quotes")
+        agent.setup(document_tools=[], function_tools=[tool])
+        agent.market_tool = tool
+        return agent
+
+    def test_open_circuit_serves_last_good_result(self, agent):
+        """Test 7: After repeated failures the tool is skipped and its cached result served"""
+        question = "What is Apple's stock price?"
+        results = [agent._execute_tools(question, [agent.market_tool])[0][2] for _ in range(3)]
+        assert results[0] == "AAPL price: $230.00" and results[1].startswith("Tool error")
+
+        served = agent._execute_tools(question, [agent.market_tool])[0][2]
+        assert agent.upstream.call_count == 3  # not called while open
+        assert served.startswith("AAPL price: $230.00") and "cached result" in served
+
+        other = agent._execute_tools("What is Tesla's stock price?", [agent.market_tool])[0][2]
+        assert isinstance(other, ToolResult) and other.metadata["circuit_open"]
+
+        status = agent.get_status()["circuit_breakers"]["finance_market_search_tool"]
+        assert status["state"] == OPEN and status["rejected"] == 2
+
+    def test_open_llm_circuit_routes_without_llm(self, agent):
+        """Test 8: With the LLM circuit open, routing falls back to entity routing at once"""
+        agent.llm = Mock()
+        llm_breaker = agent.circuit_breakers.get("llm")
+        for _ in range(3):
+            llm_breaker.record(False, 0.1)
+
+        routed = agent._route_query("What is Apple's stock price?")
+
+        agent.llm.complete.assert_not_called()
+        assert [name for name, _, _ in routed] == ["finance_market_search_tool"]
+
+    def test_deadline_attribution(self, agent):
+        """Test 9: Calls the deadline kept from starting are ignored; cut-short calls are slow, own timeouts fail"""
+        from helper_modules.deadlines import DeadlineExceeded
+
+        question = "What is Apple's stock price?"
+        agent.llm = Mock()
+        agent.llm.complete.side_effect = DeadlineExceeded("LLM request waited for a free slot past the query deadline")
+        agent.upstream.side_effect = DeadlineExceeded("SQL query started after the query deadline")
+        for _ in range(4):
+            with pytest.raises(DeadlineExceeded):
+                agent._complete("prompt", "routing")
+            assert agent._run_tool(agent.market_tool, question).startswith("Tool error")
+        status = agent.get_status()["circuit_breakers"]
+        for name in ("llm", "finance_market_search_tool"):
+            assert status[name]["state"] == CLOSED and status[name]["calls"] == 0
+
+        agent.upstream.side_effect = DeadlineExceeded("SQL query cut short by the query deadline", started=True)
+        agent.llm.complete.side_effect = TimeoutError("Request timed out")  # the client's own limit
+        for _ in range(3):
+            agent._run_tool(agent.market_tool, question)
+            with pytest.raises(TimeoutError):
+                agent._complete("prompt", "routing")
+        status = agent.get_status()["circuit_breakers"]
+        tool = status["finance_market_search_tool"]
+        assert tool["state"] == OPEN and tool["slow_call_rate"] == 1.0 and tool["error_rate"] == 0.0
+        assert status["llm"]["state"] == OPEN and status["llm"]["error_rate"] == 1.0
+
+    def test_hanging_tool_opens_circuit(self, agent):
+        """Test 10: Tools abandoned while still running are recorded once, as slow calls"""
+        import threading
+        from helper_modules.deadlines import Deadline, deadline_scope
+
+        release = threading.Event()
+        agent.upstream.side_effect = lambda query: release.wait(5) and "AAPL price: $230.00"
+        for _ in range(3):
+            with deadline_scope(Deadline.from_ms(40)):
+                result = agent._execute_tools("What is Apple's stock price?", [agent.market_tool])[0][2]
+            assert agent._is_failure(result)  # abandoned, or a joined call that ended at the deadline
+        release.set()
+        agent._tool_executor.shutdown(wait=True)  # the abandoned calls finish without recording again
+
+        status = agent.get_status()["circuit_breakers"]["finance_market_search_tool"]
+        assert status["state"] == OPEN and status["calls"] == 3 and status["slow_call_rate"] == 1.0
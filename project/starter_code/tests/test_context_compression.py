@@ -0,0 +1,105 @@
+"""
+Test Context Compression Module - Extractive compression before synthesis
+
+Usage:
+    python -m pytest tests/test_context_compression.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.context_compression import ContextCompressor
+from helper_modules.llm_usage import count_tokens
+from helper_modules.tool_results import ToolResult
+
+FILLER = (
+    "The company refers readers to the forward-looking statements section of this report. "
+    "Management has prepared the consolidated statements in accordance with generally accepted principles. "
+    "Certain prior period amounts have been reclassified to conform to the current presentation. "
+)
+TESLA_10K = (
+    FILLER * 4
+    + "Total revenues were $97.7 billion in 2024, an increase of 1% compared to 2023. "
+    + FILLER * 4
+    + "Automotive revenue decreased due to lower average selling prices. "
+)
+
+
+def holdings(rows: int) -> ToolResult:
+    symbols = ["AAPL", "GOOGL", "TSLA", "MSFT"]
+    return ToolResult(
+        columns=["customer_id", "symbol", "shares", "current_value"],
+        rows=[(i, symbols[i % 4], 10 + i, 1000.0 + i) for i in range(rows)],
+        metadata={"sql": "SELECT customer_id, symbol, shares, current_value FROM portfolio_holdings",
+                  "pii_masked_fields": ["customer_id"]},
+    )
+
+
+class TestCompression:
+    """Test sentence and row selection"""
+
+    def test_small_results_pass_through(self):
+        """Test 1: Results within the budget are not modified"""
+        results = [{"tool": "finance_market_search_tool", "result": "TSLA price: $250.00 (+1.2%)"},
+                   {"tool": "database_query_tool", "result": holdings(3)}]
+        sections, stats = ContextCompressor(token_budget=1500).compress("Tesla price and holders?", results)
+
+        assert [section["text"] for section in sections] == [str(item["result"]) for item in results]
+        assert stats.kept_units == stats.total_units
+
+    def test_keeps_relevant_sentences_within_budget(self):
+        """Test 2: The relevant sentence survives, boilerplate is dropped, the budget holds"""
+        results = [{"tool": "TSLA_10k_filing_tool", "result": TESLA_10K},
+                   {"tool": "finance_market_search_tool", "result": "TSLA price: $250.00 (+1.2%)"}]
+        sections, stats = ContextCompressor(token_budget=80).compress(
+            "What were Tesla's total revenues in 2024?", results, extra_keywords=["TSLA"])
+
+        assert "Total revenues were $97.7 billion in 2024" in sections[0]["text"]
+        assert "reclassified" not in sections[0]["text"]
+        assert "[...]" in sections[0]["text"]
+        assert sections[1]["text"] == "TSLA price: $250.00 (+1.2%)"  # every tool keeps its best unit
+        assert stats.compressed_tokens <= 80 < stats.original_tokens
+
+    def test_rows_filtered_by_relevance(self):
+        """Test 3: Database rows matching the question are kept and truncation is noted"""
+        results = [{"tool": "database_query_tool", "result": holdings(200)}]
+        sections, _ = ContextCompressor(token_budget=300).compress(
+            "Which customers hold Tesla?", results, extra_keywords=["TSLA"])
+        text = sections[0]["text"]
+
+        kept_rows = [line for line in text.splitlines() if line.startswith("{")]
+        assert kept_rows and all("'TSLA'" in line for line in kept_rows)
+        assert "of 200 rows" in text
+        assert "PII protection applied" in text and "COLUMNS:" in text
+
+
+class TestSynthesisBudget:
+    """Test that synthesis prompts stay flat as tools are added"""
+
+    def test_prompt_size_flat_in_number_of_tools(self):
+        """Test 4: The synthesis prompt stays within budget however many tools fire"""
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        agent = AgentCoordinator()
+        agent.llm = Mock()
+        agent.llm.complete.return_value = "Tesla reported $97.7 billion in revenue."
+        prompt_tokens = []
+        for tools in (3, 12):
+            results = [{"tool": f"tool_{i}", "result": TESLA_10K} for i in range(tools - 1)]
+            results.append({"tool": "database_query_tool", "result": holdings(500)})
+            agent._synthesize_results("What were Tesla's total revenues in 2024?", results)
+            prompt_tokens.append(count_tokens(agent.llm.complete.call_args[0][0]))
+
+        assert agent.last_compression.compressed_tokens <= agent.context_compressor.token_budget
+        # Statistics belong to the query that produced them, not to concurrent queries
+        other_thread = []
+        thread = threading.Thread(target=lambda: other_thread.append(agent.last_compression))
+        thread.start()
+        thread.join()
+        assert other_thread == [None]
+        assert max(prompt_tokens) <= agent.context_compressor.token_budget + 200
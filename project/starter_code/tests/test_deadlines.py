@@ -0,0 +1,156 @@
+"""
+Test Deadlines Module - Per-query time budgets and graceful partial answers
+
+Usage:
+    python -m pytest tests/test_deadlines.py -v
+"""
+
+import contextvars
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import Mock
+
+import httpx
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.deadlines import (
+    Deadline, DeadlineExceeded, bounded_timeout, current_deadline, deadline_scope,
+)
+from helper_modules.llm_client import ResilientTransport, TokenBucket
+
+
+class TestDeadline:
+    """Test deadline arithmetic and propagation"""
+
+    def test_remaining_reserve_and_check(self):
+        """Test 1: Remaining time shrinks, reserves end earlier and expiry raises"""
+        now = [100.0]
+        deadline = Deadline.from_ms(3000, clock=lambda: now[0])
+        tools = deadline.reserve(0.75)
+
+        now[0] = 101.0
+        assert deadline.remaining() == pytest.approx(2.0)
+        assert tools.remaining() == pytest.approx(1.25)
+        now[0] = 103.5
+        assert deadline.expired() and deadline.remaining() == 0.0
+        with pytest.raises(DeadlineExceeded, match="synthesis exceeded the 3000ms deadline"):
+            deadline.check("synthesis")
+
+    def test_scopes_tighten_and_propagate_to_threads(self):
+        """Test 2: Inner scopes never extend the deadline and copied contexts carry it"""
+        outer, looser, tighter = Deadline(1.0), Deadline(60.0), Deadline(0.5)
+        assert current_deadline() is None and bounded_timeout(10.0) == 10.0
+
+        with deadline_scope(outer):
+            with deadline_scope(looser):
+                assert current_deadline() is outer
+            with deadline_scope(tighter):
+                assert current_deadline() is tighter
+            assert bounded_timeout(10.0) <= 1.0
+            context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(context.run, current_deadline).result() is outer
+        assert current_deadline() is None
+
+
+class TestTransportDeadline:
+    """Test deadline handling in the shared LLM transport"""
+
+    def test_expired_deadline_and_retry_budget(self):
+        """Test 3: No request after expiry, no retry that cannot finish, capped timeouts"""
+        seen_timeouts, responses = [], []
+
+        def handler(request):
+            seen_timeouts.append(request.extensions["timeout"]["read"])
+            return responses.pop(0)
+
+        transport = ResilientTransport(httpx.MockTransport(handler), TokenBucket(rate=1000.0, capacity=1000),
+                                       sleep=lambda seconds: None)
+        client = httpx.Client(transport=transport, timeout=60.0)
+
+        with deadline_scope(Deadline(0.0)):
+            with pytest.raises(DeadlineExceeded):
+                client.get("https://api.test/")
+        assert seen_timeouts == []
+
+        responses.append(httpx.Response(429, headers={"retry-after": "30"}))
+        with deadline_scope(Deadline(2.0)):
+            assert client.get("https://api.test/").status_code == 429  # a 30s retry would miss the deadline
+        assert len(seen_timeouts) == 1 and seen_timeouts[0] <= 2.0
+
+
+class TestBoundedWaits:
+    """Test that blocking waits inside a query end at its deadline"""
+
+    def test_waits_end_at_deadline(self):
+        """Test 4: SQL, rate-limit and shared-call waits give up when the query deadline passes"""
+        from helper_modules.query_guard import QueryGuard
+        from helper_modules.single_flight import SingleFlight
+
+        conn = sqlite3.connect(":memory:")
+        runaway = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+        start = time.monotonic()
+        with deadline_scope(Deadline(0.2)), pytest.raises(DeadlineExceeded):
+            QueryGuard(timeout=5.0).run(conn, runaway)
+        assert time.monotonic() - start < 1.0
+        conn.close()
+
+        bucket = TokenBucket(rate=0.1, capacity=1)
+        assert bucket.acquire() == 0.0
+        transport = ResilientTransport(httpx.MockTransport(lambda request: httpx.Response(200)), bucket)
+        with deadline_scope(Deadline(0.5)), pytest.raises(DeadlineExceeded, match="rate limit"):
+            httpx.Client(transport=transport).get("https://api.test/")
+        assert bucket.acquire(timeout=0) is None  # the refused request took no token
+
+        group, release = SingleFlight(), threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            leader = pool.submit(group.do, "key", lambda: release.wait(5) and "done")
+            while not group.in_flight():
+                time.sleep(0.01)
+            start = time.monotonic()
+            with deadline_scope(Deadline(0.2)), pytest.raises(DeadlineExceeded):
+                group.do("key", lambda: "follower ran")
+            assert time.monotonic() - start < 1.0
+            release.set()
+            assert leader.result() == ("done", False)
+
+
+class TestPartialAnswers:
+    """Test coordinator behaviour when tools miss the deadline"""
+
+    def test_slow_tool_dropped_and_flagged(self):
+        """Test 5: The answer arrives on time from the tools that responded, naming the others"""
+        from llama_index.core.tools import FunctionTool
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        release = threading.Event()
+
+        def hanging_filing(query: str) -> str:
+            release.wait(10)
+            return "Apple designs smartphones."
+
+        fast = FunctionTool.from_defaults(fn=lambda query: "AAPL price: $230.00",
+                                          name="finance_market_search_tool", description="Market quotes")
+        slow = FunctionTool.from_defaults(fn=hanging_filing, name="AAPL_10k_filing_tool",
+                                          description="Apple 10-K filing")
+        agent = AgentCoordinator()
+        agent.setup(document_tools=[slow], function_tools=[fast])
+        agent._tools_initialized = True
+        agent.llm = Mock()
+        agent.llm.complete.return_value = "1, 2"
+
+        start = time.monotonic()
+        answer = agent.query("What is Apple's stock price and business?", deadline_ms=500)
+        elapsed = time.monotonic() - start
+        release.set()
+
+        assert elapsed < 1.0
+        assert "AAPL price: $230.00" in answer
+        assert "Partial answer" in answer and "AAPL_10k_filing_tool" in answer
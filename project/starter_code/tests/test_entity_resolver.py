@@ -0,0 +1,118 @@
+"""
+Test Entity Resolver Module - Shared company/ticker resolution
+
+Usage:
+    python -m pytest tests/test_entity_resolver.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.entity_resolver import EntityResolver
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    """Resolver built from a companies table and a filing directory"""
+    db_path = tmp_path / "financial.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE companies (id INTEGER PRIMARY KEY, symbol TEXT, name TEXT, sector TEXT, market_cap REAL);
+        INSERT INTO companies (symbol, name, sector) VALUES
+            ('AAPL', 'Apple Inc.', 'Technology'), ('MSFT', 'Microsoft Corporation', 'Technology');
+    """)
+    conn.commit()
+    conn.close()
+
+    documents_dir = tmp_path / "10k_documents"
+    documents_dir.mkdir()
+    for name in ["TSLA_10K_2023.pdf", "TSLA_10K_2024.pdf", "notes.txt"]:
+        (documents_dir / name).write_bytes(b"")
+
+    return EntityResolver.from_sources(db_path, documents_dir)
+
+
+class TestEntityResolver:
+    """Test name, alias, ticker and fuzzy resolution"""
+
+    def test_sources(self, resolver):
+        """Test 1: Companies table and filing inventory are both loaded"""
+        assert resolver.company_info(["MSFT"]) == {"MSFT": {"name": "Microsoft Corporation", "sector": "Technology"}}
+        assert resolver.filings == {"TSLA": [2023, 2024]}
+        assert resolver.name_for("GOOGL") == "Alphabet Inc."
+
+    def test_names_aliases_and_tickers(self, resolver):
+        """Test 2: All mention kinds resolve in one pass, in text order"""
+        matches = resolver.resolve("Compare microsoft with Google, $AAPL and TSLA")
+        assert [(m.symbol, m.kind) for m in matches] == [
+            ("MSFT", "name"), ("GOOGL", "alias"), ("AAPL", "ticker"), ("TSLA", "ticker")
+        ]
+
+    def test_longest_match_and_word_boundaries(self, resolver):
+        """Test 3: Longest surface form wins and words inside other words are ignored"""
+        assert [m.text for m in resolver.resolve("Apple Inc. revenue")] == ["Apple Inc."]
+        assert resolver.symbols("pineapple juice, snapple") == []
+        assert resolver.symbols("I will apply the aapl filter") == []
+
+    def test_fuzzy_fallback(self, resolver):
+        """Test 4: Misspelled company names fall back to fuzzy matching"""
+        matches = resolver.resolve("What are Telsa's risks vs Microsfot?")
+        assert [(m.symbol, m.kind) for m in matches] == [("TSLA", "fuzzy"), ("MSFT", "fuzzy")]
+        assert resolver.symbols("What are Telsa's risks?", fuzzy=False) == []
+
+    def test_describe(self, resolver):
+        """Test 5: Prompt hint lists each company once"""
+        assert resolver.describe("Tesla stock and TSLA holders") == "Tesla -> TSLA (Tesla Inc.)"
+
+    def test_acronym_tickers(self, tmp_path):
+        """Test 6: Tickers spelling finance acronyms need $ unless the company has filings"""
+        db_path = tmp_path / "acronyms.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE companies (id INTEGER PRIMARY KEY, symbol TEXT, name TEXT, sector TEXT, market_cap REAL);
+            INSERT INTO companies (symbol, name, sector) VALUES
+                ('AAPL', 'Apple Inc.', 'Technology'), ('EPS', 'Eps Holdings Inc.', 'Energy'),
+                ('CEO', 'Ceo Holdings Inc.', 'Energy');
+        """)
+        conn.commit()
+        conn.close()
+        documents_dir = tmp_path / "docs"
+        documents_dir.mkdir()
+        (documents_dir / "CEO_10K_2024.pdf").write_bytes(b"")
+        resolver = EntityResolver.from_sources(db_path, documents_dir)
+
+        assert resolver.symbols("What was Apple EPS in 2024?") == ["AAPL"]
+        assert resolver.symbols("Price of $EPS today") == ["EPS"]
+        assert resolver.symbols("Risks in the CEO filing") == ["CEO"]
+
+
+class TestRoutingWithResolver:
+    """Test coordinator routing that uses the resolver"""
+
+    def make_tool(self, name):
+        tool = Mock()
+        tool.metadata.name = name
+        tool.metadata.description = name
+        tool.fn = Mock(return_value=f"{name} result")
+        return tool
+
+    def test_simple_routing(self):
+        """Test 7: Companies and intent keywords select tools without the LLM"""
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        agent = AgentCoordinator()
+        agent.document_tools = [self.make_tool("AAPL_10k_filing_tool"), self.make_tool("TSLA_10k_filing_tool")]
+        agent.function_tools = [self.make_tool("database_query_tool"), self.make_tool("finance_market_search_tool")]
+
+        routed = agent._simple_routing("Show me customers who own Tesla and the current TSLA price")
+        assert [name for name, _, _ in routed] == ["database_query_tool", "finance_market_search_tool"]
+
+        routed = agent._simple_routing("What are Telsa's main risks?")
+        assert [name for name, _, _ in routed] == ["TSLA_10k_filing_tool"]
@@ -0,0 +1,184 @@
+"""
+Test Filing Partitions Module - Per-fiscal-year 10-K indexes with year-aware routing
+
+Usage:
+    python -m pytest tests/test_filing_partitions.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.deadlines import Deadline, DeadlineExceeded, deadline_scope
+from helper_modules.filing_partitions import PartitionedFilingQueryEngine, requested_years, select_partitions
+from helper_modules.filing_summaries import FilingSection, FilingSummaryStore
+from helper_modules.financial_tables import FinancialTableStore, LineItem
+
+
+def partition_engine(answers):
+    """Engine whose partition builders return Mocks answering with answers[year]"""
+    builders = {}
+    for year, answer in answers.items():
+        partition = Mock()
+        partition.query.side_effect = answer if callable(answer) else (lambda q, a=answer: a)
+        builders[year] = Mock(return_value=partition)
+    engine = PartitionedFilingQueryEngine(symbol="AAPL", company_name="Apple Inc.", partitions=builders)
+    return engine, builders
+
+
+class TestYearSelection:
+    """Test mapping questions to filing partitions"""
+
+    @pytest.mark.parametrize("question, years", [
+        ("What was Apple's revenue in FY2023?", [2023]),
+        ("Apple net income FY22", [2022]),
+        ("Revenue trend from 2021 to 2023", [2021, 2022, 2023]),
+        ("Operating income over the last 3 years", [2022, 2023, 2024]),
+        ("How did iPhone sales change year-over-year?", [2023, 2024]),
+        ("Services revenue in 2023 compared to the prior year", [2022, 2023]),
+        ("What are Apple's main risks?", []),
+    ])
+    def test_requested_years(self, question, years):
+        """Test 1: Explicit years, ranges and comparison wording become fiscal years"""
+        assert requested_years(question, latest=2024) == years
+
+    def test_select_partitions_uses_comparatives(self):
+        """Test 2: Years without their own filing are served by the next filing"""
+        filings = [2021, 2024]
+        assert select_partitions("What are Apple's main risks?", filings) == [2024]
+        assert select_partitions("Revenue in 2023 vs 2022", filings) == [2024]
+        assert select_partitions("Revenue trend from 2020 to 2023", filings) == [2021, 2024]
+        assert select_partitions("Revenue in 2015", filings) == []
+
+    @pytest.mark.parametrize("question, partitions", [
+        ("What are Apple's term debt maturities in 2025?", [2024]),
+        ("What lease payments are due 2025 through 2029?", [2024]),
+        ("What does Apple expect for fiscal 2025?", [2024]),
+        ("How did 2023 revenue compare with the outlook for 2026?", [2023, 2024]),
+    ])
+    def test_forward_looking_years_use_latest_filing(self, question, partitions):
+        """Test 3: Years after the latest filing are answered from the latest filing"""
+        assert select_partitions(question, [2022, 2023, 2024]) == partitions
+
+
+class TestPartitionedEngine:
+    """Test lazy partitions and multi-year fan-out"""
+
+    def test_single_year_touches_one_partition(self):
+        """Test 4: Partitions are built on first use and only the needed one is queried"""
+        engine, builders = partition_engine({2022: "FY2022 answer", 2023: "FY2023 answer", 2024: "FY2024 answer"})
+
+        assert str(engine.query("What did Apple say about competition?")) == "FY2024 answer"
+        assert str(engine.query("Apple's cash position in fiscal 2022")) == "FY2022 answer"
+        assert engine.built_years() == [2022, 2024]
+        builders[2023].assert_not_called()
+
+        engine.query("Apple's cash position in fiscal 2022")
+        assert builders[2022].call_count == 1  # built once, then reused
+
+        response = engine.query("Apple's revenue in 2010")
+        assert "No Apple Inc. 10-K filing" in str(response) and response.metadata["partitions"] == []
+
+    def test_multi_year_question_fans_out_in_parallel(self):
+        """Test 5: Year-over-year questions query their partitions concurrently"""
+        both_running = threading.Barrier(2, timeout=5)
+
+        def answer(text):
+            def query(question):
+                both_running.wait()  # raises BrokenBarrierError if queried one after the other
+                return text
+            return query
+
+        engine, builders = partition_engine({2022: "unused", 2023: answer("Revenue $383.3B"),
+                                             2024: answer("Revenue $391.0B")})
+        response = engine.query("How did Apple's revenue change year-over-year in 2024?")
+
+        assert str(response) == "FY2023 10-K:\nRevenue $383.3B\n\nFY2024 10-K:\nRevenue $391.0B"
+        assert response.metadata["partitions"] == [2023, 2024]
+        builders[2022].assert_not_called()
+
+    def test_fan_out_ends_at_deadline(self):
+        """Test 6: A partition still running at the query deadline does not hold up the answer"""
+        release = threading.Event()
+        engine, _ = partition_engine({2023: lambda question: release.wait(5) and "late",
+                                      2024: "Revenue $391.0B"})
+
+        start = time.monotonic()
+        with deadline_scope(Deadline(0.2)), pytest.raises(DeadlineExceeded):
+            engine.query("How did Apple's revenue change year-over-year in 2024?")
+        assert time.monotonic() - start < 1.0
+        release.set()
+
+
+class TestPartitionedStores:
+    """Test per-filing statement tables and summaries"""
+
+    def test_stores_keep_filings_apart(self, tmp_path):
+        """Test 7: Each filing has its own rows; without a year the latest filing wins"""
+        tables = FinancialTableStore(tmp_path / "financial_tables.db")
+        for filing, values in ((2023, {"2023": 383285.0, "2022": 394328.0}), (2024, {"2024": 391035.0,
+                                                                                    "2023": 383300.0})):
+            items = [LineItem("AAPL", "income_statement", "", "Total net sales", period, value, "USD millions", "28")
+                     for period, value in values.items()]
+            tables.replace("AAPL", items, filing_year=filing)
+
+        assert tables.lookup("AAPL", "Total net sales in 2023", filing_year=2023).value == 383285.0
+        assert tables.lookup("AAPL", "Total net sales in 2023").value == 383300.0  # restated in the FY2024 filing
+        assert tables.lookup("AAPL", "Total net sales in 2024", filing_year=2023) is None
+        tables.replace("AAPL", [], filing_year=2023)
+        assert tables.lookup("AAPL", "Total net sales in 2022") is None
+        tables.close()
+
+        summaries = FilingSummaryStore(tmp_path / "filing_summaries.db")
+        for filing in (2023, 2024):
+            section = FilingSection("1A", "Risk Factors", "", "5", "17")
+            summaries.replace("AAPL", [(section, f"FY{filing} risks")], filing_year=filing)
+        assert summaries.get("AAPL", "1A", 2023)[1] == "FY2023 risks"
+        assert summaries.get("AAPL", "1A")[1] == "FY2024 risks"
+        assert summaries.sections("AAPL") == ["1A"]
+        summaries.close()
+
+    def test_every_filing_precomputed_at_build(self, tmp_path, monkeypatch):
+        """Test 8: Building the tools extracts every filing's tables and summaries; only indexing is lazy"""
+        from llama_index.core import Document
+        from helper_modules import document_tools
+        from helper_modules.document_tools import DocumentToolsManager
+
+        documents_dir = tmp_path / "data" / "10k_documents"
+        documents_dir.mkdir(parents=True)
+        for year in (2023, 2024):
+            (documents_dir / f"AAPL_10K_{year}.pdf").write_bytes(b"%PDF")
+        monkeypatch.chdir(tmp_path)
+
+        loaded = []
+
+        class Reader:
+            def __init__(self, input_files):
+                self.path = input_files[0]
+
+            def load_data(self):
+                loaded.append(Path(self.path).name)
+                return [Document(text="Apple designs smartphones.")]
+
+        monkeypatch.setattr(document_tools, "SimpleDirectoryReader", Reader)
+        monkeypatch.setattr(document_tools, "VectorStoreIndex", Mock())
+        manager = DocumentToolsManager(companies=["AAPL"], rerank=False)
+        manager.company_info = {"AAPL": {"name": "Apple Inc."}}
+        manager._precompute_summaries = Mock()
+
+        assert len(manager.build_document_tools()) == 1
+        assert sorted(loaded) == ["AAPL_10K_2023.pdf", "AAPL_10K_2024.pdf"]  # each PDF read once
+        assert all(manager.financial_tables.is_current("AAPL", documents_dir / f"AAPL_10K_{year}.pdf", year)
+                   for year in (2023, 2024))
+        assert [call.args[3] for call in manager._precompute_summaries.call_args_list] == [2023, 2024]
+        assert document_tools.VectorStoreIndex.call_count == 1  # FY2023 is indexed on first use
+
+        manager.financial_tables.close()
+        manager.filing_summaries.close()
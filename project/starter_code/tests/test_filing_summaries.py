@@ -0,0 +1,103 @@
+"""
+Test Filing Summaries Module - Precomputed section summaries for broad 10-K questions
+
+Usage:
+    python -m pytest tests/test_filing_summaries.py -v
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.filing_summaries import (
+    FILING, FilingSummarizer, FilingSummaryQueryEngine, FilingSummaryStore, broad_question_section, split_sections,
+)
+
+RISK_TEXT = "The Company's operations and performance depend significantly on global economic conditions.\n" * 12
+PAGES = [
+    # Table of contents: headings followed by page numbers are not sections
+    "TABLE OF CONTENTS\nItem 1. Business 1\nItem 1A. Risk Factors 5\nItem 6. [Reserved] 20\n",
+    "PART I\nItem 1.\xa0\xa0\xa0\xa0Business\nCompany Background\n"
+    + "The Company designs, manufactures and markets smartphones, personal computers and tablets.\n" * 8,
+    "Item 1A.\xa0\xa0\xa0\xa0Risk Factors\n" + RISK_TEXT,
+    RISK_TEXT + "Item 6.\xa0\xa0\xa0\xa0[Reserved]\nApple Inc. | 2024 Form 10-K | 20\n",
+]
+
+
+def fake_llm(prompt: str) -> str:
+    if prompt.startswith("Below are summaries"):
+        return "Apple sells devices and services; key risks are macro conditions."
+    section = prompt.split('section "', 1)[1].split('"', 1)[0]
+    return f"Summary of {section}."
+
+
+class TestSections:
+    """Test splitting and summarizing"""
+
+    def test_split_sections_skips_table_of_contents(self):
+        """Test 1: Sections start at body headings and carry their page range"""
+        sections = split_sections(PAGES)
+
+        assert [(s.item, s.title, s.first_page, s.last_page) for s in sections] == [
+            ("1", "Business", "2", "2"), ("1A", "Risk Factors", "3", "4"), ("6", "[Reserved]", "4", "4"),
+        ]
+        assert sections[1].text.count("global economic conditions") == 24
+
+    def test_long_sections_summarized_hierarchically(self):
+        """Test 2: Long sections are summarized in chunks, then the filing from section summaries"""
+        llm = Mock(side_effect=fake_llm)
+        summaries = FilingSummarizer(llm, chunk_tokens=200).summarize("Apple Inc.", split_sections(PAGES))
+
+        assert [(section.item, summary) for section, summary in summaries] == [
+            ("1", "Summary of Item 1. Business."),
+            ("1A", "Summary of Item 1A. Risk Factors."),
+            (FILING, "Apple sells devices and services; key risks are macro conditions."),
+        ]  # [Reserved] is too short to summarize
+        risk_calls = [call for call in llm.call_args_list if "Item 1A." in call.args[0]]
+        assert len(risk_calls) > 2  # chunk summaries plus the reduce step
+        assert "Summary of Item 1A" in risk_calls[-1].args[0]
+
+
+class TestBroadQuestions:
+    """Test routing broad questions to summaries"""
+
+    @pytest.mark.parametrize("question, section", [
+        ("Summarize Apple's risk factors", "1A"),
+        ("What are the main risks for Tesla?", "1A"),
+        ("Give me a summary of Google's market risk disclosures", "7A"),
+        ("What does Apple do?", "1"),
+        ("Overview of Apple's 10-K please", FILING),
+        ("What was Apple's total revenue in 2024?", None),
+        ("Does Apple mention supply chain risk in China?", None),
+    ])
+    def test_broad_question_section(self, question, section):
+        """Test 3: Broad questions map to a 10-K item or the whole filing"""
+        assert broad_question_section(question) == section
+
+    def test_query_engine_answers_from_store_or_falls_back(self, tmp_path):
+        """Test 4: Broad questions are one lookup; specific ones go to retrieval"""
+        store = FilingSummaryStore(tmp_path / "filing_summaries.db")
+        store.replace("AAPL", FilingSummarizer(fake_llm).summarize("Apple Inc.", split_sections(PAGES)))
+        fallback = Mock()
+        fallback.query.return_value = "Apple sources components from Asia."
+        engine = FilingSummaryQueryEngine(symbol="AAPL", company_name="Apple Inc.", summaries=store,
+                                          fallback=fallback)
+
+        response = engine.query("Summarize Apple's risk factors")
+        assert str(response).startswith("Apple Inc. 10-K Item 1A. Risk Factors (summary of pages 3-4)")
+        assert response.metadata["source"] == "filing_summaries"
+
+        assert engine.query("Give me an overview of Apple's 10-K").metadata["section"] == FILING
+        fallback.query.assert_not_called()
+
+        # A topic without its own summary goes to retrieval, not the filing overview
+        engine.query("Summarize Apple's legal proceedings")
+        fallback.query.assert_called_once_with("Summarize Apple's legal proceedings")
+
+        assert str(engine.query("Where does Apple source components?")) == "Apple sources components from Asia."
+        store.close()
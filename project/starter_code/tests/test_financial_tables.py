@@ -0,0 +1,165 @@
+"""
+Test Financial Tables Module - Statement extraction and exact numeric lookups
+
+Usage:
+    python -m pytest tests/test_financial_tables.py -v
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.financial_tables import (
+    FinancialLookupQueryEngine, FinancialTableStore, extract_financial_tables, parse_statement_page,
+)
+
+# Page text as extracted from a 10-K PDF (non-breaking spaces, ligatures, page footer)
+INCOME_STATEMENT = """Apple Inc.
+CONSOLIDATED STATEMENTS OF OPERATIONS
+(In millions, except number of shares, which are reﬂected in thousands, and per-share amounts)
+Years ended
+September 28,
+2024
+September 30,
+2023
+September 24,
+2022
+Net sales:
+\xa0\xa0\xa0Products $ 294,866\xa0 $ 298,085\xa0 $ 316,199\xa0
+\xa0\xa0\xa0Services 96,169\xa0 85,200\xa0 78,129\xa0
+Total net sales 391,035\xa0 383,285\xa0 394,328\xa0
+Cost of sales:
+\xa0\xa0\xa0Products 185,233\xa0 189,282\xa0 201,471\xa0
+\xa0\xa0\xa0Services 25,119\xa0 24,855\xa0 22,075\xa0
+Total cost of sales 210,352\xa0 214,137\xa0 223,546\xa0
+Gross margin 180,683\xa0 169,148\xa0 170,782\xa0
+Operating expenses:
+Research and development 31,370\xa0 29,915\xa0 26,251\xa0
+Total operating expenses 57,467\xa0 54,847\xa0 51,345\xa0
+Operating income 123,216\xa0 114,301\xa0 119,437\xa0
+Other income/(expense), net 269\xa0 (565) (334)
+Net income $ 93,736\xa0 $ 96,995\xa0 $ 99,803\xa0
+Earnings per share:
+Basic $ 6.11\xa0 $ 6.16\xa0 $ 6.15\xa0
+Diluted $ 6.08\xa0 $ 6.13\xa0 $ 6.11\xa0
+Shares used in computing earnings per share:
+Basic 15,343,783\xa0 15,744,231\xa0 16,215,963\xa0
+Diluted 15,408,095\xa0 15,812,547\xa0 16,325,819\xa0
+See accompanying Notes to Consolidated Financial Statements.
+Apple Inc. | 2024 Form 10-K | 28"""
+
+CASH_FLOWS = """Apple Inc.
+CONSOLIDATED STATEMENTS OF CASH FLOWS
+(In millions)
+Years ended
+September 28,
+2024
+September 30,
+2023
+September 24,
+2022
+Operating activities:
+Net income 93,736\xa0 96,995\xa0 99,803\xa0
+Depreciation and amortization 11,445\xa0 11,519\xa0 11,104\xa0
+Cash generated by operating activities 118,254\xa0 110,543\xa0 122,151\xa0
+Investing activities:
+Payments for acquisition of property, plant and equipment (9,447) (10,959) (10,708)
+Proceeds from issuance of term debt, net —\xa0 5,228\xa0 5,465\xa0
+Cash generated by/(used in) investing activities 2,935\xa0 3,705\xa0 (22,354)"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FinancialTableStore(tmp_path / "financial_tables.db")
+    store.replace("AAPL", extract_financial_tables("AAPL", [INCOME_STATEMENT, CASH_FLOWS]))
+    yield store
+    store.close()
+
+
+class TestExtraction:
+    """Test parsing statement pages"""
+
+    def test_parses_sections_periods_signs_and_units(self):
+        """Test 1: Rows carry their section, period, sign and unit"""
+        items = {(i.section, i.line_item, i.period): i for i in parse_statement_page("AAPL", INCOME_STATEMENT, "32")}
+
+        assert items[("Net sales", "Services", "2024")].value == 96169
+        assert items[("Net sales", "Total net sales", "2022")].value == 394328
+        assert items[("", "Other income/(expense), net", "2023")].value == -565
+        assert items[("Earnings per share", "Diluted", "2024")].unit == "USD per share"
+        assert items[("Shares used in computing earnings per share", "Basic", "2024")].unit == "thousand shares"
+        assert items[("", "Net income", "2024")].page == "32"
+        assert not any(item.line_item.startswith(("September", "Apple Inc.")) for item in items.values())
+
+    def test_non_statement_pages_are_ignored(self):
+        """Test 2: Prose pages and statement-free text produce no rows"""
+        prose = "Item 7. Management's Discussion\nTotal net sales increased 2% in 2024 compared to 2023.\n"
+        assert parse_statement_page("AAPL", prose) == []
+        assert extract_financial_tables("AAPL", [prose]) == []
+
+
+class TestLookup:
+    """Test answering questions from the table"""
+
+    @pytest.mark.parametrize("question, line_item, period, value", [
+        ("What was Apple's total revenue in 2024?", "Total net sales", "2024", 391035),
+        ("Apple services revenue 2023", "Services", "2023", 85200),
+        ("What was Apple's diluted EPS?", "Diluted", "2024", 6.08),
+        ("Apple R&D spending in 2022", "Research and development", "2022", 26251),
+        ("Apple capex 2024", "Payments for acquisition of property, plant and equipment", "2024", -9447),
+        ("Apple operating cash flow 2023", "Cash generated by operating activities", "2023", 110543),
+    ])
+    def test_numeric_questions(self, store, question, line_item, period, value):
+        """Test 3: Numeric questions resolve to the exact line item and period"""
+        answer = store.lookup("AAPL", question)
+
+        assert (answer.line_item, answer.period) == (line_item, period)
+        assert answer.value == pytest.approx(value)
+
+    @pytest.mark.parametrize("question", [
+        "How does Apple generate revenue?",
+        "What are the main risks for Apple's services business?",
+        "What products does Apple sell?",
+        "Apple total revenue in 2019",  # period not in the filing
+    ])
+    def test_other_questions_fall_through(self, store, question):
+        """Test 4: Qualitative questions and unknown periods are left to retrieval"""
+        assert store.lookup("AAPL", question) is None
+
+    def test_query_engine_answers_or_falls_back(self, store):
+        """Test 5: The query engine answers from the table or delegates to the RAG engine"""
+        fallback = Mock()
+        fallback.query.return_value = "Apple designs smartphones and services."
+        engine = FinancialLookupQueryEngine(symbol="AAPL", company_name="Apple Inc.", tables=store,
+                                            fallback=fallback)
+
+        response = engine.query("What was Apple's net income in 2023?")
+        assert "$96,995 million" in str(response) and "page" in str(response)
+        assert response.metadata["source"] == "financial_tables"
+        fallback.query.assert_not_called()
+
+        assert str(engine.query("What does Apple do?")) == "Apple designs smartphones and services."
+        fallback.query.assert_called_once_with("What does Apple do?")
+
+
+class TestDocumentToolsStore:
+    """Test when the document tools open their derived stores"""
+
+    def test_store_opened_when_tools_are_built(self, tmp_path, monkeypatch):
+        """Test 6: Creating the manager writes nothing; building the tools opens the stores"""
+        from helper_modules.document_tools import DocumentToolsManager
+
+        (tmp_path / "data").mkdir()
+        monkeypatch.chdir(tmp_path)
+        manager = DocumentToolsManager(companies=[])
+        assert manager.financial_tables is None and manager.filing_summaries is None
+        assert not any((tmp_path / "data").iterdir())
+
+        assert manager.build_document_tools() == []
+        assert (tmp_path / "data" / "financial_tables.db").exists()
+        assert (tmp_path / "data" / "filing_summaries.db").exists()
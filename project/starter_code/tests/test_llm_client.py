@@ -0,0 +1,164 @@
+"""
+Test LLM Client Module - Shared clients, rate limiting, concurrency limit and retries
+
+Usage:
+    python -m pytest tests/test_llm_client.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.llm_client import ResilientTransport, SharedLLMClient, TokenBucket, get_llm_client
+
+CHAT_COMPLETION = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+    "choices": [{"index": 0, "finish_reason": "stop",
+                 "message": {"role": "assistant", "content": "SELECT 1"}}],
+    "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+}
+
+
+def unlimited_bucket():
+    return TokenBucket(rate=1000.0, capacity=1000)
+
+
+class TestTokenBucket:
+    """Test the request rate limiter"""
+
+    def test_burst_then_sustained_rate(self):
+        """Test 1: Requests beyond the burst wait for the refill rate"""
+        now = [0.0]
+        waits = []
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=lambda: now[0], sleep=waits.append)
+
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.acquire() == pytest.approx(0.5)
+        assert bucket.acquire() == pytest.approx(1.0)  # queued behind the previous request
+        now[0] = 10.0
+        assert bucket.acquire() == 0.0  # refilled (capped at capacity)
+        assert waits == [pytest.approx(0.5), pytest.approx(1.0)]
+
+
+class TestResilientTransport:
+    """Test retries and the concurrency limit"""
+
+    def test_retries_429_and_5xx_with_backoff(self):
+        """Test 2: Rate limit and server errors are retried, honoring Retry-After"""
+        responses = [httpx.Response(429, headers={"retry-after": "1.5"}), httpx.Response(503),
+                     httpx.Response(200, json={"ok": True})]
+        sleeps = []
+        transport = ResilientTransport(httpx.MockTransport(lambda request: responses.pop(0)), unlimited_bucket(),
+                                       max_retries=3, backoff=0.5, sleep=sleeps.append)
+
+        response = httpx.Client(transport=transport).post("https://api.test/v1/chat", json={})
+
+        assert response.json() == {"ok": True}
+        assert sleeps[0] == 1.5
+        assert 0 <= sleeps[1] <= 1.0  # full jitter over backoff * 2**1
+        assert transport.stats["requests"] == 3 and transport.stats["retries"] == 2
+
+    def test_client_errors_and_exhausted_retries(self):
+        """Test 3: 4xx responses are not retried; the last 5xx is returned after max_retries"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(400 if request.url.path == "/bad" else 500)
+
+        transport = ResilientTransport(httpx.MockTransport(handler), unlimited_bucket(), max_retries=2,
+                                       sleep=lambda seconds: None)
+        client = httpx.Client(transport=transport)
+
+        assert client.get("https://api.test/bad").status_code == 400
+        assert client.get("https://api.test/down").status_code == 500
+        assert calls == ["/bad", "/down", "/down", "/down"]
+
+    def test_concurrency_limit(self):
+        """Test 4: No more than max_concurrency requests are in flight"""
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def handler(request):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return httpx.Response(200)
+
+        client = httpx.Client(transport=ResilientTransport(httpx.MockTransport(handler), unlimited_bucket(),
+                                                           max_concurrency=2))
+        threads = [threading.Thread(target=client.get, args=("https://api.test/",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak[0] == 2
+
+    def test_slot_held_until_body_read(self):
+        """Test 5: A concurrency slot is released when the response body is closed, not before"""
+        class Body(httpx.SyncByteStream):
+            def __iter__(self):
+                yield b"ok"
+
+        # stream=... responses are not pre-read, like the ones from the network transport
+        responses = [httpx.Response(503, stream=Body()), httpx.Response(200, stream=Body())]
+        transport = ResilientTransport(httpx.MockTransport(lambda request: responses.pop(0)), unlimited_bucket(),
+                                       max_concurrency=1, sleep=lambda seconds: None)
+        client = httpx.Client(transport=transport)
+
+        with client.stream("GET", "https://api.test/") as response:
+            assert response.status_code == 200  # the retried 503 gave its slot back
+            assert not transport.semaphore.acquire(blocking=False)
+            assert response.read() == b"ok"
+        assert transport.semaphore.acquire(blocking=False)
+        transport.semaphore.release()
+
+
+class TestSharedClients:
+    """Test the clients shared by the managers"""
+
+    def test_llm_requests_go_through_shared_transport(self, monkeypatch):
+        """Test 6: The OpenAI LLM uses the shared HTTP client, with one retry layer"""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        paths = []
+        responses = [httpx.Response(429), httpx.Response(200, json=CHAT_COMPLETION)]
+
+        def handler(request):
+            paths.append(request.url.path)
+            return responses.pop(0)
+
+        shared = SharedLLMClient(api_base="https://api.test/v1", transport=httpx.MockTransport(handler))
+        shared.transport.sleep = lambda seconds: None
+
+        assert shared.llm() is shared.llm()
+        assert shared.llm().complete("Write SQL").text == "SELECT 1"
+        assert paths == ["/v1/chat/completions", "/v1/chat/completions"]
+        assert shared.stats()["retries"] == 1
+
+    def test_managers_share_one_client(self, tmp_path, monkeypatch):
+        """Test 7: All three managers use the same LLM and embedding clients"""
+        (tmp_path / "data").mkdir()
+        monkeypatch.chdir(tmp_path)  # managers resolve data/ from the working directory
+        from llama_index.core import Settings
+        from helper_modules.agent_coordinator import AgentCoordinator
+        from helper_modules.document_tools import DocumentToolsManager
+        from helper_modules.function_tools import FunctionToolsManager
+
+        agent = AgentCoordinator()
+        documents = DocumentToolsManager()
+        functions = FunctionToolsManager()
+
+        assert agent.llm is documents.llm is functions.llm is get_llm_client().llm()
+        assert Settings.llm is agent.llm
+        assert Settings.embed_model is get_llm_client().embed_model()
@@ -0,0 +1,133 @@
+"""
+Test LLM Usage Module - Token, latency and cost accounting
+
+Usage:
+    python -m pytest tests/test_llm_usage.py -v
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from llama_index.core.base.llms.types import CompletionResponse
+from llama_index.core.llms import ChatMessage, MockLLM
+from llama_index.core.llms.callbacks import llm_completion_callback
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.llm_usage import LLMUsageTracker, get_usage_tracker
+from helper_modules.sql_candidates import SQLVariant, race_sql_candidates
+
+
+@pytest.fixture
+def tracker():
+    tracker = get_usage_tracker()
+    tracker.reset()
+    yield tracker
+    tracker.reset()
+
+
+class TestCallWrapper:
+    """Test recording of direct LLM calls"""
+
+    def test_reported_usage_and_cost(self):
+        """Test 1: Token counts reported by the API are recorded and priced"""
+        tracker = LLMUsageTracker()
+        llm = Mock(model="gpt-3.5-turbo")
+        llm.complete.return_value = CompletionResponse(
+            text="SELECT 1", additional_kwargs={"prompt_tokens": 1200, "completion_tokens": 40})
+
+        response = tracker.complete(llm, "prompt", "sql_generation", temperature=0.4)
+
+        assert response.text == "SELECT 1"
+        llm.complete.assert_called_once_with("prompt", temperature=0.4)
+        site = tracker.summary()["by_call_site"]["sql_generation"]
+        assert site["calls"] == 1
+        assert (site["prompt_tokens"], site["completion_tokens"]) == (1200, 40)
+        assert site["models"] == {"gpt-3.5-turbo": 1}
+        assert site["cost_usd"] == pytest.approx((1200 * 0.50 + 40 * 1.50) / 1_000_000)
+        assert not tracker.recent_calls()[0].estimated
+
+    def test_missing_usage_is_estimated(self):
+        """Test 2: Responses without usage get estimated token counts"""
+        tracker = LLMUsageTracker()
+        llm = Mock()
+        llm.complete.return_value = "1, 4"
+
+        tracker.complete(llm, "Which tools answer this question? " * 20, "routing")
+
+        call = tracker.recent_calls()[0]
+        assert call.estimated and call.call_site == "routing"
+        assert call.prompt_tokens > call.completion_tokens > 0
+
+
+class TestInstrumentation:
+    """Test LLM calls recorded from LlamaIndex events"""
+
+    def test_llamaindex_calls_recorded_once(self, tracker):
+        """Test 3: Instrumented calls are attributed to the open call site, without double counting"""
+        llm = MockLLM(max_tokens=8)
+        tracker.complete(llm, "Summarize the risks", "synthesis")
+        with tracker.call_site("AAPL_10k_filing_tool"):
+            llm.chat([ChatMessage(role="user", content="What are Apple's main risks?")])  # chat wraps complete
+
+        by_call_site = tracker.summary()["by_call_site"]
+        assert by_call_site["synthesis"]["calls"] == 1
+        assert by_call_site["AAPL_10k_filing_tool"]["calls"] == 1
+        assert by_call_site["AAPL_10k_filing_tool"]["models"] == {"MockLLM": 1}
+        assert tracker.summary()["process"]["calls"] == 2
+
+    def test_failed_call_does_not_hide_later_calls(self, tracker):
+        """Test 4: A call that raised (no end event) does not affect later recording"""
+        class FailingLLM(MockLLM):
+            @llm_completion_callback()
+            def complete(self, prompt, formatted=False, **kwargs):
+                raise ConnectionError("API unreachable")
+
+        with pytest.raises(ConnectionError):
+            tracker.complete(FailingLLM(), "Which tools?", "routing")
+        MockLLM(max_tokens=8).complete("Summarize the risks")
+
+        assert tracker.summary()["by_call_site"]["other"]["calls"] == 1
+        assert "routing" not in tracker.summary()["by_call_site"]
+
+
+class TestQueryTotals:
+    """Test per-query aggregation and the coordinator status API"""
+
+    def test_query_totals_include_worker_threads(self, tracker):
+        """Test 5: Calls made on candidate threads count toward the query"""
+        llm = Mock()
+        llm.complete.side_effect = lambda prompt, temperature: time.sleep(0.01) or "SELECT 1"
+        variants = [SQLVariant(0.0), SQLVariant(0.4), SQLVariant(0.8)]
+
+        with tracker.query() as usage:
+            tracker.complete(llm, "route", "routing", temperature=0.0)
+            race_sql_candidates(
+                lambda variant: tracker.complete(llm, "sql", "sql_generation", temperature=variant.temperature),
+                lambda sql: (1, None), variants, grace=1.0)
+        tracker.complete(llm, "outside", "routing", temperature=0.0)
+
+        assert usage.calls == 4
+        assert tracker.summary()["last_query"]["calls"] == 4
+        assert tracker.summary()["process"]["calls"] == 5
+
+    def test_status_reports_usage(self, tracker):
+        """Test 6: The coordinator exposes usage per call site in get_status()"""
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        agent = AgentCoordinator()
+        agent.llm = Mock()
+        agent.llm.complete.return_value = "Apple revenue was $391B and AAPL trades at $150."
+        results = [{"tool": "AAPL_10k_filing_tool", "result": "Apple revenue: $391B"},
+                   {"tool": "finance_market_search_tool", "result": "AAPL price: $150.00"}]
+        with tracker.query():
+            agent._synthesize_results("What is Apple's revenue and stock price?", results)
+
+        usage = agent.get_status()["llm_usage"]
+        assert usage["by_call_site"]["synthesis"]["calls"] == 1
+        assert usage["last_query"]["calls"] == 1
+        assert usage["process"]["total_tokens"] > 0
@@ -0,0 +1,136 @@
+"""
+Test Market Data Module - Batched quote fetching against a local fake endpoint
+
+Usage:
+    python -m pytest tests/test_market_data.py -v
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.market_data import MARKET_TZ, MarketDataClient, MarketHoursTTL, QuoteCache
+
+PRICES = {"AAPL": (190.0, 185.0), "GOOGL": (170.0, 172.0), "TSLA": (250.0, 240.0)}
+
+
+class FakeChartServer:
+    """Local stand-in for the Yahoo chart endpoint with a configurable delay"""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.hits = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                symbol = self.path.split("?")[0].rsplit("/", 1)[-1]
+                with server.lock:
+                    server.hits[symbol] = server.hits.get(symbol, 0) + 1
+                time.sleep(server.delay)
+                if symbol not in PRICES:
+                    body = {"chart": {"result": None, "error": {"description": "No data found"}}}
+                else:
+                    price, previous = PRICES[symbol]
+                    body = {"chart": {"result": [{"meta": {
+                        "regularMarketPrice": price, "chartPreviousClose": previous,
+                        "regularMarketVolume": 1000, "currency": "USD"}}], "error": None}}
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v8/finance/chart"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    fake = FakeChartServer()
+    yield fake
+    fake.close()
+
+
+class TestMarketDataClient:
+    """Test batched fetching, caching and coalescing"""
+
+    def test_symbols_fetched_concurrently(self, server):
+        """Test 1: Three symbols take about one round-trip, not three"""
+        client = MarketDataClient(base_url=server.url, cache=QuoteCache(ttl=lambda: 60))
+        start = time.perf_counter()
+        quotes = client.get_quotes(["AAPL", "GOOGL", "TSLA"])
+        elapsed = time.perf_counter() - start
+
+        assert list(quotes) == ["AAPL", "GOOGL", "TSLA"]
+        assert quotes["AAPL"]["price"] == 190.0
+        assert quotes["AAPL"]["change"] == pytest.approx(5.0)
+        assert quotes["GOOGL"]["change_percent"] == pytest.approx(-2 / 172 * 100)
+        assert elapsed < 2 * server.delay
+        client.close()
+
+    def test_cache_hits_skip_upstream(self, server):
+        """Test 2: Cached quotes are served until they expire"""
+        now = [0.0]
+        client = MarketDataClient(base_url=server.url, cache=QuoteCache(ttl=lambda: 15, clock=lambda: now[0]))
+        client.get_quotes(["AAPL"])
+        client.get_quotes(["AAPL"])
+        assert server.hits == {"AAPL": 1}
+
+        now[0] = 16.0
+        client.get_quotes(["AAPL"])
+        assert server.hits == {"AAPL": 2}
+        client.close()
+
+    def test_concurrent_requests_coalesced(self, server):
+        """Test 3: Concurrent requests for one symbol share one upstream call"""
+        client = MarketDataClient(base_url=server.url, cache=QuoteCache(ttl=lambda: 0))
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: client.get_quote("TSLA"), range(10)))
+
+        assert all(quote["price"] == 250.0 for quote in results)
+        assert server.hits == {"TSLA": 1}
+        client.close()
+
+    def test_failed_symbol_reported(self, server):
+        """Test 4: Upstream errors are reported per symbol and not cached"""
+        client = MarketDataClient(base_url=server.url, cache=QuoteCache(ttl=lambda: 60))
+        quotes = client.get_quotes(["AAPL", "NOPE"])
+        assert quotes["AAPL"]["success"]
+        assert not quotes["NOPE"]["success"]
+        assert "No data found" in quotes["NOPE"]["error"]
+        assert client.cache.get("NOPE") is None
+        client.close()
+
+
+class TestMarketHoursTTL:
+    """Test the market-hours TTL policy"""
+
+    def test_ttl_during_and_after_hours(self):
+        """Test 5: Short TTL while open, until next open after close"""
+        ttl = MarketHoursTTL(open_ttl=15)
+        assert ttl(datetime(2025, 3, 5, 11, 0, tzinfo=MARKET_TZ)) == 15
+        # Wednesday 17:00 -> Thursday 09:30
+        assert ttl(datetime(2025, 3, 5, 17, 0, tzinfo=MARKET_TZ)) == 16.5 * 3600
+        # Friday 16:00 -> Monday 09:30
+        assert ttl(datetime(2025, 3, 7, 16, 0, tzinfo=MARKET_TZ)) == (2 * 24 + 17.5) * 3600
@@ -0,0 +1,116 @@
+"""
+Test Market Store Module - Local market_data fast path and offline fallback
+
+Usage:
+    python -m pytest tests/test_market_store.py -v
+"""
+
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.market_data import MARKET_TZ
+from helper_modules.market_store import LocalQuoteStore, MarketDataService
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """market_data with closes for 2025-03-04 and 2025-03-05 (a Wednesday)"""
+    path = tmp_path / "financial.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE market_data (id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL,
+            close_price REAL NOT NULL, volume INTEGER NOT NULL, market_cap REAL, date TEXT NOT NULL);
+        INSERT INTO market_data (symbol, close_price, volume, market_cap, date) VALUES
+            ('AAPL', 170.0, 100, 3e12, '2025-03-04'), ('AAPL', 175.0, 200, 3e12, '2025-03-05'),
+            ('TSLA', 200.0, 300, 8e11, '2025-03-04'), ('TSLA', 210.0, 400, 8e11, '2025-03-05');
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_store(db_path, now):
+    return LocalQuoteStore(db_path, clock=lambda: now)
+
+
+def upstream(symbol, price):
+    return {"symbol": symbol, "price": price, "previous_close": 175.0, "change": price - 175.0,
+            "change_percent": 0.0, "volume": 999, "market_cap": None, "source": "yahoo", "success": True}
+
+
+class TestLocalQuoteStore:
+    """Test the local quote snapshot"""
+
+    def test_latest_close_and_change(self, db_path):
+        """Test 1: Latest close, change and volume come from the table"""
+        store = make_store(db_path, datetime(2025, 3, 5, 18, 0, tzinfo=MARKET_TZ))
+        quote = store.get("AAPL")
+        assert quote["price"] == 175.0
+        assert quote["change"] == pytest.approx(5.0)
+        assert quote["volume"] == 200
+        assert store.is_fresh(quote)
+
+    def test_close_goes_stale_at_next_open(self, db_path):
+        """Test 2: A daily close is stale once the next session is trading"""
+        store = make_store(db_path, datetime(2025, 3, 6, 10, 0, tzinfo=MARKET_TZ))
+        assert not store.is_fresh(store.get("AAPL"))
+
+
+class TestMarketDataService:
+    """Test local-first quote serving"""
+
+    def test_fresh_quotes_served_locally_fast(self, db_path):
+        """Test 3: Fresh quotes never touch upstream and return in sub-millisecond time"""
+        client = Mock()
+        service = MarketDataService(make_store(db_path, datetime(2025, 3, 5, 18, 0, tzinfo=MARKET_TZ)), client)
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            quotes = service.get_quotes(["AAPL", "TSLA"])
+        per_call = (time.perf_counter() - start) / 1000
+
+        assert quotes["TSLA"]["price"] == 210.0 and quotes["TSLA"]["source"] == "local"
+        assert per_call < 0.001
+        client.get_quotes.assert_not_called()
+
+    def test_only_stale_symbols_refreshed_and_written_back(self, db_path):
+        """Test 4: Stale symbols are refreshed upstream and written back"""
+        now = datetime(2025, 3, 6, 10, 0, tzinfo=MARKET_TZ)
+        store = make_store(db_path, now)
+        client = Mock()
+        client.get_quotes.return_value = {"AAPL": upstream("AAPL", 180.0)}
+        service = MarketDataService(store, client)
+
+        quotes = service.get_quotes(["AAPL"])
+        assert quotes["AAPL"]["price"] == 180.0
+        client.get_quotes.assert_called_once_with(["AAPL"], timeout=service.upstream_timeout)
+
+        conn = sqlite3.connect(db_path)
+        row = conn.execute("SELECT close_price, volume FROM market_data "
+                           "WHERE symbol = 'AAPL' AND date = '2025-03-06'").fetchone()
+        conn.close()
+        assert row == (180.0, 999)
+
+        # Written-back quote is fresh, so the next request stays local
+        client.get_quotes.reset_mock()
+        assert service.get_quotes(["AAPL"])["AAPL"]["source"] == "local"
+        client.get_quotes.assert_not_called()
+
+    def test_upstream_down_serves_stale_local(self, db_path):
+        """Test 5: Upstream failures fall back to the last local quote"""
+        client = Mock()
+        client.get_quotes.return_value = {"TSLA": {"symbol": "TSLA", "success": False, "error": "timeout"}}
+        service = MarketDataService(make_store(db_path, datetime(2025, 3, 6, 10, 0, tzinfo=MARKET_TZ)), client)
+
+        quote = service.get_quotes(["TSLA"])["TSLA"]
+        assert quote["price"] == 210.0
+        assert quote["stale"] and quote["source"] == "local (stale)"
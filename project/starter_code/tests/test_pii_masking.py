@@ -0,0 +1,100 @@
+"""
+Test PII Masking Module - Columnar masking engine
+
+Usage:
+    python -m pytest tests/test_pii_masking.py -v
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.pii_masking import PIIMaskingEngine, extract_columns, parse_column_names
+
+
+class TestFieldDetection:
+    """Test PII column classification"""
+
+    def test_detect_pii_fields(self):
+        """Test 1: PII columns are detected by name, business columns are not"""
+        engine = PIIMaskingEngine()
+        fields = ['customer_name', 'email_address', 'phone_number', 'revenue', 'stock_price',
+                  'first_name', 'last_name', 'ssn', 'symbol', 'name']
+        assert engine.detect_pii_fields(fields) == {
+            'customer_name', 'email_address', 'phone_number', 'first_name', 'last_name', 'ssn'
+        }
+
+    def test_parse_column_names(self):
+        """Test 2: Column lists given as strings are parsed"""
+        assert parse_column_names("['id', 'email']") == ['id', 'email']
+        assert parse_column_names("id, email") == ['id', 'email']
+        assert extract_columns("rows...\nCOLUMNS: ['id', 'first_name']") == ['id', 'first_name']
+
+
+class TestColumnarMasking:
+    """Test masking of structured rows"""
+
+    def test_mask_rows(self):
+        """Test 3: Each PII column gets its own mask"""
+        engine = PIIMaskingEngine()
+        columns = ['id', 'first_name', 'email', 'phone', 'symbol']
+        rows = [
+            (1, 'John', 'john.smith@email.com', '123-456-7890', 'AAPL'),
+            (2, 'Sarah', 'sarah@gmail.com', '555-0102', 'TSLA'),
+            (3, None, None, None, 'GOOGL'),
+        ]
+        masked, fields = engine.mask_rows(columns, rows)
+
+        assert fields == {'first_name', 'email', 'phone'}
+        assert masked[0] == (1, '****', '***@email.com', '***-***-7890', 'AAPL')
+        assert masked[1] == (2, '*****', '***@gmail.com', '***-0102', 'TSLA')
+        assert masked[2] == (3, None, None, None, 'GOOGL')
+
+    def test_no_pii_columns_untouched(self):
+        """Test 4: Results without PII columns are returned unchanged"""
+        engine = PIIMaskingEngine()
+        rows = [('AAPL', 175.0), ('TSLA', 210.0)]
+        masked, fields = engine.mask_rows(['symbol', 'close_price'], rows)
+        assert masked == rows
+        assert fields == set()
+
+    def test_scrub_unclassified(self):
+        """Test 5: Computed columns can be scrubbed by content"""
+        engine = PIIMaskingEngine(scrub_unclassified=True)
+        masked, _ = engine.mask_rows(['contact'], [('reach me at jo@x.com or 555-123-4567',)])
+        assert masked[0][0] == 'reach me at ***@x.com or ***-***-4567'
+
+
+class TestTextMasking:
+    """Test the string compatibility path used by pii_protection_tool"""
+
+    def test_mask_dict_lines(self):
+        """Test 6: Dict literal lines are masked column-wise"""
+        engine = PIIMaskingEngine()
+        text = ("SQL Query: SELECT * FROM customers\n\n"
+                "Database Results:\n"
+                "{'id': 1, 'first_name': 'John', 'email': 'john@email.com'}\n"
+                "COLUMNS: ['id', 'first_name', 'email']")
+        masked, fields = engine.mask_text(text, extract_columns(text))
+
+        assert "{'id': 1, 'first_name': '****', 'email': '***@email.com'}" in masked
+        assert "COLUMNS: ['id', 'first_name', 'email']" in masked
+        assert fields == {'first_name', 'email'}
+
+    def test_mask_labelled_text(self):
+        """Test 7: Free text is scrubbed for labelled values and patterns"""
+        engine = PIIMaskingEngine()
+        text = "Customer: John Doe, Email: john@example.com"
+        masked, fields = engine.mask_text(text, ['name', 'email'])
+        assert masked == "Customer: John Doe, Email: ***@example.com"
+        assert 'email' in fields
+
+    def test_financial_figures_untouched(self):
+        """Test 8: Decimals and plain numbers are not mistaken for phone numbers"""
+        engine = PIIMaskingEngine()
+        text = "Total portfolio value: 1234.5678 USD; AAPL close 189.2500; shares 100 2500"
+        assert engine.mask_text(text, [])[0] == text
+        masked, _ = engine.mask_text("Call 555.123.4567 or (555) 123-4567", [])
+        assert masked == "Call ***.***.4567 or (***) ***-4567"
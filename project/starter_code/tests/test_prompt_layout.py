@@ -0,0 +1,103 @@
+"""
+Test Prompt Layout Module - Stable-prefix prompt assembly for provider-side prompt caching
+
+Usage:
+    python -m pytest tests/test_prompt_layout.py -v
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from llama_index.core.base.llms.types import CompletionResponse
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.llm_usage import LLMUsageTracker
+from helper_modules.prompt_layout import PromptLayout
+from helper_modules.sql_examples import SQLExample
+
+SCHEMA = "TABLE: customers (Customer Information)\n- id (PRIMARY KEY, INTEGER)\n- first_name (TEXT)"
+
+
+class TestPromptLayout:
+    """Test section ordering and the cacheable prefix"""
+
+    def test_stable_sections_render_first(self):
+        """Test 1: Stable sections lead in insertion order; authoring order is kept on request"""
+        layout = (PromptLayout().stable("Schema").variable("Examples for this question")
+                  .stable("Instructions").variable("Question: q1").variable("  "))
+
+        assert layout.render() == "Schema\n\nInstructions\n\nExamples for this question\n\nQuestion: q1"
+        assert layout.render(stable_first=False) == (
+            "Schema\n\nExamples for this question\n\nInstructions\n\nQuestion: q1")
+        assert str(layout).startswith(layout.prefix) and layout.prefix == "Schema\n\nInstructions\n\n"
+
+        other = PromptLayout().stable("Schema").variable("Other examples").stable("Instructions").variable("q2")
+        assert other.prefix_hash == layout.prefix_hash
+        assert PromptLayout().stable("Schema v2").prefix_hash != layout.prefix_hash
+
+
+class TestCallSites:
+    """Test that routing, SQL and synthesis prompts share one prefix per call site"""
+
+    def test_sql_prompt_prefix_independent_of_question(self):
+        """Test 2: Schema and instructions precede examples, question, hints and errors"""
+        from helper_modules.function_tools import SQL_INSTRUCTIONS, sql_prompt
+
+        first = sql_prompt(SCHEMA, "Who are the high-risk customers?",
+                           examples=[SQLExample("List customers", "SELECT * FROM customers")],
+                           resolved="", hint="Prefer joins", error_context="no such column: risk")
+        second = sql_prompt(SCHEMA, "How many customers are there?", resolved="Apple -> AAPL (Apple Inc.)")
+
+        assert first.prefix == second.prefix == f"{SCHEMA}\n\n{SQL_INSTRUCTIONS}\n\n"
+        text = first.render()
+        assert first.render(stable_first=False) == text  # authored in cache order
+        assert (text.index(SQL_INSTRUCTIONS) < text.index("Similar examples") < text.index("Question:")
+                < text.index("Hint: Prefer joins") < text.index("no such column"))
+        assert text.endswith("SQL:")
+
+    def test_routing_and_synthesis_prefixes_stable(self):
+        """Test 3: Different questions produce byte-identical prefixes"""
+        from llama_index.core.tools import ToolMetadata
+        from helper_modules.agent_coordinator import synthesis_prompt
+        from helper_modules.routing_prompt import RoutingPromptBuilder
+
+        tools = [SimpleNamespace(metadata=ToolMetadata(name=name, description=f"{name} description."))
+                 for name in ("AAPL_10k_filing_tool", "TSLA_10k_filing_tool", "finance_market_search_tool")]
+        builder = RoutingPromptBuilder({"AAPL": "Apple Inc.", "TSLA": "Tesla Inc."})
+        apple = builder.layout("What are Apple's risks?", tools, symbols=["AAPL"])
+        tesla = builder.layout("What is Tesla's stock price?", tools, symbols=["TSLA"])
+        assert apple.prefix == tesla.prefix and "AAPL_10k_filing_tool" not in apple.prefix
+
+        answers = [synthesis_prompt(q, "=== tool ===\nresult", unavailable)
+                   for q, unavailable in (("Apple revenue?", None), ("Tesla price?", ["finance_market_search_tool"]))]
+        assert answers[0].prefix_hash == answers[1].prefix_hash
+        assert answers[1].render().endswith("incomplete: finance_market_search_tool\n\nAnswer:")
+
+
+class TestCacheAccounting:
+    """Test recording the cached prompt tokens the API reports"""
+
+    @pytest.mark.parametrize("raw", [
+        {"usage": {"prompt_tokens": 2000, "completion_tokens": 10, "prompt_tokens_details": {"cached_tokens": 1536}}},
+        SimpleNamespace(usage=SimpleNamespace(prompt_tokens=2000, completion_tokens=10,
+                                              prompt_tokens_details=SimpleNamespace(cached_tokens=1536))),
+    ])
+    def test_cached_tokens_recorded_and_discounted(self, raw):
+        """Test 4: Cached tokens are counted per call site and priced at the cached-input rate"""
+        tracker = LLMUsageTracker(prices={"gpt-4o-mini": (0.15, 0.60)})
+        llm = Mock(model="gpt-4o-mini")
+        llm.complete.return_value = CompletionResponse(
+            text="SELECT 1", raw=raw, additional_kwargs={"prompt_tokens": 2000, "completion_tokens": 10})
+
+        tracker.complete(llm, "prompt", "sql_generation")
+        llm.complete.return_value = CompletionResponse(text="SELECT 1", additional_kwargs={"prompt_tokens": 2000})
+        tracker.complete(llm, "prompt", "sql_generation")
+
+        site = tracker.summary()["by_call_site"]["sql_generation"]
+        assert site["cached_prompt_tokens"] == 1536 and site["cache_hit_rate"] == 0.384
+        assert tracker.recent_calls()[0].cost == pytest.approx((464 * 0.15 + 1536 * 0.075 + 10 * 0.60) / 1_000_000)
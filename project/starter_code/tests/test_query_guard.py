@@ -0,0 +1,109 @@
+"""
+Test Query Guard Module - Plan checks, wall-clock limit and row budget
+
+Usage:
+    python -m pytest tests/test_query_guard.py -v
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.query_guard import QueryGuard, QueryRejected, QueryTimeout
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """customers and holdings with planner statistics of a million-customer build"""
+    path = tmp_path / "financial.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, first_name TEXT);
+        CREATE TABLE portfolio_holdings (id INTEGER PRIMARY KEY, customer_id INTEGER, symbol TEXT, shares REAL);
+        CREATE INDEX idx_holdings_customer ON portfolio_holdings(customer_id, symbol, shares);
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 2000)
+        INSERT INTO customers SELECT i, 'Customer ' || i FROM n;
+        INSERT INTO portfolio_holdings (customer_id, symbol, shares)
+        SELECT id, 'AAPL', id % 50 FROM customers;
+        ANALYZE;
+        DELETE FROM sqlite_stat1;
+        INSERT INTO sqlite_stat1 VALUES ('customers', NULL, '1000000'),
+            ('portfolio_holdings', 'idx_holdings_customer', '4500000 5 1 1');
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    yield conn
+    conn.close()
+
+
+class TestPlanCheck:
+    """Test EXPLAIN QUERY PLAN inspection"""
+
+    def test_cartesian_product_rejected(self, conn):
+        """Test 1: Nested full scans of large tables are rejected with a reason"""
+        with pytest.raises(QueryRejected, match="missing join condition"):
+            QueryGuard().check(conn, "SELECT c.first_name, ph.symbol FROM customers c, portfolio_holdings ph")
+
+    def test_indexed_join_allowed(self, conn):
+        """Test 2: Index-driven joins and single scans pass the check"""
+        guard = QueryGuard()
+        assessment = guard.check(conn, "SELECT c.first_name, ph.symbol FROM customers c "
+                                       "JOIN portfolio_holdings ph ON c.id = ph.customer_id")
+        assert not assessment.cartesian
+        assert assessment.scans == [("customers", 1000000)]
+
+    def test_unbounded_full_scan_rejected(self, conn):
+        """Test 3: A full scan over the budget needs a LIMIT or an aggregate"""
+        guard = QueryGuard(max_cost=500_000)
+        with pytest.raises(QueryRejected, match="reads all of customers"):
+            guard.check(conn, "SELECT first_name FROM customers ORDER BY first_name")
+        guard.check(conn, "SELECT first_name FROM customers ORDER BY first_name LIMIT 10")
+        guard.check(conn, "SELECT COUNT(*) FROM customers")
+        guard.check(conn, "SELECT first_name FROM customers WHERE id = 5")
+
+
+class TestBoundedExecution:
+    """Test the wall-clock limit and row budget"""
+
+    def test_runaway_query_cancelled(self, conn):
+        """Test 4: The progress handler cancels queries past the deadline"""
+        guard = QueryGuard(timeout=0.2, max_cost=10 ** 15)
+        sql = ("SELECT COUNT(*) FROM portfolio_holdings a JOIN portfolio_holdings b "
+               "JOIN portfolio_holdings c ON a.shares + b.shares = c.shares")
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeout):
+            guard.execute(conn, sql)
+        assert time.perf_counter() - start < 1.0
+        # The connection is usable afterwards
+        assert conn.execute("SELECT COUNT(*) FROM customers").fetchone() == (2000,)
+
+    def test_row_budget(self, conn):
+        """Test 5: Only max_rows rows are read"""
+        rows, columns, truncated = QueryGuard(max_rows=100).execute(conn, "SELECT id FROM customers")
+        assert len(rows) == 100 and truncated
+        assert columns == ["id"]
+
+    def test_database_tool_rewrites_rejected_query(self, db_path, make_function_tools):
+        """Test 6: A rejected plan is sent back to the LLM and the rewrite is executed"""
+        manager, tools = make_function_tools(db_path)
+        manager.llm.complete.side_effect = [
+            "SELECT c.first_name, ph.symbol FROM customers c, portfolio_holdings ph",
+            "SELECT c.first_name, ph.symbol FROM customers c JOIN portfolio_holdings ph "
+            "ON c.id = ph.customer_id WHERE c.id = 1",
+        ]
+
+        result = tools["database_query_tool"].fn("Customer names and their holdings")
+        assert result.rows == [("Customer 1", "AAPL")]
+        assert "Query rejected" in manager.llm.complete.call_args[0][0]
@@ -0,0 +1,106 @@
+"""
+Test Query Plans - Index usage of the common query patterns at scale
+
+The database is created empty with the production schema and indexes, and the
+planner statistics (sqlite_stat1) are replaced with those of a 1M-customer
+build, so SQLite plans the queries as it would on the full data set.
+
+Usage:
+    python -m pytest tests/test_query_plans.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the data directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+
+from build_database import create_indexes, create_schema
+
+# sqlite_stat1 of: build_database.py --customers 1000000 --symbols 500 --days 250
+MILLION_ROW_STATS = [
+    ("customers", "sqlite_autoindex_customers_1", "1000000 1"),
+    ("companies", "sqlite_autoindex_companies_1", "500 1"),
+    ("portfolio_holdings", "idx_holdings_customer", "4500000 5 1 1 1"),
+    ("portfolio_holdings", "idx_holdings_symbol", "4500000 9000 1 1 1"),
+    ("market_data", "idx_market_data_symbol_date", "125000 250 1 1 1"),
+    ("customers", "idx_customers_name", "1000000 300 1"),
+]
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "financial.db"
+    conn = sqlite3.connect(path)
+    create_schema(conn.cursor())
+    create_indexes(conn.cursor())
+    conn.execute("DELETE FROM sqlite_stat1")
+    conn.executemany("INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)", MILLION_ROW_STATS)
+    conn.commit()
+    # Reload the statistics into the planner
+    conn.execute("ANALYZE sqlite_schema")
+    yield conn
+    conn.close()
+
+
+def plan(conn, sql):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+class TestCommonPatterns:
+    """The canonical join patterns (seed examples of the SQL generator)"""
+
+    @pytest.mark.parametrize("sql", [
+        # 1. Customer holdings with names
+        "SELECT c.first_name, c.last_name, ph.symbol, ph.shares, ph.current_value "
+        "FROM customers c JOIN portfolio_holdings ph ON c.id = ph.customer_id",
+        # 2. Holdings with company information
+        "SELECT ph.symbol, co.name, ph.shares, ph.current_value, co.sector "
+        "FROM portfolio_holdings ph JOIN companies co ON ph.symbol = co.symbol",
+    ])
+    def test_unfiltered_joins_scan_only_the_driving_table(self, conn, sql):
+        """Test 1: Full joins scan one table and look up the other through an index"""
+        steps = plan(conn, sql)
+        assert sum(step.startswith("SCAN") for step in steps) == 1, steps
+        # The 4.5M-row holdings table is never the one scanned
+        assert not any(step.startswith("SCAN ph") for step in steps), steps
+        assert all("USING" in step for step in steps[1:])
+
+    @pytest.mark.parametrize("sql", [
+        # Holdings of one stock
+        "SELECT c.first_name, c.last_name, ph.shares, ph.current_value "
+        "FROM customers c JOIN portfolio_holdings ph ON c.id = ph.customer_id WHERE ph.symbol = 'TSLA'",
+        # 3. Holdings with current market prices, for one customer
+        "SELECT ph.symbol, ph.shares, ph.current_value, md.close_price "
+        "FROM portfolio_holdings ph JOIN market_data md ON ph.symbol = md.symbol WHERE ph.customer_id = 42",
+        # 4. Complete customer portfolio view, for one customer
+        "SELECT c.first_name, c.last_name, co.name, ph.shares, ph.current_value, md.close_price, co.sector "
+        "FROM customers c JOIN portfolio_holdings ph ON c.id = ph.customer_id "
+        "JOIN companies co ON ph.symbol = co.symbol JOIN market_data md ON ph.symbol = md.symbol "
+        "WHERE c.id = 42",
+        # Latest close for a symbol
+        "SELECT close_price FROM market_data WHERE symbol = 'AAPL' ORDER BY date DESC LIMIT 1",
+        # Holdings of a customer by name (SQL template)
+        "SELECT ph.symbol, ph.shares FROM customers c JOIN portfolio_holdings ph ON ph.customer_id = c.id "
+        "WHERE c.first_name = 'John' AND c.last_name = 'Smith'",
+        # Largest holders of a stock (SQL template)
+        "SELECT c.first_name, ph.shares FROM portfolio_holdings ph JOIN customers c ON c.id = ph.customer_id "
+        "WHERE ph.symbol = 'TSLA' ORDER BY ph.shares DESC LIMIT 101",
+        # Aggregate over one stock
+        "SELECT COUNT(*), SUM(current_value) FROM portfolio_holdings WHERE symbol = 'TSLA'",
+    ])
+    def test_filtered_patterns_never_scan(self, conn, sql):
+        """Test 2: Filtered patterns use index lookups for every table"""
+        steps = plan(conn, sql)
+        assert steps and all(step.startswith("SEARCH") for step in steps), steps
+        assert not any("TEMP B-TREE" in step for step in steps), steps
+
+    def test_holdings_lookups_are_covering(self, conn):
+        """Test 3: Holdings are read from the covering indexes without touching the table"""
+        by_customer = plan(conn, "SELECT symbol, shares, current_value FROM portfolio_holdings WHERE customer_id = 7")
+        by_symbol = plan(conn, "SELECT customer_id, shares FROM portfolio_holdings WHERE symbol = 'AAPL'")
+        assert "COVERING INDEX idx_holdings_customer" in by_customer[0]
+        assert "COVERING INDEX idx_holdings_symbol" in by_symbol[0]
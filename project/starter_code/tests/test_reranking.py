@@ -0,0 +1,81 @@
+"""
+Test Reranking Module - Local over-retrieve and rerank stage for 10-K retrieval
+
+Usage:
+    python -m pytest tests/test_reranking.py -v
+"""
+
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llama_index.core import MockEmbedding, VectorStoreIndex
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from helper_modules import reranking
+from helper_modules.reranking import (
+    LexicalEmbeddingScorer, LocalReranker, RerankedQueryEngine, bm25_scores, default_scorer,
+)
+
+BOILERPLATE = [
+    "The Company's fiscal year is the 52- or 53-week period that ends on the last Saturday of September.",
+    "Forward-looking statements involve risks and uncertainties described in Part I, Item 1A.",
+    "The Company designs, manufactures and markets smartphones, personal computers and wearables.",
+    "Shareholders may obtain copies of this report free of charge from the investor relations website.",
+    "The Company has a global workforce of approximately 164,000 full-time equivalent employees.",
+]
+RELEVANT = "Services net sales increased 13% in 2024 driven by advertising, the App Store and cloud services."
+
+
+class TestScoring:
+    """Test the local scorers and the reranking postprocessor"""
+
+    def test_bm25_prefers_matching_terms(self):
+        """Test 1: BM25 scores the chunk sharing rare query terms highest"""
+        scores = bm25_scores("How did services net sales change?", BOILERPLATE + [RELEVANT])
+
+        assert scores.index(max(scores)) == len(BOILERPLATE)
+        assert scores[0] == 0.0
+
+    def test_reranker_promotes_relevant_chunk(self):
+        """Test 2: A relevant chunk retrieved last is moved up and only top_n survive"""
+        nodes = [NodeWithScore(node=TextNode(text=text), score=0.9 - i * 0.05)
+                 for i, text in enumerate(BOILERPLATE + [RELEVANT])]
+        reranker = LocalReranker(top_n=2, scorer=LexicalEmbeddingScorer())
+
+        kept = reranker.postprocess_nodes(nodes, query_str="How did services net sales change in 2024?")
+
+        assert len(kept) == 2
+        assert kept[0].node.get_content() == RELEVANT
+        assert kept[0].score >= kept[1].score
+
+    def test_cross_encoder_falls_back_without_dependency(self, monkeypatch, caplog):
+        """Test 3: Requesting a cross-encoder without sentence-transformers warns and uses the local scorer"""
+        monkeypatch.setattr(reranking, "CrossEncoder", None)
+
+        with caplog.at_level("WARNING", logger=reranking.__name__):
+            assert isinstance(default_scorer("cross-encoder/ms-marco-MiniLM-L-6-v2"), LexicalEmbeddingScorer)
+        assert "sentence-transformers is required" in caplog.text
+        caplog.clear()
+        assert isinstance(default_scorer(), LexicalEmbeddingScorer)
+        assert not caplog.records
+
+
+class TestRerankedQueryEngine:
+    """Test the retrieve -> rerank -> synthesize engine"""
+
+    def test_over_retrieves_reranks_and_times_stages(self):
+        """Test 4: The engine fetches retrieve_top_k, synthesizes top_n and reports stage latency"""
+        texts = BOILERPLATE * 2 + [RELEVANT]
+        index = VectorStoreIndex([TextNode(text=text) for text in texts], embed_model=MockEmbedding(embed_dim=8))
+        engine = RerankedQueryEngine.from_index(index, retrieve_top_k=len(texts), top_n=3, llm=MockLLM())
+
+        response = engine.query("How did services net sales change in 2024?")
+
+        assert response.metadata["retrieved"] == len(texts) and response.metadata["reranked"] == 3
+        assert [node.node.get_content() for node in response.source_nodes][0] == RELEVANT
+        assert set(response.metadata["timings"]) == {"retrieve_s", "rerank_s", "synthesize_s"}
+        assert all(seconds > 0 for seconds in response.metadata["timings"].values())
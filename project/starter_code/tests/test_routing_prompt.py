@@ -0,0 +1,129 @@
+"""
+Test Routing Prompt Module - Compact, cached tool catalog for the routing LLM call
+
+Usage:
+    python -m pytest tests/test_routing_prompt.py -v
+"""
+
+import string
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from llama_index.core.tools import ToolMetadata
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.llm_usage import count_tokens
+from helper_modules.routing_prompt import (
+    ROUTING_INSTRUCTIONS, RoutingPromptBuilder, short_description, tool_category,
+)
+
+FILING_DESCRIPTION = (
+    "Provides information from the {name} ({symbol}) 10-K SEC filings for fiscal years 2023, 2024: business "
+    "overview, risk factors, management discussion and exact figures from the financial statements (revenue, "
+    "net income, EPS, assets, cash flows), including year-over-year comparisons. Use for questions about "
+    "{name}'s reported financials and operations."
+)
+
+
+def tool(name: str, description: str):
+    return SimpleNamespace(metadata=ToolMetadata(name=name, description=description))
+
+
+def toolset(symbols):
+    filings = [tool(f"{symbol}_10k_filing_tool", FILING_DESCRIPTION.format(name=f"{symbol} Corp", symbol=symbol))
+               for symbol in symbols]
+    return filings + [
+        tool("database_query_tool", "Query the customer portfolio database with natural language. Returns "
+                                    "customers, holdings and portfolio values as tables."),
+        tool("finance_market_search_tool", "Get real-time stock prices, daily changes and trading volume for "
+                                           "one or more tickers from Yahoo Finance."),
+    ]
+
+
+class TestCatalog:
+    """Test the compact tool catalog"""
+
+    def test_tool_categories_and_short_descriptions(self):
+        """Test 1: Per-company tools share a category; other tools keep a one-sentence summary"""
+        assert tool_category("AAPL_10k_filing_tool") == ("filings", "AAPL")
+        assert tool_category("database_query_tool") == ("database_query_tool", None)
+        assert short_description("Query the customer database. Returns tables.") == "Query the customer database"
+        assert short_description("one two three four", max_words=2) == "one two ..."
+
+    def test_catalog_cached_and_prefix_stable(self):
+        """Test 2: The catalog is built once per tool set and every prompt starts with the same prefix"""
+        builder = RoutingPromptBuilder({"AAPL": "Apple Inc.", "TSLA": "Tesla Inc."})
+        tools = toolset(["AAPL", "GOOGL", "TSLA"])
+
+        apple = builder.build("What are Apple's main risks?", tools, symbols=["AAPL"])
+        market = builder.build("How is the market doing today?", tools)
+        catalog = builder.catalog(tools)
+
+        prefix = ROUTING_INSTRUCTIONS + catalog.text
+        assert apple.startswith(prefix) and market.startswith(prefix)
+        assert builder.stats == {"catalog_builds": 1, "prompts": 2}
+        assert "4. database_query_tool: Query the customer portfolio database with natural language" in catalog.text
+
+        builder.build("What are Apple's main risks?", toolset(["AAPL", "TSLA"]), symbols=["AAPL"])
+        assert builder.stats["catalog_builds"] == 2
+
+
+class TestExpansion:
+    """Test expanding only the categories a question touches"""
+
+    @pytest.mark.parametrize("question, symbols, listed", [
+        ("What are Apple's main risks?", ["AAPL"], ["1. AAPL_10k_filing_tool: Apple Inc. (fiscal 2023, 2024)"]),
+        ("Compare Apple and Tesla revenue", ["AAPL", "TSLA"], ["1. AAPL_10k_filing_tool", "3. TSLA_10k_filing_tool"]),
+        ("Summarize the 10-K filings of all companies", [], ["1. AAPL", "2. GOOGL", "3. TSLA"]),
+        ("Which customers hold the most shares?", [], []),
+        ("Which company reported the highest revenue last year?", [], ["1. AAPL", "2. GOOGL", "3. TSLA"]),
+        ("What are NVIDIA's main risks?", ["NVDA"], []),
+    ])
+    def test_only_touched_companies_listed(self, question, symbols, listed):
+        """Test 3: Filing tools appear for the companies asked about, or all of them for general filing questions"""
+        prompt = RoutingPromptBuilder({"AAPL": "Apple Inc."}).build(question, toolset(["AAPL", "GOOGL", "TSLA"]),
+                                                                    symbols=symbols)
+        expanded = prompt.split("Tools for this question:\n")[1].split("\n\n")[0] if listed else ""
+        assert all(entry in expanded for entry in listed)
+        assert expanded.count("_10k_filing_tool") == len(listed)
+
+    def test_prompt_tokens_flat_in_number_of_tools(self):
+        """Test 4: Routing prompts barely grow from 3 to 300 filing tools"""
+        builder = RoutingPromptBuilder()
+        symbols = [f"X{a}{b}" for a in string.ascii_uppercase for b in string.ascii_uppercase][:300]
+        sizes = [count_tokens(builder.build("What were XAB's revenues in 2023?", toolset(symbols[:count]),
+                                            symbols=["XAB"]))
+                 for count in (3, 300)]
+        assert sizes[1] - sizes[0] <= 5
+
+
+class TestCoordinatorRouting:
+    """Test the coordinator's routing call and tool listing"""
+
+    def test_llm_routing_uses_compact_prompt(self):
+        """Test 5: The routing prompt lists only the mentioned company and numbers map back to tools"""
+        from llama_index.core.tools import FunctionTool
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        agent = AgentCoordinator()
+        filings = [FunctionTool.from_defaults(fn=lambda query: "10-K text", name=f"{symbol}_10k_filing_tool",
+                                              description=FILING_DESCRIPTION.format(name=symbol, symbol=symbol))
+                   for symbol in ("AAPL", "GOOGL", "TSLA")]
+        market = FunctionTool.from_defaults(fn=lambda query: "AAPL price: $230.00",
+                                            name="finance_market_search_tool", description="Market quotes.")
+        agent.setup(document_tools=filings, function_tools=[market])
+        agent.llm = Mock()
+        agent.llm.complete.return_value = "1, 4"
+
+        selected = agent._select_tools_with_llm("What is Apple's stock price and revenue?", agent._routable_tools())
+
+        prompt = agent.llm.complete.call_args[0][0]
+        assert [t.metadata.name for t in selected] == ["AAPL_10k_filing_tool", "finance_market_search_tool"]
+        assert "AAPL_10k_filing_tool" in prompt and "TSLA_10k_filing_tool" not in prompt
+        assert [t["name"] for t in agent.list_available_tools()] == [
+            "AAPL_10k_filing_tool", "GOOGL_10k_filing_tool", "TSLA_10k_filing_tool", "finance_market_search_tool"]
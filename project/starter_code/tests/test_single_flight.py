@@ -0,0 +1,172 @@
+"""
+Test Single Flight Module - Coalescing of identical in-flight calls
+
+Usage:
+    python -m pytest tests/test_single_flight.py -v
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.single_flight import SingleFlight, normalize_input
+
+
+def gated(release: threading.Event, calls: list, value="result"):
+    """Work that blocks until released, counting executions"""
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return value
+    return fn
+
+
+def run_concurrently(count: int, target) -> list:
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return [future.result() for future in [pool.submit(target) for _ in range(count)]]
+
+
+class TestSingleFlight:
+    """Test leader/follower execution"""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Test 1: Concurrent calls with one key execute once and all get the result"""
+        group, release, calls = SingleFlight(), threading.Event(), []
+        fn = gated(release, calls)
+
+        def call():
+            return group.do(("finance_market_search_tool", "aapl price"), fn)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(call) for _ in range(8)]
+            while group.summary()["shared"] < 7:
+                time.sleep(0.005)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert [result for result, _ in results] == ["result"] * 8
+        assert sorted(shared for _, shared in results) == [False] + [True] * 7
+        assert group.summary() == {"executions": 1, "shared": 7, "in_flight": 0}
+
+    def test_errors_are_shared_and_not_remembered(self):
+        """Test 2: A failure reaches every waiter and the next call runs again"""
+        group, release = SingleFlight(), threading.Event()
+        attempts = []
+
+        def failing():
+            attempts.append(1)
+            release.wait(5)
+            raise RuntimeError("upstream down")
+
+        def call():
+            try:
+                group.do("key", failing)
+            except RuntimeError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(call) for _ in range(4)]
+            while group.summary()["shared"] < 3:
+                time.sleep(0.005)
+            release.set()
+            assert [future.result() for future in futures] == ["upstream down"] * 4
+
+        assert len(attempts) == 1
+        assert group.do("key", lambda: "recovered") == ("recovered", False)
+
+    def test_distinct_keys_and_sequential_calls_run(self):
+        """Test 3: Different keys never coalesce and finished calls are not cached"""
+        group = SingleFlight()
+
+        assert group.do("a", lambda: 1) == (1, False)
+        assert group.do("a", lambda: 2) == (2, False)
+        assert group.do("b", lambda: 3) == (3, False)
+        assert group.summary()["executions"] == 3 and group.in_flight() == 0
+
+    def test_submit_shares_future(self):
+        """Test 4: submit() returns the in-flight future for a key"""
+        group, release, calls = SingleFlight(), threading.Event(), []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = group.submit("TSLA", executor, gated(release, calls, 250.0))
+            second = group.submit("TSLA", executor, gated(release, calls, 999.0))
+            release.set()
+
+            assert first is second and first.result() == 250.0
+        assert len(calls) == 1 and group.in_flight() == 0
+
+    @pytest.mark.parametrize("text", ["What is the AAPL price?", "  what is the  aapl price ", "WHAT IS THE AAPL PRICE"])
+    def test_normalize_input(self, text):
+        """Test 5: Case, whitespace and trailing punctuation do not split keys"""
+        assert normalize_input(text) == "what is the aapl price"
+
+
+class TestCoordinatorCoalescing:
+    """Test single flight around agent tool invocation"""
+
+    def test_identical_tool_calls_coalesced(self):
+        """Test 6: Concurrent users asking the same thing trigger one tool execution"""
+        from llama_index.core.tools import FunctionTool
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        release, calls = threading.Event(), []
+        tool = FunctionTool.from_defaults(fn=lambda query: gated(release, calls, "AAPL price: $230.00")(),
+                                          name="finance_market_search_tool", description="Market quotes")
+        agent = AgentCoordinator()
+        questions = ["What is Apple's price?", "what is apple's price", " What is Apple's  price? "]
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(agent._execute_tools, question, [tool]) for question in questions]
+            while agent.single_flight.summary()["shared"] < 2:
+                time.sleep(0.005)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert all(result == [("finance_market_search_tool", "Market quotes", "AAPL price: $230.00")]
+                   for result in results)
+        assert agent.get_status()["coalesced_tool_calls"]["shared"] == 2
+
+    def test_deadline_failures_not_shared(self):
+        """Test 7: A follower without a deadline re-runs a call the leader's deadline cut short"""
+        from llama_index.core.tools import FunctionTool
+        from helper_modules.agent_coordinator import AgentCoordinator
+        from helper_modules.deadlines import Deadline, DeadlineExceeded, current_deadline, deadline_scope
+
+        release, calls = threading.Event(), []
+
+        def quote(query):
+            release.wait(5)
+            calls.append(query)
+            if current_deadline() is not None:
+                current_deadline().check("LLM request")
+            return "AAPL price: $230.00"
+
+        tool = FunctionTool.from_defaults(fn=quote, name="finance_market_search_tool", description="Market quotes")
+        agent = AgentCoordinator()
+
+        def leader():
+            with deadline_scope(Deadline.from_ms(50)):
+                return agent._invoke_tool(tool, "What is Apple's price?")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            tight = pool.submit(leader)
+            while agent.single_flight.in_flight() < 1:
+                time.sleep(0.005)
+            follower = pool.submit(agent._invoke_tool, tool, "what is apple's price")
+            while agent.single_flight.summary()["shared"] < 1:
+                time.sleep(0.005)
+            time.sleep(0.06)
+            release.set()
+
+            with pytest.raises(DeadlineExceeded):
+                tight.result()
+            assert follower.result() == "AAPL price: $230.00"
+        assert len(calls) == 2 and agent.single_flight.summary()["shared"] == 0
@@ -0,0 +1,85 @@
+"""
+Test SQL Candidates Module - Speculative parallel SQL generation
+
+Usage:
+    python -m pytest tests/test_sql_candidates.py -v
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.sql_candidates import SQLVariant, race_sql_candidates
+
+VARIANTS = [SQLVariant(0.0), SQLVariant(0.4), SQLVariant(0.8)]
+
+
+def fake_generate(latencies, queries):
+    def generate(variant):
+        time.sleep(latencies[variant.temperature])
+        return queries[variant.temperature]
+    return generate
+
+
+def fake_validate(costs):
+    def validate(sql):
+        cost = costs[sql]
+        return (None, f"no such column in {sql}") if cost is None else (cost, None)
+    return validate
+
+
+class TestRace:
+    """Test racing and selection"""
+
+    def test_cheapest_valid_plan_wins(self):
+        """Test 1: Invalid candidates are skipped and the lowest cost is chosen"""
+        generate = fake_generate({0.0: 0.01, 0.4: 0.02, 0.8: 0.03}, {0.0: "bad", 0.4: "scan", 0.8: "search"})
+        best, candidates = race_sql_candidates(generate, fake_validate({"bad": None, "scan": 5000, "search": 0}),
+                                               VARIANTS, grace=1.0)
+        assert best.sql == "search"
+        assert [c.valid for c in candidates] == [False, True, True]
+
+    def test_candidates_run_concurrently(self):
+        """Test 2: Three candidates cost about one LLM round-trip"""
+        generate = fake_generate({0.0: 0.2, 0.4: 0.2, 0.8: 0.2}, {0.0: "a", 0.4: "b", 0.8: "c"})
+        start = time.perf_counter()
+        best, _ = race_sql_candidates(generate, fake_validate({"a": 10, "b": 10, "c": 10}), VARIANTS)
+        assert time.perf_counter() - start < 0.4
+        assert best.sql == "a"  # ties go to the first variant
+
+    def test_slow_candidates_do_not_block(self):
+        """Test 3: After the first valid candidate, stragglers only get the grace period"""
+        generate = fake_generate({0.0: 0.01, 0.4: 2.0, 0.8: 2.0}, {0.0: "a", 0.4: "b", 0.8: "c"})
+        start = time.perf_counter()
+        best, candidates = race_sql_candidates(generate, fake_validate({"a": 10, "b": 0, "c": 0}),
+                                               VARIANTS, grace=0.1)
+        assert time.perf_counter() - start < 0.5
+        assert best.sql == "a" and len(candidates) == 1
+
+
+class TestDatabaseToolCandidates:
+    """Test speculative generation inside database_query_tool"""
+
+    def test_one_round_trip_for_hard_question(self, tmp_path, make_function_tools):
+        """Test 4: A failing first candidate does not trigger a sequential retry"""
+        db_path = tmp_path / "financial.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE customers (id INTEGER PRIMARY KEY, first_name TEXT);
+            INSERT INTO customers VALUES (1, 'John'), (2, 'Sarah');
+        """)
+        conn.close()
+
+        responses = {0.0: "SELECT frist_name FROM customers",
+                     0.4: "SELECT first_name FROM customers",
+                     0.8: "SELECT first_name FROM customers WHERE id = 2"}
+        manager, tools = make_function_tools(db_path, sql_candidates=3)
+        manager.llm.complete.side_effect = lambda prompt, temperature: responses[temperature]
+
+        result = tools["database_query_tool"].fn("What is the name of customer 2?")
+        assert result.rows == [("Sarah",)]
+        assert manager.llm.complete.call_count == 3
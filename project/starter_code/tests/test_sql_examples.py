@@ -0,0 +1,120 @@
+"""
+Test SQL Examples Module - Few-shot question -> SQL retrieval
+
+Usage:
+    python -m pytest tests/test_sql_examples.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.sql_examples import SEED_EXAMPLES, SQLExampleStore, main
+
+
+class TestSQLExampleStore:
+    """Test storage and similarity search"""
+
+    def test_top_k_most_similar(self, tmp_path):
+        """Test 1: Search returns the closest examples first and skips unrelated ones"""
+        store = SQLExampleStore(tmp_path / "examples.db")
+        store.seed(SEED_EXAMPLES)
+        hits = store.search("Which customers own Apple shares?", k=2)
+        assert hits[0].question == "Which customers own Tesla stock and how many shares?"
+        assert len(hits) <= 2 and hits[0].score >= hits[-1].score
+        assert store.search("quarterly weather forecast", k=3) == []
+
+    def test_duplicates_ignored_and_persisted(self, tmp_path):
+        """Test 2: Questions are stored once and survive reopening"""
+        path = tmp_path / "examples.db"
+        store = SQLExampleStore(path)
+        assert store.add("How many customers are there?", "SELECT COUNT(*) FROM customers")
+        assert not store.add("how many customers are there", "SELECT 1")
+        store.close()
+
+        reopened = SQLExampleStore(path)
+        assert len(reopened) == 1
+        assert reopened.search("How many customers do we have?")[0].sql == "SELECT COUNT(*) FROM customers"
+
+    def test_least_used_evicted(self, tmp_path):
+        """Test 3: The library stays within max_examples, keeping examples in use"""
+        store = SQLExampleStore(tmp_path / "examples.db", max_examples=2)
+        store.add("Total shares of Tesla", "SELECT SUM(shares) FROM portfolio_holdings WHERE symbol = 'TSLA'")
+        store.add("List all companies", "SELECT * FROM companies")
+        store.search("Total shares of Tesla")
+        store.add("Customer emails", "SELECT email FROM customers")
+        assert len(store) == 2
+        assert [hit.question for hit in store.search("List all companies")] == []
+        assert store.search("Total shares of Tesla")[0].question == "Total shares of Tesla"
+
+    def test_pending_until_confirmed(self, tmp_path):
+        """Test 4: Unconfirmed SQL is never retrieved; confirmed SQL is, until it is removed"""
+        path = tmp_path / "examples.db"
+        store = SQLExampleStore(path)
+        assert store.add("How many customers are there?", "SELECT COUNT(*) FROM companies", verified=False)
+        assert len(store) == 0 and store.search("How many customers are there?") == []
+        assert [example.sql for example in store.pending()] == ["SELECT COUNT(*) FROM companies"]
+
+        assert store.remove("How many customers are there?") and store.pending() == []
+        store.add("How many customers are there?", "SELECT COUNT(*) FROM customers", verified=False)
+        assert store.confirm("how many customers are there") and not store.confirm("Unknown question")
+        assert store.search("How many customers do we have?")[0].sql == "SELECT COUNT(*) FROM customers"
+        store.close()
+
+        reopened = SQLExampleStore(path)
+        assert len(reopened) == 1 and reopened.pending() == []
+        assert reopened.remove("How many customers are there?")
+        assert reopened.search("How many customers are there?") == []
+
+    def test_review_command(self, tmp_path, capsys):
+        """Test 5: The review command lists pending examples and confirms or removes them"""
+        path = tmp_path / "examples.db"
+        store = SQLExampleStore(path)
+        store.add("How many customers are there?", "SELECT COUNT(*) FROM customers", verified=False)
+        store.add("List all companies", "SELECT * FROM customers", verified=False)
+        store.close()
+
+        assert main(["--db-path", str(path), "list"]) == 0
+        assert "SELECT COUNT(*) FROM customers" in capsys.readouterr().out
+        assert main(["--db-path", str(path), "confirm", "How many customers are there?"]) == 0
+        assert main(["--db-path", str(path), "remove", "List all companies"]) == 0
+        assert main(["--db-path", str(path), "confirm", "List all companies"]) == 1
+
+        store = SQLExampleStore(path)
+        assert len(store) == 1 and store.pending() == []
+        store.close()
+
+
+class TestDatabaseToolExamples:
+    """Test few-shot prompting in database_query_tool"""
+
+    def test_examples_in_prompt_and_learned(self, tmp_path, make_function_tools):
+        """Test 6: Similar examples are added to the prompt; successful SQL is used once confirmed"""
+        db_path = tmp_path / "financial.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE customers (id INTEGER PRIMARY KEY, first_name TEXT, risk_tolerance TEXT);
+            INSERT INTO customers VALUES (1, 'John', 'high'), (2, 'Sarah', 'low');
+        """)
+        conn.close()
+
+        manager, tools = make_function_tools(db_path)
+        manager.llm.complete.return_value = "SELECT first_name FROM customers WHERE risk_tolerance = 'high'"
+        database_query_tool = tools["database_query_tool"].fn
+
+        database_query_tool("Which customers have a high risk tolerance?")
+        assert "risk_tolerance = 'high'" not in manager.llm.complete.call_args[0][0]
+        assert (tmp_path / "sql_examples.db").exists()
+
+        database_query_tool("Which customers have high risk tolerance?")
+        assert "risk_tolerance = 'high'" not in manager.llm.complete.call_args[0][0]
+
+        store = manager.get_sql_example_store()
+        assert [example.question for example in store.pending()] == ["Which customers have a high risk tolerance?",
+                                                                    "Which customers have high risk tolerance?"]
+        store.confirm("Which customers have a high risk tolerance?")
+        database_query_tool("Which customers have high risk tolerance today?")
+        assert "risk_tolerance = 'high'" in manager.llm.complete.call_args[0][0]
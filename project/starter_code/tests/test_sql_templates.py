@@ -0,0 +1,117 @@
+"""
+Test SQL Templates Module - Parameterized SQL for recurring question shapes
+
+Usage:
+    python -m pytest tests/test_sql_templates.py -v
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.entity_resolver import EntityResolver, DEFAULT_ALIASES, DEFAULT_COMPANIES
+from helper_modules.sql_templates import SQLTemplateMatcher
+
+
+@pytest.fixture
+def matcher():
+    return SQLTemplateMatcher(EntityResolver(DEFAULT_COMPANIES, aliases=DEFAULT_ALIASES))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "financial.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT);
+        CREATE TABLE portfolio_holdings (id INTEGER PRIMARY KEY, customer_id INTEGER, symbol TEXT,
+            shares REAL, purchase_price REAL, current_value REAL);
+        INSERT INTO customers VALUES (1, 'John', 'Smith'), (2, 'Sarah', 'Johnson');
+        INSERT INTO portfolio_holdings (customer_id, symbol, shares, purchase_price, current_value) VALUES
+            (1, 'AAPL', 50, 150.0, 8750.0), (1, 'TSLA', 10, 200.0, 2100.0), (2, 'TSLA', 75, 180.0, 15750.0);
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestMatching:
+    """Test question shapes and slot extraction"""
+
+    @pytest.mark.parametrize("question, template, params", [
+        ("Show me the holdings of customer 42", "customer_holdings", {"customer_id": 42}),
+        ("What does John Smith own?", "customer_holdings", {"first_name": "John", "last_name": "Smith"}),
+        ("What is the total value of Sarah Johnson's portfolio?", "customer_portfolio_value",
+         {"first_name": "Sarah", "last_name": "Johnson"}),
+        ("Show John Smith's holdings", "customer_holdings", {"first_name": "John", "last_name": "Smith"}),
+        ("List Sarah Johnson's portfolio", "customer_holdings", {"first_name": "Sarah", "last_name": "Johnson"}),
+        ("Show Me John Smith's holdings", "customer_holdings", {"first_name": "John", "last_name": "Smith"}),
+        ("Who owns Tesla?", "symbol_holders", {"symbol": "TSLA"}),
+        ("Which customers hold $AAPL?", "symbol_holders", {"symbol": "AAPL"}),
+    ])
+    def test_recurring_shapes_match(self, matcher, question, template, params):
+        """Test 1: Recurring shapes bind their slots as parameters"""
+        match = matcher.match(question, limit=10)
+        assert match.template == template
+        assert match.params == {**params, "limit": 10}
+        assert "'" not in match.sql  # values are never formatted into the SQL
+
+    @pytest.mark.parametrize("question", [
+        "Which customers own more than 100 shares of Tesla?",
+        "Compare Apple and Tesla holdings",
+        "What are John Smith's holdings in Apple?",
+        "Show the top 10 customers by portfolio value",
+        "What are the main risks for Tesla?",
+        "Show me all customers",
+    ])
+    def test_other_questions_fall_through(self, matcher, question):
+        """Test 2: Questions with extra constraints are left to the LLM"""
+        assert matcher.match(question) is None
+
+    def test_templates_validated_against_schema(self, matcher):
+        """Test 3: Templates the schema cannot run are disabled"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT)")
+        matcher.validate(conn)
+        assert not any(template.enabled for template in matcher.templates)
+        assert matcher.match("Who owns Tesla?") is None
+
+
+class TestDatabaseToolTemplates:
+    """Test the template layer in front of database_query_tool"""
+
+    @pytest.fixture
+    def make_tool(self, make_function_tools):
+        def make(db_path):
+            matcher = SQLTemplateMatcher(EntityResolver(DEFAULT_COMPANIES, aliases=DEFAULT_ALIASES))
+            manager, tools = make_function_tools(db_path, sql_templates=matcher)
+            manager.llm.complete.return_value = "SELECT first_name FROM customers WHERE id = 1"
+            return manager, tools["database_query_tool"].fn
+        return make
+
+    def test_template_hit_skips_llm(self, db_path, make_tool):
+        """Test 4: Template hits run without an LLM call in milliseconds"""
+        manager, database_query_tool = make_tool(db_path)
+        database_query_tool("Who owns Tesla?")  # validates the templates
+
+        start = time.perf_counter()
+        result = database_query_tool("Who owns Tesla?")
+        elapsed = time.perf_counter() - start
+
+        assert result.metadata["template"] == "symbol_holders"
+        assert result.rows == [("Sarah", "Johnson", 75.0, 15750.0), ("John", "Smith", 10.0, 2100.0)]
+        assert elapsed < 0.01
+        manager.llm.complete.assert_not_called()
+
+    def test_empty_template_result_falls_through(self, db_path, make_tool):
+        """Test 5: A template that finds nothing hands the question to the LLM"""
+        manager, database_query_tool = make_tool(db_path)
+        result = database_query_tool("What does Jane Doe own?")
+        assert "template" not in result.metadata
+        assert manager.llm.complete.call_count == 1
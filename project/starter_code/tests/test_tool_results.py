@@ -0,0 +1,99 @@
+"""
+Test Tool Results Module - Structured results between tools and the coordinator
+
+Usage:
+    python -m pytest tests/test_tool_results.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_modules.pii_masking import PIIMaskingEngine
+from helper_modules.tool_results import ToolResult
+
+
+def make_database(path):
+    """Create a minimal customers/holdings database"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, first_name TEXT, email TEXT);
+        CREATE TABLE portfolio_holdings (id INTEGER PRIMARY KEY, customer_id INTEGER, symbol TEXT, shares REAL);
+        INSERT INTO customers VALUES (1, 'John', 'john.smith@email.com'), (2, 'Sarah', 'sarah@email.com');
+        INSERT INTO portfolio_holdings VALUES (1, 1, 'AAPL', 50), (2, 2, 'TSLA', 75);
+    """)
+    conn.commit()
+    conn.close()
+
+
+class TestToolResult:
+    """Test the ToolResult container"""
+
+    def test_lazy_render_is_cached(self):
+        """Test 1: Rendering happens once and is reused"""
+        result = ToolResult(columns=['id', 'symbol'], rows=[(1, 'AAPL')], metadata={'sql': 'SELECT 1'})
+        assert result._rendered is None
+        text = result.render()
+        assert "SQL Query: SELECT 1" in text
+        assert "{'id': 1, 'symbol': 'AAPL'}" in text
+        assert "COLUMNS: ['id', 'symbol']" in text
+        assert result.render() is text
+
+    def test_head_and_mask_operate_on_rows(self):
+        """Test 2: Truncation and masking work on row tuples"""
+        rows = [(i, f'user{i}@email.com') for i in range(10)]
+        result = ToolResult(columns=['id', 'email'], rows=rows)
+
+        truncated = result.head(3)
+        assert truncated.row_count == 3
+        assert truncated.metadata['truncated'] and truncated.metadata['total_rows'] == 10
+
+        masked = truncated.mask_pii(PIIMaskingEngine())
+        assert masked.rows[0] == (0, '***@email.com')
+        assert masked.metadata['pii_masked_fields'] == ['email']
+        assert "showing 3 of 10 rows" in masked.render()
+        assert result.rows[0] == (0, 'user0@email.com')
+
+    def test_failure(self):
+        """Test 3: Failed results render their error"""
+        result = ToolResult.failure("Database query failed: no such table")
+        assert not result.ok
+        assert str(result) == "Database query failed: no such table"
+
+
+class TestDatabaseToolStructuredOutput:
+    """Test database_query_tool returning ToolResult"""
+
+    def test_database_tool_returns_rows(self, tmp_path, make_function_tools):
+        """Test 4: SQL results come back as columns and row tuples"""
+        db_path = tmp_path / "financial.db"
+        make_database(db_path)
+
+        manager, tools = make_function_tools(db_path)
+        manager.llm.complete.side_effect = [
+            "```sql\nSELECT first_name, emial FROM customers;\n```",
+            "SELECT first_name, email FROM customers ORDER BY id",
+        ]
+
+        result = tools['database_query_tool'].fn("Show me all customers")
+
+        assert isinstance(result, ToolResult)
+        assert result.columns == ['first_name', 'email']
+        assert result.rows == [('John', 'john.smith@email.com'), ('Sarah', 'sarah@email.com')]
+        assert manager.llm.complete.call_count == 2
+        assert "no such column" in manager.llm.complete.call_args[0][0]
+
+    def test_coordinator_masks_structured_result(self):
+        """Test 5: Coordinator masks ToolResult rows before synthesis"""
+        from helper_modules.agent_coordinator import AgentCoordinator
+
+        agent = AgentCoordinator()
+        result = ToolResult(columns=['first_name', 'email', 'symbol'],
+                            rows=[('John', 'john@email.com', 'AAPL')])
+        protected = agent._check_and_apply_pii_protection("database_query_tool", result)
+
+        assert protected.rows == [('****', '***@email.com', 'AAPL')]
+        assert "john@email.com" not in protected.render()